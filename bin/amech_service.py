@@ -0,0 +1,210 @@
+""" Long-running MechDriver service which keeps the libraries imported and
+    the parsed inputs of each job directory in memory, so that many small
+    runs against the same inputs do not each pay to start up.
+
+    The service listens on a Unix socket for requests to run a job
+    directory. For each request, the inputs are read and only those whose
+    files have changed since the last request for the directory are parsed
+    again. The drivers are then run in a forked child process, which
+    starts with all of the libraries already imported, writes its output
+    to a log file in the job directory and reports back when finished.
+
+    Usage:
+        python amech_service.py serve SOCKET
+        python amech_service.py submit SOCKET JOB_PATH [--plan] [--no-wait]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import traceback
+import automech
+import drivers
+from mechlib.amech_io import printer as ioprinter
+
+
+LOG_NAME = 'amech.{}.log'
+
+
+def serve(socket_path):
+    """ Run the service, accepting requests until killed.
+
+        :param socket_path: path of the Unix socket to listen on
+        :type socket_path: str
+    """
+
+    # Import every driver now so that each run starts with them loaded
+    for driver in drivers.__all__:
+        getattr(drivers, driver)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print('MechDriver service listening on {}'.format(socket_path))
+
+    # Parsed inputs of each job directory: {job path: cache}
+    cache_dct = {}
+    try:
+        while True:
+            conn, _ = server.accept()
+            _reap_children()
+            try:
+                _handle(conn, server, cache_dct)
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+            conn.close()
+    finally:
+        server.close()
+        os.remove(socket_path)
+
+
+def submit(socket_path, job_path, plan=False, wait=True):
+    """ Request that the service run a job directory.
+
+        :param socket_path: path of the Unix socket of the service
+        :type socket_path: str
+        :param job_path: directory with the inp/ and data/ input files
+        :type job_path: str
+        :param plan: only print the pending electronic structure jobs
+        :type plan: bool
+        :param wait: wait for the run to finish
+        :type wait: bool
+        :returns: exit code of the run (0 if not waiting and accepted)
+        :rtype: int
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(socket_path)
+    _send(client, {
+        'job_path': os.path.abspath(job_path),
+        'cwd': os.getcwd(),
+        'plan': plan
+    })
+
+    code = 1
+    with client.makefile('r') as reply_obj:
+        for line in reply_obj:
+            reply = json.loads(line)
+            if reply['status'] == 'error':
+                print('Run failed to start:\n{}'.format(reply['message']))
+                break
+            if reply['status'] == 'accepted':
+                print('Running {} as process {}, writing output to {}'
+                      .format(job_path, reply['pid'], reply['log']))
+                code = 0
+                if not wait:
+                    break
+            if reply['status'] == 'done':
+                print('Run finished with exit code {}'.format(reply['code']))
+                code = reply['code']
+                break
+    client.close()
+
+    return code
+
+
+def _handle(conn, server, cache_dct):
+    """ Parse the inputs for a request and fork a child process to run it
+    """
+
+    with conn.makefile('r') as req_obj:
+        request = json.loads(req_obj.readline())
+    job_path = request['job_path']
+
+    # Read the inputs, reusing the parsed dictionaries of unchanged files
+    print('\nRequest to run {} at {}'.format(
+        job_path, time.strftime('%Y-%m-%d %H:%M:%S')))
+    os.chdir(request['cwd'])
+    try:
+        inp_dct = automech.parse_input(
+            job_path, cache=cache_dct.setdefault(job_path, {}))
+    except (Exception, SystemExit):  # pylint: disable=broad-except
+        _send(conn, {'status': 'error', 'message': traceback.format_exc()})
+        return
+
+    if os.fork() == 0:
+        # Child: send output to the log and run the drivers
+        server.close()
+        log_path = os.path.join(job_path, LOG_NAME.format(os.getpid()))
+        _send(conn, {
+            'status': 'accepted', 'pid': os.getpid(), 'log': log_path})
+        sys.stdout.flush()
+        sys.stderr.flush()
+        log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o644)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        os.close(log_fd)
+
+        code = 0
+        try:
+            ioprinter.program_header('amech')
+            ioprinter.host_name()
+            automech.run(job_path, inp_dct, plan=request['plan'])
+            ioprinter.obj('vspace')
+            ioprinter.program_exit('amech')
+        except (Exception, SystemExit):  # pylint: disable=broad-except
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            _send(conn, {'status': 'done', 'code': code})
+        except OSError:
+            # Client stopped waiting
+            pass
+        os._exit(code)
+
+
+def _send(conn, msg_dct):
+    """ Send a message as a line of JSON
+    """
+    conn.sendall((json.dumps(msg_dct) + '\n').encode('utf-8'))
+
+
+def _reap_children():
+    """ Collect the exit status of any finished runs
+    """
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] > 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def main():
+    """ Start the service or submit a job directory to it
+    """
+
+    parser = argparse.ArgumentParser(description='MechDriver service')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='start the service')
+    serve_parser.add_argument('socket', help='path of the Unix socket')
+    submit_parser = subparsers.add_parser(
+        'submit', help='run a job directory with the service')
+    submit_parser.add_argument('socket', help='path of the Unix socket')
+    submit_parser.add_argument(
+        'job_path', help='directory with the inp/ and data/ input files')
+    submit_parser.add_argument(
+        '--plan', action='store_true',
+        help='print the pending electronic structure jobs and their '
+             'estimated cost without running anything')
+    submit_parser.add_argument(
+        '--no-wait', action='store_true',
+        help='return once the run has started')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket)
+    else:
+        sys.exit(submit(args.socket, args.job_path,
+                        plan=args.plan, wait=not args.no_wait))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,109 +3,245 @@
     launches all of the requested electronic structure, transport,
     thermochemistry and kinetics calculations via their associated
     sub-drivers.
+
+    The parsing and running are split into functions so that they may be
+    reused by the MechDriver service (see amech_service.py), which keeps
+    the parsed inputs of a job directory in memory between runs.
 """
 
-import sys
-# import argparse
+import json
+import hashlib
+import argparse
 from mechlib.filesys import prefix_fs
 from mechlib.amech_io import parser as ioparser
 from mechlib.amech_io import printer as ioprinter
-from drivers import esdriver, thermodriver, ktpdriver, transdriver, procdriver
-
-
-# Set runtime options based on user input
-JOB_PATH = sys.argv[1]  # Add a check to see if [1] exists; path exits
-
-# Print the header message and host name (probably combine into one function)
-ioprinter.program_header('amech')
-ioprinter.random_cute_animal()
-ioprinter.host_name()
-
-# Parse all of the input
-ioprinter.program_header('inp')
-
-INP_STRS = ioparser.read_amech_input(JOB_PATH)
-
-THY_DCT = ioparser.thy.theory_dictionary(INP_STRS['thy'])
-KMOD_DCT, SMOD_DCT = ioparser.models.models_dictionary(
-    INP_STRS['mod'], THY_DCT)
-INP_KEY_DCT = ioparser.run.input_dictionary(INP_STRS['run'])
-PES_IDX_DCT = ioparser.run.pes_idxs(INP_STRS['run'])
-SPC_IDX_DCT = ioparser.run.spc_idxs(INP_STRS['run'])
-TSK_LST_DCT = ioparser.run.tasks(INP_STRS['run'], THY_DCT)
-SPC_DCT, GLOB_DCT = ioparser.spc.species_dictionary(
-    INP_STRS['spc'], INP_STRS['dat'], INP_STRS['geo'], 'csv')
-PES_DCT = ioparser.mech.pes_dictionary(
-    INP_STRS['mech'], 'chemkin', SPC_DCT)
-
-PES_RLST, SPC_RLST = ioparser.rlst.run_lst(
-    PES_DCT, SPC_DCT, PES_IDX_DCT, SPC_IDX_DCT)
-
-# Build the Run-Save Filesystem Directories
-prefix_fs(INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix'])
-
-# Run Drivers Requested by User
-ES_TSKS = TSK_LST_DCT.get('es')
-if ES_TSKS is not None:
-    ioprinter.program_header('es')
-    esdriver.run(
-        PES_RLST, SPC_RLST,
-        ES_TSKS,
-        SPC_DCT, GLOB_DCT, THY_DCT,
-        INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix']
-    )
-    ioprinter.program_exit('es')
-
-THERM_TSKS = TSK_LST_DCT.get('thermo')
-if THERM_TSKS is not None:
-    ioprinter.program_header('thermo')
-    thermodriver.run(
-        PES_RLST, SPC_RLST,
-        THERM_TSKS,
-        KMOD_DCT, SMOD_DCT,
-        SPC_DCT,
-        INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix'], JOB_PATH
-    )
-    ioprinter.program_exit('thermo')
-
-TRANS_TSKS = TSK_LST_DCT.get('trans')
-if TRANS_TSKS is not None:
-    ioprinter.program_header('trans')
-    if PES_DCT:
-        transdriver.run(
-            PES_RLST, SPC_RLST,
-            TRANS_TSKS,
-            SMOD_DCT,
-            SPC_DCT, THY_DCT,
-            INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix']
+from mechlib.amech_io import output_path
+from mechroutines.es import runner as es_runner
+import drivers
+
+
+def parse_input(job_path, cache=None):
+    """ Read and parse all of the input files in a job directory.
+
+        If a cache dictionary is given, each parsed dictionary is stored in
+        it under a hash of the input strings it is built from, and is reused
+        as long as those input strings are unchanged. The species and PES
+        dictionaries are also cached on disk in the CACHE directory of the
+        job, so they are reused between separate runs as well.
+
+        :param job_path: directory with the inp/ and data/ input files
+        :type job_path: str
+        :param cache: parsed dictionaries of earlier calls
+        :type cache: dict[str: obj]
+        :rtype: dict[str: obj]
+    """
+
+    cache = cache if cache is not None else {}
+
+    # Parse all of the input
+    ioprinter.program_header('inp')
+
+    inp_strs = ioparser.read_amech_input(job_path)
+
+    thy_dct = _cached(
+        cache, 'thy', (inp_strs['thy'],),
+        ioparser.thy.theory_dictionary, inp_strs['thy'])
+    kmod_dct, smod_dct = _cached(
+        cache, 'mod', (inp_strs['mod'], inp_strs['thy']),
+        ioparser.models.models_dictionary, inp_strs['mod'], thy_dct)
+    inp_key_dct = ioparser.run.input_dictionary(inp_strs['run'])
+    pes_idx_dct = ioparser.run.pes_idxs(inp_strs['run'])
+    spc_idx_dct = ioparser.run.spc_idxs(inp_strs['run'])
+    tsk_lst_dct = ioparser.run.tasks(inp_strs['run'], thy_dct)
+    spc_strs = (inp_strs['spc'], inp_strs['dat'], inp_strs['geo'])
+    cache_dir = output_path('CACHE', prefix=job_path)
+    spc_dct, glob_dct = _cached(
+        cache, 'spc', spc_strs,
+        ioparser.spc.species_dictionary, *spc_strs, 'csv',
+        cache_dir=cache_dir)
+    pes_dct = _cached(
+        cache, 'pes', (inp_strs['mech'],) + spc_strs,
+        ioparser.mech.pes_dictionary, inp_strs['mech'], 'chemkin', spc_dct,
+        cache_dir=cache_dir)
+
+    pes_rlst, spc_rlst = ioparser.rlst.run_lst(
+        pes_dct, spc_dct, pes_idx_dct, spc_idx_dct)
+
+    return {
+        'thy': thy_dct,
+        'kmod': kmod_dct,
+        'smod': smod_dct,
+        'inp_key': inp_key_dct,
+        'tsk_lst': tsk_lst_dct,
+        'spc': spc_dct,
+        'glob': glob_dct,
+        'pes': pes_dct,
+        'pes_rlst': pes_rlst,
+        'spc_rlst': spc_rlst
+    }
+
+
+def run(job_path, inp_dct, plan=False):
+    """ Run all of the drivers requested in the run.dat file.
+
+        :param job_path: directory with the inp/ and data/ input files
+        :type job_path: str
+        :param inp_dct: parsed input built by `parse_input`
+        :type inp_dct: dict[str: obj]
+        :param plan: only print the pending electronic structure jobs
+        :type plan: bool
+    """
+
+    thy_dct, kmod_dct, smod_dct = (
+        inp_dct['thy'], inp_dct['kmod'], inp_dct['smod'])
+    inp_key_dct, tsk_lst_dct = inp_dct['inp_key'], inp_dct['tsk_lst']
+    spc_dct, glob_dct = inp_dct['spc'], inp_dct['glob']
+    pes_rlst, spc_rlst = inp_dct['pes_rlst'], inp_dct['spc_rlst']
+    run_prefix = inp_key_dct['run_prefix']
+    save_prefix = inp_key_dct['save_prefix']
+
+    # Report the pending jobs for a dry run, without touching the filesystem
+    es_tsks = tsk_lst_dct.get('es')
+    if plan:
+        if es_tsks is not None:
+            ioprinter.program_header('es')
+            drivers.esdriver.plan(
+                pes_rlst, spc_rlst,
+                es_tsks,
+                spc_dct, glob_dct, thy_dct,
+                run_prefix, save_prefix
+            )
+        return
+
+    # Build the Run-Save Filesystem Directories
+    prefix_fs(run_prefix, save_prefix)
+
+    # Run Drivers Requested by User
+    therm_tsks = tsk_lst_dct.get('thermo')
+    ktp_tsks = tsk_lst_dct.get('ktp')
+    if inp_key_dct['pipeline']:
+        # Run thermo and kinetics work as soon as its ES tasks have finished
+        ioprinter.program_header('es')
+        with es_runner.time_limits(inp_key_dct['es_time_limit']):
+            drivers.pipedriver.run(
+                pes_rlst, spc_rlst,
+                tsk_lst_dct,
+                spc_dct, glob_dct, thy_dct,
+                kmod_dct, smod_dct,
+                run_prefix, save_prefix, job_path,
+                njobs=inp_key_dct['es_njobs']
+            )
+        ioprinter.program_exit('es')
+        es_tsks, therm_tsks, ktp_tsks = None, None, None
+
+    if es_tsks is not None:
+        ioprinter.program_header('es')
+        with es_runner.time_limits(inp_key_dct['es_time_limit']):
+            drivers.esdriver.run(
+                pes_rlst, spc_rlst,
+                es_tsks,
+                spc_dct, glob_dct, thy_dct,
+                run_prefix, save_prefix,
+                scheduler=inp_key_dct['es_scheduler'],
+                njobs=inp_key_dct['es_njobs']
+            )
+        ioprinter.program_exit('es')
+
+    if therm_tsks is not None:
+        ioprinter.program_header('thermo')
+        drivers.thermodriver.run(
+            pes_rlst, spc_rlst,
+            therm_tsks,
+            kmod_dct, smod_dct,
+            spc_dct,
+            run_prefix, save_prefix, job_path,
+            njobs=inp_key_dct['therm_njobs']
         )
-    ioprinter.program_exit('trans')
-
-KTP_TSKS = TSK_LST_DCT.get('ktp')
-if KTP_TSKS is not None:
-    ioprinter.program_header('ktp')
-    ktpdriver.run(
-        PES_RLST,
-        KTP_TSKS,
-        SPC_DCT, GLOB_DCT,
-        KMOD_DCT, SMOD_DCT,
-        INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix'], JOB_PATH
-    )
-    ioprinter.program_exit('ktp')
-
-PROC_TSKS = TSK_LST_DCT.get('proc')
-if PROC_TSKS is not None:
-    ioprinter.program_header('proc')
-    PES_IDX = None
-    procdriver.run(
-        PES_RLST, SPC_RLST,
-        PROC_TSKS,
-        SPC_DCT,
-        KMOD_DCT, SMOD_DCT, THY_DCT,
-        INP_KEY_DCT['run_prefix'], INP_KEY_DCT['save_prefix']
-    )
-    ioprinter.program_exit('proc')
-
-# Exit Program
-ioprinter.obj('vspace')
-ioprinter.program_exit('amech')
+        ioprinter.program_exit('thermo')
+
+    trans_tsks = tsk_lst_dct.get('trans')
+    if trans_tsks is not None:
+        ioprinter.program_header('trans')
+        if inp_dct['pes']:
+            drivers.transdriver.run(
+                pes_rlst, spc_rlst,
+                trans_tsks,
+                smod_dct,
+                spc_dct, thy_dct,
+                run_prefix, save_prefix
+            )
+        ioprinter.program_exit('trans')
+
+    if ktp_tsks is not None:
+        ioprinter.program_header('ktp')
+        drivers.ktpdriver.run(
+            pes_rlst,
+            ktp_tsks,
+            spc_dct, glob_dct,
+            kmod_dct, smod_dct,
+            run_prefix, save_prefix, job_path,
+            njobs=inp_key_dct['ktp_njobs']
+        )
+        ioprinter.program_exit('ktp')
+
+    proc_tsks = tsk_lst_dct.get('proc')
+    if proc_tsks is not None:
+        ioprinter.program_header('proc')
+        drivers.procdriver.run(
+            pes_rlst, spc_rlst,
+            proc_tsks,
+            spc_dct,
+            kmod_dct, smod_dct, thy_dct,
+            run_prefix, save_prefix
+        )
+        ioprinter.program_exit('proc')
+
+
+def _cached(cache, name, inp_strs, function, *args, **kwargs):
+    """ Call a parsing function, or reuse its result from the cache if
+        the input strings it depends on are unchanged
+    """
+
+    key = hashlib.sha1(
+        json.dumps(inp_strs, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    if cache.get(name, (None,))[0] != key:
+        cache[name] = (key, function(*args, **kwargs))
+    else:
+        ioprinter.info_message(
+            'Reusing parsed {} input, unchanged since last run'.format(name))
+
+    return cache[name][1]
+
+
+def main():
+    """ Parse the input of the job directory given on the command line
+        and run the requested drivers
+    """
+
+    # Set runtime options based on user input
+    parser = argparse.ArgumentParser(
+        description='Run the MechDriver workflow for an input directory')
+    parser.add_argument(
+        'job_path', help='directory with the inp/ and data/ input files')
+    parser.add_argument(
+        '--plan', action='store_true',
+        help='print the pending electronic structure jobs and their '
+             'estimated cost without running anything')
+    args = parser.parse_args()
+
+    # Print the header message and host name
+    ioprinter.program_header('amech')
+    ioprinter.random_cute_animal()
+    ioprinter.host_name()
+
+    inp_dct = parse_input(args.job_path)
+    run(args.job_path, inp_dct, plan=args.plan)
+
+    # Exit Program
+    ioprinter.obj('vspace')
+    ioprinter.program_exit('amech')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+""" Benchmark the uniqueness checks of new conformers against a large set
+    of saved conformers, with and without the conformer fingerprint index.
+
+    A set of synthetic conformers of one species is built by displacing
+    the atoms of a reference structure at random, each given an energy
+    within a narrow window so that many of them share energy bins. The
+    conformers checked against them are half copies of saved conformers
+    (rotated, with a shift of the energy below the threshold) and half
+    new ones. Each is checked for uniqueness as in conformer sampling:
+        scan: against every saved conformer, as before the index
+        index: against the candidates found with the index
+    The time to build the index from the saved conformers is also given,
+    and the decisions of both checks are compared.
+
+    Usage:
+        python cnf_index_benchmark.py [-n NSAVED] [-q NQUERY] [-s SEED]
+"""
+
+import time
+import argparse
+import numpy
+from mechlib.filesys import fingerprint
+from mechroutines.es._routines.conformer import _geo_unique
+from mechroutines.es._routines.conformer import _sym_unique
+
+
+# Reference structure (bohr) the synthetic conformers are displaced from
+REF_SYMBS = ('C',) * 6 + ('H',) * 14
+DISP = 0.3
+ENE_REF = -235.0
+ENE_WINDOW = 0.02
+
+
+def synthetic_conformers(nconfs, rng):
+    """ Build a set of synthetic conformers
+
+        :param nconfs: number of conformers
+        :type nconfs: int
+        :param rng: random number generator
+        :type rng: numpy.random.RandomState
+        :returns: geometries and energies of the conformers
+        :rtype: (list(automol geometry data structure), list(float))
+    """
+
+    ref_xyzs = rng.uniform(-4.0, 4.0, size=(len(REF_SYMBS), 3))
+    geos, enes = [], []
+    for _ in range(nconfs):
+        xyzs = ref_xyzs + rng.normal(0.0, DISP, size=ref_xyzs.shape)
+        geos.append(_geometry(xyzs))
+        enes.append(ENE_REF + rng.uniform(0.0, ENE_WINDOW))
+
+    return geos, enes
+
+
+def queries(geos, enes, nquery, rng):
+    """ Build the conformers checked against the saved ones: half copies
+        of saved conformers, half new ones
+    """
+
+    new_geos, new_enes = synthetic_conformers(nquery - nquery // 2, rng)
+    for idx in rng.choice(len(geos), size=nquery // 2, replace=False):
+        rot, _ = numpy.linalg.qr(rng.normal(size=(3, 3)))
+        xyzs = numpy.array([xyz for _, xyz in geos[idx]]) @ rot
+        new_geos.append(_geometry(xyzs))
+        new_enes.append(enes[idx] + rng.uniform(-1e-6, 1e-6))
+
+    return new_geos, new_enes
+
+
+def check_scan(geo, ene, saved_geos, saved_enes):
+    """ Check a conformer against every saved conformer
+    """
+    unique = _geo_unique(geo, ene, saved_geos, saved_enes)
+    return unique and _sym_unique(geo, ene, saved_geos, saved_enes) is None
+
+
+def check_index(geo, ene, idx, saved_geos):
+    """ Check a conformer against the candidates found with the index
+    """
+
+    geo_entries = fingerprint.candidates(idx, ene)
+    unique = _geo_unique(
+        geo, ene, [saved_geos[entry['locs'][0]] for entry in geo_entries],
+        [entry['ene'] for entry in geo_entries])
+    if unique:
+        sym_entries = fingerprint.candidates(
+            idx, ene, spec=fingerprint.spectrum(geo))
+        unique = _sym_unique(
+            geo, ene, [saved_geos[entry['locs'][0]] for entry in sym_entries],
+            [entry['ene'] for entry in sym_entries]) is None
+
+    return unique
+
+
+def main():
+    """ Run the benchmark and print the timings
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark conformer uniqueness checks')
+    parser.add_argument('-n', '--nsaved', type=int, default=10000,
+                        help='number of saved conformers')
+    parser.add_argument('-q', '--nquery', type=int, default=200,
+                        help='number of conformers checked')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='seed of the random number generator')
+    args = parser.parse_args()
+
+    rng = numpy.random.RandomState(args.seed)
+    saved_geos, saved_enes = synthetic_conformers(args.nsaved, rng)
+    new_geos, new_enes = queries(saved_geos, saved_enes, args.nquery, rng)
+
+    start = time.perf_counter()
+    idx = fingerprint.build(
+        {'locs': [i], 'ene': ene, 'spec': fingerprint.spectrum(geo)}
+        for i, (geo, ene) in enumerate(zip(saved_geos, saved_enes)))
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan_vals = [check_scan(geo, ene, saved_geos, saved_enes)
+                 for geo, ene in zip(new_geos, new_enes)]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_vals = [check_index(geo, ene, idx, saved_geos)
+                  for geo, ene in zip(new_geos, new_enes)]
+    index_time = time.perf_counter() - start
+
+    print('{} saved conformers, {} checked ({} unique)'.format(
+        args.nsaved, args.nquery, sum(index_vals)))
+    print('{:<22s}{:>10.3f} s'.format('Index build', build_time))
+    for name, check_time in (('Scan checks', scan_time),
+                             ('Index checks', index_time)):
+        print('{:<22s}{:>10.3f} s {:>10.3f} ms/check'.format(
+            name, check_time, 1000.0 * check_time / args.nquery))
+    print('Decisions that differ: {}'.format(
+        sum(1 for val1, val2 in zip(scan_vals, index_vals) if val1 != val2)))
+
+
+def _geometry(xyzs):
+    """ Geometry of the reference species with the given coordinates
+    """
+    return tuple((symb, tuple(map(float, xyz)))
+                 for symb, xyz in zip(REF_SYMBS, xyzs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+""" Report the cost of the runs of electronic structure and helper
+    programs recorded in the telemetry file of a run filesystem, grouped
+    by species, PES, task, theory level and program.
+
+    The report is used to judge which models and levels of theory are
+    affordable when scaled up to a full mechanism.
+
+    Usage:
+        python cost_report.py RUN_PREFIX [--by spc pes tsk thy prog]
+                              [--top N]
+"""
+
+import argparse
+from mechlib.amech_io.runner import telemetry
+
+
+COLUMN_LABELS = (
+    ('nruns', 'Runs', '{:>8d}'),
+    ('wall_hours', 'Wall h', '{:>10.2f}'),
+    ('cpu_hours', 'CPU h', '{:>10.2f}'),
+    ('core_hours', 'Core h', '{:>10.2f}'),
+    ('max_rss_mb', 'Peak MB', '{:>10.0f}')
+)
+
+GROUP_NAMES = {
+    'spc': 'Species',
+    'pes': 'PES',
+    'tsk': 'Task',
+    'thy': 'Theory level',
+    'prog': 'Program'
+}
+
+
+def report(records, key, top=None):
+    """ Build the table of the cost of the runs grouped by a label,
+        most expensive (in core hours) first.
+
+        :param records: records read from a telemetry file
+        :type records: tuple(dict[str: obj])
+        :param key: label to group the runs by
+        :type key: str
+        :param top: number of most expensive groups to show (all if None)
+        :type top: int
+        :rtype: str
+    """
+
+    sum_dct = telemetry.summarize(records, key)
+    grps = sorted(sum_dct.items(), key=lambda itm: -itm[1]['core_hours'])
+    if top is not None:
+        grps = grps[:top]
+
+    name_len = max([len(GROUP_NAMES[key])] +
+                   [len(str(name)) for name, _ in grps]) + 2
+    lines = [
+        'Cost by {}'.format(GROUP_NAMES[key].lower()),
+        '{:<{}s}'.format(GROUP_NAMES[key], name_len) + ''.join(
+            '{:>{}s}'.format(lbl, 8 if col == 'nruns' else 10)
+            for col, lbl, _ in COLUMN_LABELS)
+    ]
+    for name, grp in grps:
+        # Groups whose runs have no peak memory show a dash
+        cells = [fmt.format(grp[col]) if grp[col] is not None
+                 else '{:>10s}'.format('-')
+                 for col, _, fmt in COLUMN_LABELS]
+        lines.append('{:<{}s}'.format(str(name), name_len) + ''.join(cells))
+
+    return '\n'.join(lines)
+
+
+def main():
+    """ Read the telemetry of a run filesystem and print the report
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Report the cost of the runs in a run filesystem')
+    parser.add_argument(
+        'run_prefix', help='root of the run filesystem')
+    parser.add_argument(
+        '--by', nargs='+', default=list(telemetry.GROUP_KEYS),
+        choices=telemetry.GROUP_KEYS,
+        help='labels to group the runs by, one table for each')
+    parser.add_argument(
+        '--top', type=int, default=None,
+        help='number of most expensive groups to show in each table')
+    args = parser.parse_args()
+
+    records = telemetry.read(args.run_prefix)
+    if not records:
+        print('No runs recorded in {}'.format(args.run_prefix))
+        return
+
+    total = telemetry.summarize(records, 'host')
+    print('{} runs, {:.2f} core hours in total\n'.format(
+        sum(grp['nruns'] for grp in total.values()),
+        sum(grp['core_hours'] for grp in total.values())))
+    for key in args.by:
+        print(report(records, key, top=args.top))
+        print()
+
+
+if __name__ == '__main__':
+    main()
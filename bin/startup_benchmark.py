@@ -0,0 +1,130 @@
+""" Benchmark the cold-start time of MechDriver: the wall time from
+    launching a fresh Python interpreter to the point where the first
+    driver is ready to run its tasks.
+
+    Each measurement runs in a new interpreter so that no modules are
+    cached between repeats. The stages timed are:
+        interpreter: starting Python alone
+        parse: importing the input parser and reading the inputs in the
+               job directory, as done by automech.py before any driver
+        first task: parse, then importing the drivers for the task blocks
+                    present in the run.dat file
+        all drivers: parse, then importing every driver, as automech.py
+                     did before the drivers were loaded lazily
+
+    Usage:
+        python startup_benchmark.py JOB_PATH [-n REPEATS]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+# Driver loaded for each block of tasks in the run.dat file
+TSK_DRIVER_DCT = {
+    'es': 'esdriver',
+    'thermo': 'thermodriver',
+    'trans': 'transdriver',
+    'ktp': 'ktpdriver',
+    'proc': 'procdriver'
+}
+
+PARSE_STR = """
+import sys
+from mechlib.amech_io import parser as ioparser
+
+JOB_PATH = sys.argv[1]
+INP_STRS = ioparser.read_amech_input(JOB_PATH)
+THY_DCT = ioparser.thy.theory_dictionary(INP_STRS['thy'])
+KMOD_DCT, SMOD_DCT = ioparser.models.models_dictionary(
+    INP_STRS['mod'], THY_DCT)
+INP_KEY_DCT = ioparser.run.input_dictionary(INP_STRS['run'])
+TSK_LST_DCT = ioparser.run.tasks(INP_STRS['run'], THY_DCT)
+SPC_DCT, GLOB_DCT = ioparser.spc.species_dictionary(
+    INP_STRS['spc'], INP_STRS['dat'], INP_STRS['geo'], 'csv')
+PES_DCT = ioparser.mech.pes_dictionary(
+    INP_STRS['mech'], 'chemkin', SPC_DCT)
+"""
+
+FIRST_TASK_STR = PARSE_STR + """
+import drivers
+for tsk, driver in {}.items():
+    if TSK_LST_DCT.get(tsk) is not None:
+        getattr(drivers, driver)
+""".format(TSK_DRIVER_DCT)
+
+ALL_DRIVERS_STR = PARSE_STR + """
+import drivers
+for driver in drivers.__all__:
+    getattr(drivers, driver)
+"""
+
+STAGE_DCT = {
+    'interpreter': 'pass',
+    'parse': PARSE_STR,
+    'first task': FIRST_TASK_STR,
+    'all drivers': ALL_DRIVERS_STR
+}
+
+
+def time_stage(code_str, job_path, nrepeat):
+    """ Time a block of code run in a fresh interpreter several times.
+
+        :param code_str: Python code to run
+        :type code_str: str
+        :param job_path: directory with the MechDriver inputs
+        :type job_path: str
+        :param nrepeat: number of times to run the code
+        :type nrepeat: int
+        :returns: wall times of each run (s)
+        :rtype: list(float)
+    """
+
+    # Run from the top of the repository so the local packages are used
+    root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root_path] + ([env['PYTHONPATH']] if 'PYTHONPATH' in env else []))
+    # Skip writing bytecode so every repeat does the same work
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    times = []
+    for _ in range(nrepeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', code_str, job_path],
+            env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def main():
+    """ Time each stage and print the results
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Time the cold start of MechDriver up to its first task')
+    parser.add_argument(
+        'job_path', help='directory with the inp/ and data/ input files')
+    parser.add_argument(
+        '-n', '--nrepeat', type=int, default=5,
+        help='number of fresh interpreters to time for each stage')
+    args = parser.parse_args()
+
+    job_path = os.path.abspath(args.job_path)
+    print('Cold-start times over {} runs (s)'.format(args.nrepeat))
+    print('{:<14s}{:>10s}{:>10s}{:>10s}'.format(
+        'Stage', 'Min', 'Median', 'Max'))
+    for stage, code_str in STAGE_DCT.items():
+        times = time_stage(code_str, job_path, args.nrepeat)
+        print('{:<14s}{:>10.3f}{:>10.3f}{:>10.3f}'.format(
+            stage, min(times), statistics.median(times), max(times)))
+
+
+if __name__ == '__main__':
+    main()
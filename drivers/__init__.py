@@ -2,11 +2,7 @@
  Libraries for the drivers
 """
 
-from drivers import esdriver
-from drivers import thermodriver
-from drivers import ktpdriver
-from drivers import transdriver
-from drivers import procdriver
+import importlib
 
 
 __all__ = [
@@ -14,5 +10,17 @@ __all__ = [
     'thermodriver',
     'ktpdriver',
     'transdriver',
-    'procdriver'
+    'procdriver',
+    'pipedriver'
 ]
+
+
+def __getattr__(name):
+    """ Import the drivers only when first accessed (PEP 562), so that
+        a run only loads the drivers (and their dependencies) for the task
+        blocks in its input
+    """
+    if name in __all__:
+        return importlib.import_module('drivers.' + name)
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
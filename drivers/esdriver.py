@@ -12,15 +12,20 @@
         (3) Write final data into save filesystem
 """
 
+import functools
 from mechroutines.es import run_tsk
+from mechroutines.es import plan as es_plan
+from mechlib import filesys
 from mechlib.amech_io import parser
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
 
 
 def run(pes_rlst, spc_rlst,
         es_tsk_lst,
         spc_dct, glob_dct, thy_dct,
-        run_prefix, save_prefix):
+        run_prefix, save_prefix,
+        scheduler='serial', njobs=1):
     """ Executes all electronic structure tasks.
 
         :param pes_rlst: species from PESs to run
@@ -45,8 +50,21 @@ def run(pes_rlst, spc_rlst,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :param scheduler: order tasks are run in: `serial` runs each task
+            for all species in turn, `dag` runs each (species, task) pair
+            as soon as the tasks it depends on are complete
+        :type scheduler: str
+        :param njobs: number of (species, task) pairs run concurrently
+            by the `dag` scheduler
+        :type njobs: int
     """
 
+    if scheduler == 'dag':
+        _run_dag(pes_rlst, spc_rlst, es_tsk_lst,
+                 spc_dct, glob_dct, thy_dct,
+                 run_prefix, save_prefix, njobs)
+        return
+
     # -------------------------------- #
     # RUN THE REQUESTED ESDRIVER TASKS #
     # -------------------------------- #
@@ -55,6 +73,9 @@ def run(pes_rlst, spc_rlst,
     # Runs through PESs, then SPC
     run_rlst = parser.rlst.combine(pes_rlst, spc_rlst)
 
+    # Species that have run a task not found in the journal
+    ran = set()
+
     for (fml, pes_idx, subpes_idx), run_lst in run_rlst.items():
 
         # Print what is being run PESs that are being run
@@ -90,6 +111,295 @@ def run(pes_rlst, spc_rlst,
 
             # Run the electronic structure task for all spc in queue
             for spc_name in obj_queue:
-                run_tsk(tsk, spc_dct, spc_name,
-                        thy_dct, es_keyword_dct,
-                        run_prefix, save_prefix)
+                if _in_journal(tsk, spc_dct, spc_name,
+                               thy_dct, es_keyword_dct,
+                               save_prefix, ran):
+                    continue
+                ran.add(spc_name)
+                _run_and_record(tsk, spc_dct, spc_name,
+                                thy_dct, es_keyword_dct,
+                                run_prefix, save_prefix)
+
+
+def plan(pes_rlst, spc_rlst,
+         es_tsk_lst,
+         spc_dct, glob_dct, thy_dct,
+         run_prefix, save_prefix):
+    """ Print the electronic structure jobs that remain to be run for all
+        of the requested tasks along with an estimate of their cost,
+        without running any jobs.
+
+        The counts are read from the save filesystem; where a task relies on
+        the results of an earlier task that has not been run, the counts
+        are estimates (see mechroutines.es.plan).
+
+        :param pes_rlst: species from PESs to run
+            [(PES formula, PES idx, SUP-PES idx)
+            (CHANNEL idx, (REACS, PRODS))
+        :type pes_rlst: tuple(dict[str: dict])
+        :param spc_rlst: lst of species to run
+        :type spc_rlst: tuple(dict[str: dict])
+        :param es_tsk_lst: list of the electronic structure tasks
+            tuple(tuple(obj, tsk, keyword_dict))
+        :type es_tsk_lst: tuple(tuple(str, str, dict))
+        :param spc_dct: species information
+            dict[spc_name: spc_information]
+        :type spc_dct: dict[str:dict]
+        :param glob_dct: global information for all species
+            dict[spc_name: spc_information]
+        :type glob_dct: dict[str: dict]
+        :param thy_dct: all of the theory information
+            dict[thy name: inf]
+        :type thy_dct: dict[str:dict]
+        :param run_prefix: root-path to the run-filesystem
+        :type run_prefix: str
+        :param save_prefix: root-path to the save-filesystem
+        :type save_prefix: str
+        :returns: job counts and cost for each (species, task index)
+        :rtype: dict[tuple: (dict[str: int], float)]
+    """
+
+    _, node_dct, spc_dct = task_graph(
+        pes_rlst, spc_rlst, es_tsk_lst,
+        spc_dct, glob_dct, thy_dct,
+        run_prefix, save_prefix)
+
+    plan_dct = {}
+    for (spc_name, tsk_idx), (tsk, es_keyword_dct) in node_dct.items():
+        key = filesys.journal.unit_key(
+            spc_name, spc_dct[spc_name], tsk, es_keyword_dct, thy_dct)
+        if filesys.journal.is_complete(save_prefix, key):
+            cnts = dict.fromkeys(es_plan.JOB_TYPES, 0)
+        else:
+            cnts = es_plan.plan_tsk(
+                tsk, spc_dct, spc_name, thy_dct, es_keyword_dct,
+                run_prefix, save_prefix)
+        tsk_cost = es_plan.cost(
+            cnts, spc_dct[spc_name], thy_dct.get(es_keyword_dct['runlvl']))
+        plan_dct[(spc_name, tsk_idx)] = (cnts, tsk_cost)
+
+    # Print the table of pending jobs and the totals
+    head = '{:<28s}{:<14s}'.format('Species', 'Task')
+    head += ''.join('{:>7s}'.format(typ) for typ in es_plan.JOB_TYPES)
+    head += '{:>12s}'.format('Cost')
+    print('\nPending electronic structure jobs:')
+    print(head)
+    print('-'*len(head))
+    tot_cnts, tot_cost = dict.fromkeys(es_plan.JOB_TYPES, 0), 0.0
+    for (spc_name, tsk_idx), (cnts, tsk_cost) in plan_dct.items():
+        line = '{:<28s}{:<14s}'.format(
+            spc_name, node_dct[(spc_name, tsk_idx)][0])
+        line += ''.join('{:>7d}'.format(cnts[typ])
+                        for typ in es_plan.JOB_TYPES)
+        line += '{:>12.1f}'.format(tsk_cost)
+        print(line)
+        for typ in es_plan.JOB_TYPES:
+            tot_cnts[typ] += cnts[typ]
+        tot_cost += tsk_cost
+    print('-'*len(head))
+    line = '{:<42s}'.format('Total')
+    line += ''.join('{:>7d}'.format(tot_cnts[typ])
+                    for typ in es_plan.JOB_TYPES)
+    line += '{:>12.1f}'.format(tot_cost)
+    print(line)
+    print('Costs are relative to a single-point energy with 100 basis '
+          'functions and a method scaling as N^3')
+
+    return plan_dct
+
+
+# JOURNAL OF COMPLETED TASKS
+def _in_journal(tsk, spc_dct, spc_name, thy_dct, es_keyword_dct,
+                save_prefix, ran):
+    """ Assess if a task for a species can be skipped as it is recorded
+        in the journal of completed tasks.
+
+        A task is only skipped if neither the species nor (for a TS) any of
+        its reactants and products have run a task this session, since
+        running an earlier task may have changed what the task is built on.
+    """
+
+    spc_names = (spc_name,)
+    if 'ts_' in spc_name:
+        spc_names += (tuple(spc_dct[spc_name].get('reacs', ())) +
+                      tuple(spc_dct[spc_name].get('prods', ())))
+
+    skip = False
+    if not es_keyword_dct.get('overwrite') and not ran & set(spc_names):
+        key = filesys.journal.unit_key(
+            spc_name, spc_dct[spc_name], tsk, es_keyword_dct, thy_dct)
+        skip = filesys.journal.is_complete(save_prefix, key)
+        if skip:
+            ioprinter.info_message(
+                'Task {} for {} found complete in journal. Skipping...'
+                .format(tsk, spc_name))
+
+    return skip
+
+
+def _run_and_record(tsk, spc_dct, spc_name,
+                    thy_dct, es_keyword_dct,
+                    run_prefix, save_prefix):
+    """ Run a task for a species, recording it in the journal if complete.
+
+        Skipped tasks are not recorded, but do not hold back the tasks
+        depending on them.
+    """
+
+    with iorunner.telemetry.labels(prefix=run_prefix, spc=spc_name, tsk=tsk,
+                                   thy=es_keyword_dct.get('runlvl')):
+        complete = run_tsk(tsk, spc_dct, spc_name,
+                           thy_dct, es_keyword_dct,
+                           run_prefix, save_prefix)
+    if complete:
+        key = filesys.journal.unit_key(
+            spc_name, spc_dct[spc_name], tsk, es_keyword_dct, thy_dct)
+        filesys.journal.record(save_prefix, key, spc_name, tsk)
+
+    return complete is not False
+
+
+# DAG SCHEDULER
+def _run_dag(pes_rlst, spc_rlst,
+             es_tsk_lst,
+             spc_dct, glob_dct, thy_dct,
+             run_prefix, save_prefix, njobs):
+    """ Executes all electronic structure tasks as a dependency graph
+        of (species, task) nodes, where independent nodes are run
+        concurrently by a pool of `njobs` processes.
+
+        The tasks for each species are run in the order given in the
+        run.dat file. A task for a transition state additionally waits on
+        all of the earlier tasks for the reactants and products.
+    """
+
+    dep_dct, node_dct, spc_dct = task_graph(
+        pes_rlst, spc_rlst, es_tsk_lst,
+        spc_dct, glob_dct, thy_dct,
+        run_prefix, save_prefix, skip_journaled=True)
+
+    print('\nRunning {} electronic structure tasks '
+          'with {} concurrent job(s)'.format(len(dep_dct), njobs))
+
+    worker = functools.partial(
+        run_node, node_dct, spc_dct, thy_dct, run_prefix, save_prefix)
+    stat_dct = iorunner.run_graph(dep_dct, worker, njobs=njobs)
+
+    failed = tuple(node for node, stat in stat_dct.items() if not stat)
+    if failed:
+        print('\nElectronic structure tasks that failed or were skipped:')
+        for (spc_name, tsk_idx) in failed:
+            print('  {} {}'.format(spc_name, node_dct[(spc_name, tsk_idx)][0]))
+
+
+def task_graph(pes_rlst, spc_rlst,
+               es_tsk_lst,
+               spc_dct, glob_dct, thy_dct,
+               run_prefix, save_prefix, skip_journaled=False):
+    """ Build the dependency graph of (species name, task index) nodes
+        for all species and transition states in the run lists.
+
+        A node appears only once even if the species is on several PESs.
+        As the TS names are unique to each PES, the spc_dct returned holds
+        the TSs from all of the PESs.
+
+        If `skip_journaled` is set, the nodes recorded as complete in the
+        journal are removed from the dependency dct (but not the node dct).
+
+        :returns: (dependency dct, dct of node tasks, species dct)
+        :rtype: (dict[tuple: tuple], dict[tuple: (str, dict)], dict)
+    """
+
+    dep_dct, node_dct = {}, {}
+    full_spc_dct = {}
+
+    run_rlst = parser.rlst.combine(pes_rlst, spc_rlst)
+    for (fml, pes_idx, subpes_idx), run_lst in run_rlst.items():
+
+        ioprinter.runlst((fml, pes_idx, subpes_idx), run_lst)
+
+        if (fml != 'SPC' and
+           any(tsk_lst[0] in ('ts', 'all') for tsk_lst in es_tsk_lst)):
+            ts_dct, ts_queue = parser.spc.ts_dct_from_estsks(
+                pes_idx, es_tsk_lst, run_lst,
+                thy_dct, spc_dct,
+                run_prefix, save_prefix)
+            spc_dct = parser.spc.combine_sadpt_spc_dcts(
+                ts_dct, spc_dct, glob_dct)
+        else:
+            ts_queue = ()
+        full_spc_dct.update(spc_dct)
+
+        spc_queue = parser.rlst.spc_queue(run_lst, fml)
+        for tsk_idx, (obj, tsk, es_keyword_dct) in enumerate(es_tsk_lst):
+
+            if obj == 'all':
+                obj_queue = spc_queue + ts_queue
+            elif obj == 'spc':
+                obj_queue = spc_queue
+            elif obj == 'ts':
+                obj_queue = ts_queue
+            else:
+                obj_queue = ()
+
+            for spc_name in obj_queue:
+                node = (spc_name, tsk_idx)
+                if node in dep_dct:
+                    continue
+
+                # Earlier task for the species, and its reactants/products
+                deps = _last_node(dep_dct, spc_name, tsk_idx)
+                if 'ts_' in spc_name:
+                    rgts = (tuple(spc_dct[spc_name]['reacs']) +
+                            tuple(spc_dct[spc_name]['prods']))
+                    for rgt in rgts:
+                        deps += _last_node(dep_dct, rgt, tsk_idx)
+
+                dep_dct[node] = tuple(dict.fromkeys(deps))
+                node_dct[node] = (tsk, es_keyword_dct)
+
+    if skip_journaled:
+        dep_dct = _prune_journaled(dep_dct, node_dct, full_spc_dct, thy_dct,
+                                   save_prefix)
+
+    return dep_dct, node_dct, full_spc_dct
+
+
+def _prune_journaled(dep_dct, node_dct, spc_dct, thy_dct, save_prefix):
+    """ Remove the nodes from the graph which are recorded as complete in
+        the journal, provided all of the nodes they depend on are as well.
+    """
+
+    pruned = set()
+    for node, deps in dep_dct.items():
+        spc_name, _ = node
+        tsk, es_keyword_dct = node_dct[node]
+        if all(dep in pruned for dep in deps):
+            if _in_journal(tsk, spc_dct, spc_name, thy_dct, es_keyword_dct,
+                           save_prefix, set()):
+                pruned.add(node)
+
+    return {node: tuple(dep for dep in deps if dep not in pruned)
+            for node, deps in dep_dct.items() if node not in pruned}
+
+
+def _last_node(dep_dct, spc_name, tsk_idx):
+    """ Get the node of the last task prior to `tsk_idx` for a species
+        that is already in the graph, as a tuple of length 0 or 1.
+    """
+    prev_idxs = tuple(idx for (name, idx) in dep_dct
+                      if name == spc_name and idx < tsk_idx)
+    return ((spc_name, max(prev_idxs)),) if prev_idxs else ()
+
+
+def run_node(node_dct, spc_dct, thy_dct, run_prefix, save_prefix, node):
+    """ Run the task for a single (species, task index) node of the graph
+        built by `task_graph`, recording it in the journal if complete.
+
+        :rtype: bool
+    """
+    spc_name, _ = node
+    tsk, es_keyword_dct = node_dct[node]
+    return _run_and_record(tsk, spc_dct, spc_name,
+                           thy_dct, es_keyword_dct,
+                           run_prefix, save_prefix)
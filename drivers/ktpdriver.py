@@ -11,6 +11,9 @@
         (6) Write functional forms to mechanism file
 """
 
+import os
+import json
+import functools
 import autorun
 import ratefit
 from mechroutines import ktp as ktproutines
@@ -19,16 +22,28 @@ from mechlib.amech_io import parser
 from mechlib.amech_io import job_path
 from mechlib.amech_io import output_path
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
 from mechlib.reaction import split_unstable_pes
 
 
+# Fitted rates of each PES written into its MESS directory for the merge
+CKIN_NAME = 'rates.ckin.json'
+
+
 def run(pes_rlst,
         ktp_tsk_lst,
         spc_dct, glob_dct,
         pes_mod_dct, spc_mod_dct,
-        run_prefix, save_prefix, mdriver_path):
+        run_prefix, save_prefix, mdriver_path,
+        njobs=1):
     """ Executes all kinetics tasks.
 
+        The PESs (and sub-PESs) are independent of one another, so they
+        may be run concurrently by a pool of `njobs` processes, starting
+        with the PESs with the most channels. The fitted rates of each
+        PES are merged into the CKIN files once all PESs have finished,
+        in the order the PESs appear in `pes_rlst`.
+
         :param pes_rlst: species from PESs to run
         :type pes_rlst: tuple(dict[str: dict])
         :param spc_rlst: lst of species to run
@@ -47,49 +62,93 @@ def run(pes_rlst,
         :type save_prefix: str
         :param mdriver_path: path where mechdriver is running
         :type mdriver_path: str
+        :param njobs: number of PESs run concurrently
+        :type njobs: int
     """
 
     # --------------------------------------- #
     # LOOP OVER ALL OF THE SUBPES in PES_RLST #
     # --------------------------------------- #
 
-    for pes_inf, rxn_lst in pes_rlst.items():
+    # Start the PESs with the most channels first, so that the largest
+    # MESS jobs do not hold up the end of the run
+    pes_infs = sorted(pes_rlst, key=lambda inf: -len(pes_rlst[inf]))
+    dep_dct = {pes_inf: () for pes_inf in pes_infs}
 
-        # ---------------------------------------------- #
-        # PREPARE INFORMATION TO PASS TO KTPDRIVER TASKS #
-        # ---------------------------------------------- #
+    worker = functools.partial(
+        _run_pes, pes_rlst, ktp_tsk_lst,
+        spc_dct, glob_dct,
+        pes_mod_dct, spc_mod_dct,
+        run_prefix, save_prefix)
+    with iorunner.telemetry.labels(prefix=run_prefix, tsk='ktp'):
+        stat_dct = iorunner.run_graph(dep_dct, worker, njobs=njobs)
+
+    failed = tuple(pes_inf for pes_inf in pes_rlst if not stat_dct[pes_inf])
+    if failed:
+        ioprinter.warning_message(
+            'Kinetics tasks failed for PESs {}'.format(failed))
+
+    # -------------------------------------- #
+    # MERGE THE FITTED RATES INTO CKIN FILES #
+    # -------------------------------------- #
+
+    if parser.run.extract_task('run_fits', ktp_tsk_lst) is not None:
+        ckin_path = output_path('CKIN', prefix=mdriver_path)
+        for pes_formula, ckin_dct in _merge_ckin(
+                pes_rlst, stat_dct, run_prefix).items():
+            writer.ckin.write_rxn_file(ckin_dct, pes_formula, ckin_path)
+
+
+def _run_pes(pes_rlst,
+             ktp_tsk_lst,
+             spc_dct, glob_dct,
+             pes_mod_dct, spc_mod_dct,
+             run_prefix, save_prefix,
+             pes_inf):
+    """ Run the kinetics tasks for a single PES (or sub-PES). The fitted
+        rates are written into the MESS directory of the PES to be merged
+        with those of the other PESs.
+    """
 
-        # Set objects
-        pes_formula, pes_idx, subpes_idx = pes_inf
-        label_dct = None
+    # ---------------------------------------------- #
+    # PREPARE INFORMATION TO PASS TO KTPDRIVER TASKS #
+    # ---------------------------------------------- #
 
-        # Print PES Channels that are being run
-        ioprinter.runlst(pes_inf, rxn_lst)
+    # Set objects
+    pes_formula, pes_idx, subpes_idx = pes_inf
+    rxn_lst = pes_rlst[pes_inf]
+    label_dct = None
+    pes_lbl = '{}'.format(pes_idx+1)
 
-        # Set paths where files will be written and read
-        mess_path = job_path(
-            run_prefix, 'MESS', 'RATE', pes_formula, locs_idx=subpes_idx)
+    # Print PES Channels that are being run
+    ioprinter.runlst(pes_inf, rxn_lst)
 
-        # --------------------------------- #
-        # RUN THE REQUESTED KTPDRIVER TASKS #
-        # --------------------------------- #
+    # Set paths where files will be written and read
+    mess_path = job_path(
+        run_prefix, 'MESS', 'RATE', pes_formula, locs_idx=subpes_idx)
+    _remove_ckin(mess_path)
 
-        # Write the MESS file
-        write_rate_tsk = parser.run.extract_task('write_mess', ktp_tsk_lst)
-        if write_rate_tsk is not None:
+    # --------------------------------- #
+    # RUN THE REQUESTED KTPDRIVER TASKS #
+    # --------------------------------- #
 
-            # Get all the info for the task
-            tsk_key_dct = write_rate_tsk[-1]
-            pes_mod = tsk_key_dct['kin_model']
-            spc_mod = tsk_key_dct['spc_model']
+    # Write the MESS file
+    write_rate_tsk = parser.run.extract_task('write_mess', ktp_tsk_lst)
+    if write_rate_tsk is not None:
 
-            spc_dct, rxn_lst, instab_chnls, label_dct = _process(
-                pes_idx, rxn_lst, ktp_tsk_lst, spc_mod_dct, spc_mod,
-                spc_dct, glob_dct, run_prefix, save_prefix)
+        # Get all the info for the task
+        tsk_key_dct = write_rate_tsk[-1]
+        pes_mod = tsk_key_dct['kin_model']
+        spc_mod = tsk_key_dct['spc_model']
 
-            ioprinter.messpf('write_header')
+        spc_dct, rxn_lst, instab_chnls, label_dct = _process(
+            pes_idx, rxn_lst, ktp_tsk_lst, spc_mod_dct, spc_mod,
+            spc_dct, glob_dct, run_prefix, save_prefix)
 
-            # Doesn't give full string
+        ioprinter.messpf('write_header')
+
+        # Doesn't give full string
+        with iorunner.telemetry.labels(pes=pes_lbl):
             mess_inp_str, dats = ktproutines.rates.make_messrate_str(
                 pes_idx, rxn_lst,
                 pes_mod, spc_mod,
@@ -99,64 +158,67 @@ def run(pes_rlst,
                 mess_path, run_prefix, save_prefix,
                 make_lump_well_inp=tsk_key_dct['lump_wells'])
 
-            autorun.write_input(
-                mess_path, mess_inp_str,
-                aux_dct=dats, input_name='mess.inp')
-
-        # Run mess to produce rates (currently nothing from tsk lst keys used)
-        run_rate_tsk = parser.run.extract_task('run_mess', ktp_tsk_lst)
-        if run_rate_tsk is not None:
-
-            ioprinter.obj('vspace')
-            ioprinter.obj('line_dash')
-            ioprinter.running('MESS for the input file', mess_path)
-            autorun.run_script(autorun.SCRIPT_DCT['messrate'], mess_path)
-
-        # Fit rate output to modified Arrhenius forms, print in ChemKin format
-        run_fit_tsk = parser.run.extract_task('run_fits', ktp_tsk_lst)
-        if run_fit_tsk is not None:
-
-            # Get all the info for the task
-            tsk_key_dct = run_fit_tsk[-1]
-            spc_mod = tsk_key_dct['spc_model']
-            pes_mod = tsk_key_dct['kin_model']
-            ratefit_dct = pes_mod_dct[pes_mod]['rate_fit']
-
-            if label_dct is None:
-                spc_dct, rxn_lst, _, label_dct = _process(
-                    pes_idx, rxn_lst, ktp_tsk_lst, spc_mod_dct, spc_mod,
-                    spc_dct, glob_dct, run_prefix, save_prefix)
-
-            ioprinter.obj('vspace')
-            ioprinter.obj('line_dash')
-            ioprinter.info_message(
-                'Fitting Rate Constants for PES to Functional Forms',
-                newline=1)
-
-            # Read and fit rates; write to ckin string
-            ratefit_dct = pes_mod_dct[pes_mod]['rate_fit']
-            ckin_dct = ratefit.fit.fit_ktp_dct(
-                mess_path=mess_path,
-                inp_fit_method=ratefit_dct['fit_method'],
-                pdep_dct=ratefit_dct['pdep_fit'],
-                arrfit_dct=ratefit_dct['arrfit_fit'],
-                chebfit_dct=ratefit_dct['chebfit_fit'],
-                troefit_dct=ratefit_dct['troefit_fit'],
-                label_dct=label_dct,
-                fit_temps=pes_mod_dct[pes_mod]['rate_temps'],
-                fit_pressures=pes_mod_dct[pes_mod]['pressures'],
-                fit_tunit=pes_mod_dct[pes_mod]['temp_unit'],
-                fit_punit=pes_mod_dct[pes_mod]['pressure_unit']
-            )
-
-            # Write the header part
-            ckin_dct.update({
-                'header': writer.ckin.model_header((spc_mod,), spc_mod_dct)
-            })
-
-            ckin_path = output_path('CKIN', prefix=mdriver_path)
-            writer.ckin.write_rxn_file(
-                ckin_dct, pes_formula, ckin_path)
+        autorun.write_input(
+            mess_path, mess_inp_str,
+            aux_dct=dats, input_name='mess.inp')
+
+    # Run mess to produce rates
+    run_rate_tsk = parser.run.extract_task('run_mess', ktp_tsk_lst)
+    if run_rate_tsk is not None:
+
+        ioprinter.obj('vspace')
+        ioprinter.obj('line_dash')
+        ioprinter.running('MESS for the input file', mess_path)
+        nprocs = run_rate_tsk[-1]['nprocs']
+        with iorunner.telemetry.measure('mess', mess_path, nprocs=nprocs,
+                                        pes=pes_lbl):
+            autorun.run_script(_mess_script(nprocs), mess_path)
+
+    # Fit rate output to modified Arrhenius forms, print in ChemKin format
+    run_fit_tsk = parser.run.extract_task('run_fits', ktp_tsk_lst)
+    if run_fit_tsk is not None:
+
+        # Get all the info for the task
+        tsk_key_dct = run_fit_tsk[-1]
+        spc_mod = tsk_key_dct['spc_model']
+        pes_mod = tsk_key_dct['kin_model']
+        ratefit_dct = pes_mod_dct[pes_mod]['rate_fit']
+
+        if label_dct is None:
+            spc_dct, rxn_lst, _, label_dct = _process(
+                pes_idx, rxn_lst, ktp_tsk_lst, spc_mod_dct, spc_mod,
+                spc_dct, glob_dct, run_prefix, save_prefix)
+
+        ioprinter.obj('vspace')
+        ioprinter.obj('line_dash')
+        ioprinter.info_message(
+            'Fitting Rate Constants for PES to Functional Forms',
+            newline=1)
+
+        # Read and fit rates; write to ckin string
+        ratefit_dct = pes_mod_dct[pes_mod]['rate_fit']
+        ckin_dct = ratefit.fit.fit_ktp_dct(
+            mess_path=mess_path,
+            inp_fit_method=ratefit_dct['fit_method'],
+            pdep_dct=ratefit_dct['pdep_fit'],
+            arrfit_dct=ratefit_dct['arrfit_fit'],
+            chebfit_dct=ratefit_dct['chebfit_fit'],
+            troefit_dct=ratefit_dct['troefit_fit'],
+            label_dct=label_dct,
+            fit_temps=pes_mod_dct[pes_mod]['rate_temps'],
+            fit_pressures=pes_mod_dct[pes_mod]['pressures'],
+            fit_tunit=pes_mod_dct[pes_mod]['temp_unit'],
+            fit_punit=pes_mod_dct[pes_mod]['pressure_unit']
+        )
+
+        # Write the header part
+        ckin_dct.update({
+            'header': writer.ckin.model_header((spc_mod,), spc_mod_dct)
+        })
+
+        _write_ckin(mess_path, ckin_dct)
+
+    return True
 
 
 # ------- #
@@ -188,3 +250,50 @@ def _process(pes_idx, rxn_lst, ktp_tsk_lst, spc_mod_dct, spc_mod,
         chkd_rxn_lst, pes_idx, spc_dct, spc_mod_dct_i)
 
     return spc_dct, chkd_rxn_lst, instab_chnls, label_dct
+
+
+def _mess_script(nprocs):
+    """ Script to run MESS for rates with the requested number of threads
+    """
+    script_str = autorun.SCRIPT_DCT['messrate']
+    shebang, rest = script_str.split('\n', 1)
+    return '{}\nexport OMP_NUM_THREADS={}\n{}'.format(shebang, nprocs, rest)
+
+
+def _write_ckin(mess_path, ckin_dct):
+    """ Write the fitted rates of a PES into its MESS directory
+    """
+    with open(os.path.join(mess_path, CKIN_NAME), 'w') as ckin_obj:
+        json.dump(ckin_dct, ckin_obj)
+
+
+def _remove_ckin(mess_path):
+    """ Remove the fitted rates of any earlier run of a PES
+    """
+    ckin_file = os.path.join(mess_path, CKIN_NAME)
+    if os.path.exists(ckin_file):
+        os.remove(ckin_file)
+
+
+def _merge_ckin(pes_rlst, stat_dct, run_prefix):
+    """ Read the fitted rates of each PES which finished and combine those
+        of sub-PESs sharing a formula, in the order of `pes_rlst`, so that
+        the CKIN files do not depend on the order the PESs finished in.
+
+        :rtype: dict[str: dict[str: str]]
+    """
+
+    fml_ckin_dct = {}
+    for pes_inf in pes_rlst:
+        pes_formula, _, subpes_idx = pes_inf
+        mess_path = job_path(
+            run_prefix, 'MESS', 'RATE', pes_formula,
+            locs_idx=subpes_idx, make_path=False)
+        ckin_file = os.path.join(mess_path, CKIN_NAME)
+        if stat_dct[pes_inf] and os.path.exists(ckin_file):
+            with open(ckin_file, 'r') as ckin_obj:
+                ckin_dct = json.load(ckin_obj)
+            # Reactions of later sub-PESs follow the header of the first
+            fml_ckin_dct.setdefault(pes_formula, {}).update(ckin_dct)
+
+    return fml_ckin_dct
@@ -0,0 +1,265 @@
+""" Driver to run the electronic structure, thermochemistry and kinetics
+    tasks together as a pipeline, rather than one driver after another.
+
+    Main Loop of Driver:
+        (1) Dependency graph of ES, thermo and kinetics nodes
+
+    Main Workflow:
+        (1) Build the graph of (species, task) nodes of ESDriver
+        (2) Add a thermo node for each species, which writes and runs the
+            MESSPF inputs once all ES tasks of the species have finished
+        (3) Add a kinetics node for each PES, which writes and runs the
+            MESS rate input once all ES tasks for the species and TSs
+            of the PES have finished
+        (4) Run the graph, so that thermo and kinetics nodes start while
+            ES tasks for other species are still running
+        (5) Fit the thermo and rates for all species and PESs whose nodes
+            succeeded, and write the functional forms to the mechanism files
+
+    The fits are left to the end as the heats of formation rely on the
+    energies of basis species and the mechanism files are written for all
+    species and PESs together, in the order of the run lists.
+"""
+
+import functools
+from drivers import esdriver
+from drivers import thermodriver
+from drivers import ktpdriver
+from mechlib.amech_io import parser
+from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
+
+
+def run(pes_rlst, spc_rlst,
+        tsk_lst_dct,
+        spc_dct, glob_dct, thy_dct,
+        pes_mod_dct, spc_mod_dct,
+        run_prefix, save_prefix, mdriver_path,
+        njobs=1):
+    """ Executes the electronic structure, thermochemistry and kinetics
+        tasks as a single dependency graph.
+
+        :param pes_rlst: species from PESs to run
+            [(PES formula, PES idx, SUP-PES idx)
+            (CHANNEL idx, (REACS, PRODS))
+        :type pes_rlst: tuple(dict[str: dict])
+        :param spc_rlst: lst of species to run
+        :type spc_rlst: tuple(dict[str: dict])
+        :param tsk_lst_dct: task lists for each driver
+        :type tsk_lst_dct: dict[str: tuple]
+        :param spc_dct: species information
+            dict[spc_name: spc_information]
+        :type spc_dct: dict[str:dict]
+        :param glob_dct: global information for all species
+            dict[spc_name: spc_information]
+        :type glob_dct: dict[str: dict]
+        :param thy_dct: all of the theory information
+            dict[thy name: inf]
+        :type thy_dct: dict[str:dict]
+        :param run_prefix: root-path to the run-filesystem
+        :type run_prefix: str
+        :param save_prefix: root-path to the save-filesystem
+        :type save_prefix: str
+        :param mdriver_path: path where mechdriver is running
+        :type mdriver_path: str
+        :param njobs: number of nodes of the graph run concurrently
+        :type njobs: int
+    """
+
+    es_tsk_lst = tsk_lst_dct.get('es')
+    therm_tsk_lst = tsk_lst_dct.get('thermo')
+    ktp_tsk_lst = tsk_lst_dct.get('ktp')
+
+    # ---------------------------------- #
+    # BUILD THE GRAPH OF ES, THERMO, KTP #
+    # ---------------------------------- #
+
+    dep_dct = {}
+    es_node_dct, es_spc_dct = {}, spc_dct
+    if es_tsk_lst is not None:
+        es_dep_dct, es_node_dct, es_spc_dct = esdriver.task_graph(
+            pes_rlst, spc_rlst, es_tsk_lst,
+            spc_dct, glob_dct, thy_dct,
+            run_prefix, save_prefix, skip_journaled=True)
+        for node, deps in es_dep_dct.items():
+            dep_dct[('es', node)] = tuple(('es', dep) for dep in deps)
+
+    # Thermo for each species waits on all of the ES tasks of the species
+    therm_stream_lst = _streamed_tasks(therm_tsk_lst)
+    if therm_stream_lst:
+        run_rlst = parser.rlst.combine(pes_rlst, spc_rlst)
+        for (fml, _, _), run_lst in run_rlst.items():
+            for spc_name in parser.rlst.spc_queue(run_lst, fml):
+                dep_dct[('thermo', spc_name)] = _es_nodes(
+                    dep_dct, lambda name, spc=spc_name: name == spc)
+
+    # Kinetics for each PES waits on the ES tasks of all species and TSs
+    ktp_stream_lst = _streamed_tasks(ktp_tsk_lst)
+    if ktp_stream_lst and pes_rlst is not None:
+        for pes_inf, rxn_lst in pes_rlst.items():
+            _, pes_idx, _ = pes_inf
+            spc_names = parser.rlst.spc_queue(rxn_lst, pes_inf[0])
+            ts_prefixes = tuple(
+                'ts_{:g}_{:g}_'.format(pes_idx+1, chnl_idx+1)
+                for chnl_idx, _ in rxn_lst)
+            dep_dct[('ktp', pes_inf)] = _es_nodes(
+                dep_dct,
+                lambda name, spcs=spc_names, tss=ts_prefixes: (
+                    name in spcs or name.startswith(tss)))
+
+    # ------------- #
+    # RUN THE GRAPH #
+    # ------------- #
+
+    print('\nRunning {} pipeline tasks with {} concurrent job(s)'.format(
+        len(dep_dct), njobs))
+
+    worker = functools.partial(
+        _run_node, es_node_dct, es_spc_dct, therm_stream_lst, ktp_stream_lst,
+        pes_rlst, spc_dct, glob_dct, thy_dct,
+        pes_mod_dct, spc_mod_dct,
+        run_prefix, save_prefix, mdriver_path)
+    stat_dct = iorunner.run_graph(dep_dct, worker, njobs=njobs)
+
+    failed = tuple(node for node, stat in stat_dct.items() if not stat)
+    therm_pes_rlst, ktp_pes_rlst = pes_rlst, pes_rlst
+    if failed:
+        print('\nPipeline tasks that failed or were skipped:')
+        for (typ, obj) in failed:
+            if typ == 'es':
+                print('  es {} {}'.format(obj[0], es_node_dct[obj][0]))
+            else:
+                print('  {} {}'.format(typ, obj))
+
+        # Leave the species and PESs of the failed nodes out of the fits
+        failed_spcs, failed_pess = _failed_objs(failed)
+        print('Leaving out of the fits the species: {}'.format(
+            ', '.join(sorted(failed_spcs)) or 'none'))
+        therm_pes_rlst = _drop_failed(pes_rlst, failed_spcs, ())
+        ktp_pes_rlst = _drop_failed(pes_rlst, failed_spcs, failed_pess)
+        if spc_rlst is not None:
+            spc_rlst = {inf: tuple(name for name in spc_lst
+                                   if name not in failed_spcs)
+                        for inf, spc_lst in spc_rlst.items()}
+
+    # -------------------------------------- #
+    # FIT THE THERMO AND RATES FOR ALL NODES #
+    # -------------------------------------- #
+
+    therm_fit_lst = _fit_tasks(therm_tsk_lst)
+    if therm_fit_lst:
+        ioprinter.program_header('thermo')
+        thermodriver.run(
+            therm_pes_rlst, spc_rlst,
+            therm_fit_lst,
+            pes_mod_dct, spc_mod_dct,
+            spc_dct,
+            run_prefix, save_prefix, mdriver_path)
+        ioprinter.program_exit('thermo')
+
+    ktp_fit_lst = _fit_tasks(ktp_tsk_lst)
+    if ktp_fit_lst and ktp_pes_rlst:
+        ioprinter.program_header('ktp')
+        ktpdriver.run(
+            ktp_pes_rlst,
+            ktp_fit_lst,
+            spc_dct, glob_dct,
+            pes_mod_dct, spc_mod_dct,
+            run_prefix, save_prefix, mdriver_path)
+        ioprinter.program_exit('ktp')
+
+
+def _run_node(es_node_dct, es_spc_dct, therm_tsk_lst, ktp_tsk_lst,
+              pes_rlst, spc_dct, glob_dct, thy_dct,
+              pes_mod_dct, spc_mod_dct,
+              run_prefix, save_prefix, mdriver_path,
+              node):
+    """ Run the work of a single node of the pipeline graph
+    """
+
+    typ, obj = node
+    if typ == 'es':
+        success = esdriver.run_node(
+            es_node_dct, es_spc_dct, thy_dct, run_prefix, save_prefix, obj)
+    elif typ == 'thermo':
+        thermodriver.run(
+            None, {('SPC', 0, 0): (obj,)},
+            therm_tsk_lst,
+            pes_mod_dct, spc_mod_dct,
+            spc_dct,
+            run_prefix, save_prefix, mdriver_path)
+        success = True
+    else:
+        ktpdriver.run(
+            {obj: pes_rlst[obj]},
+            ktp_tsk_lst,
+            spc_dct, glob_dct,
+            pes_mod_dct, spc_mod_dct,
+            run_prefix, save_prefix, mdriver_path)
+        success = True
+
+    return success
+
+
+def _es_nodes(dep_dct, is_member):
+    """ Nodes of the ES tasks in the graph for the species whose names
+        satisfy `is_member`
+    """
+    return tuple(node for node in dep_dct
+                 if node[0] == 'es' and is_member(node[1][0]))
+
+
+def _failed_objs(failed):
+    """ Names of the species and TSs, and the PESs, with failed nodes
+    """
+
+    failed_spcs, failed_pess = set(), set()
+    for typ, obj in failed:
+        if typ == 'es':
+            failed_spcs.add(obj[0])
+        elif typ == 'thermo':
+            failed_spcs.add(obj)
+        else:
+            failed_pess.add(obj)
+
+    return failed_spcs, failed_pess
+
+
+def _drop_failed(pes_rlst, failed_spcs, failed_pess):
+    """ Remove the channels with a failed reactant, product or TS from the
+        PES run list, along with the failed PESs and those left without any
+        channels
+    """
+
+    if pes_rlst is None:
+        return None
+
+    red_pes_rlst = {}
+    for pes_inf, rxn_lst in pes_rlst.items():
+        _, pes_idx, _ = pes_inf
+        red_rxn_lst = ()
+        for chnl_idx, rgts in rxn_lst:
+            ts_prefix = 'ts_{:g}_{:g}_'.format(pes_idx+1, chnl_idx+1)
+            if not (failed_spcs & set(rgt for rgt_lst in rgts
+                                      for rgt in rgt_lst) or
+                    any(name.startswith(ts_prefix) for name in failed_spcs)):
+                red_rxn_lst += ((chnl_idx, rgts),)
+        if red_rxn_lst and pes_inf not in failed_pess:
+            red_pes_rlst[pes_inf] = red_rxn_lst
+
+    return red_pes_rlst
+
+
+def _streamed_tasks(tsk_lst):
+    """ Tasks of a driver that are run for each node as its inputs
+        become available (all but the fits)
+    """
+    return tuple(tsk_inf for tsk_inf in (tsk_lst or ())
+                 if 'run_fits' not in tsk_inf)
+
+
+def _fit_tasks(tsk_lst):
+    """ Tasks of a driver that are run once the graph has finished
+    """
+    return tuple(tsk_inf for tsk_inf in (tsk_lst or ())
+                 if 'run_fits' in tsk_inf)
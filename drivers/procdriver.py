@@ -6,6 +6,7 @@
 from mechroutines.proc import run_tsk
 from mechlib.amech_io import parser
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
 
 
 def run(pes_rlst, spc_rlst,
@@ -56,8 +57,10 @@ def run(pes_rlst, spc_rlst,
                 obj_queue = parser.rlst.spc_queue(run_lst, fml)
 
             for spc_name in obj_queue:
-                run_tsk(
-                    tsk, spc_dct, spc_name,
-                    thy_dct, prnt_keyword_dct,
-                    pes_mod_dct_i, spc_mod_dct_i,
-                    run_prefix, save_prefix)
+                with iorunner.telemetry.labels(
+                        prefix=run_prefix, spc=spc_name, tsk=tsk):
+                    run_tsk(
+                        tsk, spc_dct, spc_name,
+                        thy_dct, prnt_keyword_dct,
+                        pes_mod_dct_i, spc_mod_dct_i,
+                        run_prefix, save_prefix)
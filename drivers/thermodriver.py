@@ -17,6 +17,7 @@
             (3) Write functional forms to mechanism file
 """
 
+import functools
 import autorun
 import mechanalyzer
 import chemkin_io
@@ -32,6 +33,7 @@ from mechlib.amech_io import reader
 from mechlib.amech_io import writer
 from mechlib.amech_io import parser
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
 from mechlib.amech_io import thermo_paths
 from mechlib.amech_io import job_path
 from mechlib.amech_io import output_path
@@ -42,9 +44,15 @@ def run(pes_rlst, spc_rlst,
         therm_tsk_lst,
         pes_mod_dct, spc_mod_dct,
         spc_dct,
-        run_prefix, save_prefix, mdriver_path):
+        run_prefix, save_prefix, mdriver_path,
+        njobs=1):
     """ Executes all thermochemistry tasks.
 
+        The MESSPF and ThermP/PAC99 runs of each species are independent,
+        so the write_mess, run_mess and run_fits tasks each run over the
+        species concurrently with a pool of `njobs` processes. The NASA
+        polynomials are written in the order of the species queue.
+
         :param pes_rlst: species from PESs to run
             [(PES formula, PES idx, SUP-PES idx)
             (CHANNEL idx, (REACS, PRODS))
@@ -69,6 +77,8 @@ def run(pes_rlst, spc_rlst,
         :type save_prefix: str
         :param mdriver_path: path where mechdriver is running
         :type mdriver_path: str
+        :param njobs: number of species run concurrently in each task
+        :type njobs: int
     """
 
     # Print Header
@@ -102,20 +112,16 @@ def run(pes_rlst, spc_rlst,
 
         spc_mods, pes_mod = parser.models.extract_models(write_messpf_tsk)
 
-        for idx, spc_name in enumerate(spc_queue):
-            print('write test {}'.format(spc_name))
-            for spc_mod in spc_mods:
-                messpf_inp_str, dat_dct = thmroutines.qt.make_messpf_str(
-                    pes_mod_dct[pes_mod]['therm_temps'],
-                    spc_dct, spc_name,
-                    pes_mod_dct[pes_mod], spc_mod_dct[spc_mod],
-                    run_prefix, save_prefix)
-                ioprinter.messpf('input_string')
-                ioprinter.info_message(messpf_inp_str)
-                autorun.write_input(
-                    thm_paths[idx][spc_mod][0], messpf_inp_str,
-                    aux_dct=dat_dct,
-                    input_name='pf.inp')
+        worker = functools.partial(
+            _write_messpf, spc_queue, thm_paths,
+            pes_mod_dct[pes_mod], spc_mod_dct,
+            spc_dct, run_prefix, save_prefix)
+        with iorunner.telemetry.labels(prefix=run_prefix, tsk='thermo'):
+            iorunner.run_map(
+                worker,
+                tuple((idx, spc_mod) for idx in range(len(spc_queue))
+                      for spc_mod in spc_mods),
+                njobs=njobs)
 
     # Run the MESSPF files that have been written
     run_messpf_tsk = parser.run.extract_task('run_mess', therm_tsk_lst)
@@ -125,22 +131,9 @@ def run(pes_rlst, spc_rlst,
         spc_mods = parser.models.split_model(spc_mod[0])
 
         ioprinter.messpf('run_header')
-        for idx, spc_name in enumerate(spc_queue):
-
-            _spc_mods, coeffs, operators = spc_mods
 
-            # Run MESSPF for all requested models, combine the PFS at the end
-            ioprinter.message('Run MESSPF: {}'.format(spc_name), newline=1)
-            _pfs = []
-            for spc_mod in _spc_mods:
-                autorun.run_script(
-                   autorun.SCRIPT_DCT['messpf'],
-                   thm_paths[idx][spc_mod][0])
-                _pfs.append(
-                    reader.mess.messpf(thm_paths[idx][spc_mod][0]))
-            final_pf = thermfit.pf.combine(_pfs, coeffs, operators)
-
-            # need to clean thm path build
+        # Paths for the combined PFs; need to clean thm path build
+        for idx, spc_name in enumerate(spc_queue):
             tdx = len(spc_mods)
             spc_info = sinfo.from_dct(spc_dct[spc_name])
             spc_fml = automol.inchi.formula_string(spc_info[0])
@@ -149,10 +142,12 @@ def run(pes_rlst, spc_rlst,
                 job_path(run_prefix, 'MESS', 'PF', thm_prefix, locs_idx=tdx),
                 job_path(run_prefix, 'THERM', 'NASA', thm_prefix, locs_idx=tdx)
             )
-            writer.mess.output(
-                fstring(spc_dct[spc_name]['inchi']),
-                final_pf, thm_paths[idx]['final'][0],
-                filename='pf.dat')
+
+        # Run MESSPF for all requested models, combine the PFS at the end
+        worker = functools.partial(
+            _run_messpf, spc_queue, thm_paths, spc_mods, spc_dct)
+        with iorunner.telemetry.labels(prefix=run_prefix, tsk='thermo'):
+            iorunner.run_map(worker, range(len(spc_queue)), njobs=njobs)
 
     # Use MESS partition functions to compute thermo quantities
     run_fit_tsk = parser.run.extract_task('run_fits', therm_tsk_lst)
@@ -219,19 +214,18 @@ def run(pes_rlst, spc_rlst,
         # Write the NASA polynomials in CHEMKIN format
         ckin_nasa_str = ''
         ckin_path = output_path('CKIN', prefix=mdriver_path)
-        for idx, spc_name in enumerate(spc_queue):
-
-            ioprinter.nasa('calculate', spc_name)
+        worker = functools.partial(
+            _build_polynomial, spc_queue, thm_paths, spc_mod, spc_dct)
+        with iorunner.telemetry.labels(prefix=run_prefix, tsk='thermo'):
+            poly_strs = iorunner.run_map(
+                worker, range(len(spc_queue)), njobs=njobs)
+        for poly_str in poly_strs:
 
             # Write the header describing the models used in thermo calcs
             ckin_nasa_str += writer.ckin.model_header(spc_mods, spc_mod_dct)
 
-            # Build and write the NASA polynomial in CHEMKIN-format string
-            # Call dies if you haven't run "write mess" task
-            ckin_nasa_str += thmroutines.nasapoly.build_polynomial(
-                spc_name, spc_dct,
-                thm_paths[idx][spc_mod][0], thm_paths[idx][spc_mod][1])
-                # thm_paths[idx]['final'][0], thm_paths[idx]['final'][1])
+            # Add the NASA polynomial in CHEMKIN-format string
+            ckin_nasa_str += poly_str
             ckin_nasa_str += '\n\n'
         print('CKIN NASA STR\n')
         print(ckin_nasa_str)
@@ -256,3 +250,70 @@ def run(pes_rlst, spc_rlst,
 
         # Write all of the NASA polynomial strings
         writer.ckin.write_nasa_file(ckin_nasa_str, ckin_path)
+
+
+# ------------------------------------------------ #
+# WORK FOR ONE SPECIES, RUN CONCURRENTLY BY A POOL #
+# ------------------------------------------------ #
+def _write_messpf(spc_queue, thm_paths,
+                  pes_mod_dct_i, spc_mod_dct,
+                  spc_dct, run_prefix, save_prefix,
+                  item):
+    """ Write the MESSPF input for a species and model
+    """
+
+    idx, spc_mod = item
+    spc_name = spc_queue[idx]
+    print('write test {}'.format(spc_name))
+    with iorunner.telemetry.labels(spc=spc_name):
+        messpf_inp_str, dat_dct = thmroutines.qt.make_messpf_str(
+            pes_mod_dct_i['therm_temps'],
+            spc_dct, spc_name,
+            pes_mod_dct_i, spc_mod_dct[spc_mod],
+            run_prefix, save_prefix)
+    ioprinter.messpf('input_string')
+    ioprinter.info_message(messpf_inp_str)
+    autorun.write_input(
+        thm_paths[idx][spc_mod][0], messpf_inp_str,
+        aux_dct=dat_dct,
+        input_name='pf.inp')
+
+
+def _run_messpf(spc_queue, thm_paths, spc_mods, spc_dct, idx):
+    """ Run MESSPF for all requested models of a species and combine
+        the partition functions
+    """
+
+    spc_name = spc_queue[idx]
+    _spc_mods, coeffs, operators = spc_mods
+
+    ioprinter.message('Run MESSPF: {}'.format(spc_name), newline=1)
+    _pfs = []
+    for spc_mod in _spc_mods:
+        with iorunner.telemetry.measure(
+                'messpf', thm_paths[idx][spc_mod][0], spc=spc_name):
+            autorun.run_script(
+               autorun.SCRIPT_DCT['messpf'],
+               thm_paths[idx][spc_mod][0])
+        _pfs.append(
+            reader.mess.messpf(thm_paths[idx][spc_mod][0]))
+    final_pf = thermfit.pf.combine(_pfs, coeffs, operators)
+
+    writer.mess.output(
+        fstring(spc_dct[spc_name]['inchi']),
+        final_pf, thm_paths[idx]['final'][0],
+        filename='pf.dat')
+
+
+def _build_polynomial(spc_queue, thm_paths, spc_mod, spc_dct, idx):
+    """ Run ThermP and PAC99 to fit the NASA polynomial for a species
+    """
+
+    spc_name = spc_queue[idx]
+    ioprinter.nasa('calculate', spc_name)
+
+    # Call dies if you haven't run "write mess" task
+    return thmroutines.nasapoly.build_polynomial(
+        spc_name, spc_dct,
+        thm_paths[idx][spc_mod][0], thm_paths[idx][spc_mod][1])
+    # thm_paths[idx]['final'][0], thm_paths[idx]['final'][1])
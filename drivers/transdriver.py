@@ -15,6 +15,7 @@
 from mechroutines.trans import run_tsk
 from mechlib.amech_io import parser
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io import runner as iorunner
 from mechlib.reaction import split_unstable_full
 
 
@@ -47,7 +48,8 @@ def run(pes_rlst, spc_rlst,
 
     for tsk_lst in trans_tsk_lst:
         [_, tsk, etrans_keyword_dct] = tsk_lst
-        run_tsk(tsk, spc_queue,
-                spc_dct,
-                thy_dct, etrans_keyword_dct,
-                run_prefix, save_prefix)
+        with iorunner.telemetry.labels(prefix=run_prefix, tsk=tsk):
+            run_tsk(tsk, spc_queue,
+                    spc_dct,
+                    thy_dct, etrans_keyword_dct,
+                    run_prefix, save_prefix)
@@ -2,9 +2,7 @@
 New, Refactored Mechdriver libs
 """
 
-from mechlib import amech_io
-from mechlib import filesys
-from mechlib import reaction
+import importlib
 
 
 __all__ = [
@@ -12,3 +10,13 @@ __all__ = [
     'filesys',
     'reaction'
 ]
+
+
+def __getattr__(name):
+    """ Import the libraries only when first accessed (PEP 562), so that
+        reading the input does not load the filesystem and reaction libraries
+    """
+    if name in __all__:
+        return importlib.import_module('mechlib.' + name)
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
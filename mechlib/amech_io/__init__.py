@@ -1,16 +1,15 @@
 """ Libraries of functions that handle input-output for AutoMech
 """
 
-from mechlib.amech_io import writer
-from mechlib.amech_io import reader
-from mechlib.amech_io import parser
-from mechlib.amech_io import printer
-from mechlib.amech_io import runner
+import importlib
 from mechlib.amech_io._path import thermo_paths
 from mechlib.amech_io._path import output_path
 from mechlib.amech_io._path import job_path
 
 
+# Sub-libraries imported on first access
+_SUBMODULES = ('writer', 'reader', 'parser', 'printer', 'runner')
+
 __all__ = [
     'writer',
     'reader',
@@ -21,3 +20,14 @@ __all__ = [
     'output_path',
     'job_path'
 ]
+
+
+def __getattr__(name):
+    """ Import the sub-libraries only when first accessed (PEP 562), so
+        that the readers and writers for MESS and CHEMKIN files are only
+        loaded by the drivers which use them
+    """
+    if name in _SUBMODULES:
+        return importlib.import_module('mechlib.amech_io.' + name)
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
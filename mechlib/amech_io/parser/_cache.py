@@ -0,0 +1,92 @@
+""" Cache on disk for the dictionaries built from the input files which
+    are slow to construct (e.g., the sorted PES dictionary).
+
+    Each dictionary is pickled along with a hash of everything it was
+    built from. It is only read back if the hash of the current inputs
+    matches; otherwise the dictionary is rebuilt and the cache replaced.
+    Dictionaries are cached separately, so a change to one input only
+    rebuilds the dictionaries built from it.
+"""
+
+import os
+import pickle
+import hashlib
+from mechlib.amech_io import printer as ioprinter
+
+
+# Changing the version invalidates all existing caches; bump it whenever
+# the construction of a cached dictionary changes
+CACHE_VERSION = 1
+
+
+def input_hash(*inps):
+    """ Build the hash of the inputs a dictionary is built from.
+
+        :param inps: strings or other picklable objects
+        :rtype: str
+    """
+    return hashlib.sha1(
+        pickle.dumps((CACHE_VERSION,) + inps, protocol=4)).hexdigest()
+
+
+def cached(cache_dir, name, key, function, *args, **kwargs):
+    """ Return the cached result for a dictionary if its key matches,
+        otherwise build it by calling the function and cache the result.
+
+        :param cache_dir: directory holding the cache files (None to skip)
+        :type cache_dir: str
+        :param name: name of the cached dictionary
+        :type name: str
+        :param key: hash of the inputs built by `input_hash`
+        :type key: str
+        :param function: function which builds the dictionary
+        :type function: function
+        :rtype: obj
+    """
+
+    if cache_dir is None:
+        return function(*args, **kwargs)
+
+    cache_file = os.path.join(cache_dir, '{}.pickle'.format(name))
+    result = _read(cache_file, key)
+    if result is None:
+        result = function(*args, **kwargs)
+        _write(cache_file, key, result)
+    else:
+        ioprinter.info_message(
+            'Read {} from cache {}'.format(name, cache_file))
+
+    return result
+
+
+def _read(cache_file, key):
+    """ Read the cached result, None if absent, stale or unreadable
+    """
+
+    result = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as cache_obj:
+                cache_key, cache_result = pickle.load(cache_obj)
+            if cache_key == key:
+                result = cache_result
+        except Exception:  # pylint: disable=broad-except
+            # Corrupt or written by incompatible library versions
+            result = None
+
+    return result
+
+
+def _write(cache_file, key, result):
+    """ Write the result through a temporary file so that a reader never
+        sees a partially written cache
+    """
+
+    cache_dir = os.path.dirname(cache_file)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    with open(tmp_file, 'wb') as cache_obj:
+        pickle.dump((key, result), cache_obj, protocol=4)
+    os.replace(tmp_file, cache_file)
@@ -6,9 +6,10 @@
 from mechanalyzer.parser import pes
 from mechanalyzer.parser.mech import parse_mechanism
 from mechanalyzer.builder import sorter
+from mechlib.amech_io.parser import _cache
 
 
-def pes_dictionary(mech_str, mech_type, spc_dct):
+def pes_dictionary(mech_str, mech_type, spc_dct, cache_dir=None):
     """ Constructs the Potential-Energy-Surface dictionary for all of the
         channels of the user input utilizing the sorter functionality
         from mechanalyzer. Currently, we sort just via PES and then SUB-PES.
@@ -17,24 +18,41 @@ def pes_dictionary(mech_str, mech_type, spc_dct):
 
         Also, currently prints the PES channels.
 
+        As the sorting is slow for large mechanisms, the dictionary is read
+        from the cache, if a cache directory is given, when the mechanism
+        and species dictionary are unchanged from those of the cached one.
+
         :param mech_str: mechanism.dat input file string
         :type mech_str: str
         :param mech_type:
         :type mech_type: str
         :param spc_dct:
         :type spc_dct: dict[str: ____]
+        :param cache_dir: directory of the cache of parsed inputs
+        :type cache_dir: str
         :rtype: dict[tuple(str, int, int)] = tuple(int, tuple(str))
     """
 
+    key = _cache.input_hash(mech_str, mech_type, spc_dct)
+    pes_dct = _cache.cached(
+        cache_dir, 'pes', key,
+        _sorted_pes_dictionary, mech_str, mech_type, spc_dct)
+
+    pes.print_pes_channels(pes_dct)
+
+    return pes_dct
+
+
+def _sorted_pes_dictionary(mech_str, mech_type, spc_dct):
+    """ Sort the mechanism into PESs and sub-PESs
+    """
+
     # Initialize values used for the basic PES-SUBPES sorting
     sort_str = ['pes', 'subpes', 0]
     isolate_species = ()
 
-    # Build and print the full sorted PES dict
+    # Build the full sorted PES dict
     _, mech_info, _ = parse_mechanism(mech_str, mech_type, spc_dct)
     srt_mch = sorter.sorting(mech_info, spc_dct, sort_str, isolate_species)
-    pes_dct = srt_mch.return_pes_dct()
 
-    pes.print_pes_channels(pes_dct)
-
-    return pes_dct
+    return srt_mch.return_pes_dct()
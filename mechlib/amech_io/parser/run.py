@@ -42,7 +42,14 @@ RUN_INP_VAL_DCT = {
     'print_mech': ((bool,), (True, False), False),
     'print_debug': ((bool,), (True, False), False),
     'run_prefix': ((str,), (), None),
-    'save_prefix': ((str,), (), None)
+    'save_prefix': ((str,), (), None),
+    'es_scheduler': ((str,), ('serial', 'dag'), 'serial'),
+    'es_njobs': ((int,), (), 1),
+    # Multiple of the predicted wall time after which ES jobs are aborted
+    'es_time_limit': ((int, float), (), None),
+    'ktp_njobs': ((int,), (), 1),
+    'therm_njobs': ((int,), (), 1),
+    'pipeline': ((bool,), (True, False), False)
 }
 
 # HANDLE TASK KEYS
@@ -64,7 +71,9 @@ TSK_KEY_DCT = {
     'init_geom': (('spc',), BASE),
     'find_ts': (('spc', 'ts'), BASE + MREF + ('nobarrier',)),
     'conf_pucker': (('spc', 'ts'), BASE + ('cnf_range',)),
-    'conf_samp': (('spc', 'ts'), BASE + ('cnf_range', 'resave',)),
+    'conf_samp': (('spc', 'ts'), BASE + ('cnf_range', 'resave',
+                                          'njobs', 'executor', 'ffopt',
+                                          'adaptive', 'batch_samp')),
     'conf_energy': (('spc', 'ts'), BASE + ('cnf_range',)),
     'conf_grad': (('spc', 'ts'), BASE + ('cnf_range',)),
     'conf_hess': (('spc', 'ts'), BASE + ('cnf_range',)),
@@ -77,7 +86,7 @@ TSK_KEY_DCT = {
     'hr_energy': (('spc', 'ts'), BASE + ('tors_model',)),
     'hr_vpt2': (('spc', 'ts'), BASE + ('tors_model',)),
     'hr_reopt': (('spc', 'ts'), BASE + ('tors_model',)),
-    'tau_samp': (('spc', 'ts'), BASE),
+    'tau_samp': (('spc', 'ts'), BASE + ('njobs', 'executor')),
     'tau_energy': (('spc', 'ts'), BASE),
     'tau_grad': (('spc', 'ts'), BASE),
     'tau_hess': (('spc', 'ts'), BASE + ('hessmax',)),
@@ -119,10 +128,14 @@ TSK_VAL_DCT = {
     'tors_model': ((str,),
                    ('1dhr', '1dhrf', '1dhrfa', 'mdhr', 'mdhrv'), '1dhr'),
     'resamp_min': ((bool,), (True, False), False),
+    'ffopt': ((bool,), (True, False), False),
+    'adaptive': ((bool,), (True, False), False),
+    'batch_samp': ((bool,), (True, False), True),
     'hrthresh': ((float,), (), -0.5),
     'potthresh': ((float,), (), 0.3),
     'rxncoord': ((str,), ('irc', 'auto'), 'auto'),
     'nobarrier': ((str,), ('pst', 'rpvtst', 'vrctst'), None),
+    'executor': ((str,), ('local', 'slurm', 'pbs', 'fake'), 'local'),
     # Trans
     'njobs': ((int,), (), 1),
     'nsamp': ((int,), (), 1),
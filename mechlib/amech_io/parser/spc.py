@@ -11,6 +11,7 @@ from mechlib.reaction import rxnid
 from mechlib.filesys import reaction_fs
 from mechlib.amech_io.parser._keywrd import defaults_from_val_dct
 from mechlib.amech_io.parser._keywrd import check_dct1
+from mechlib.amech_io.parser import _cache
 
 
 # DCTS
@@ -56,17 +57,37 @@ TS_VAL_DCT.update(SPC_VAL_DCT)
 
 
 # Build spc
-def species_dictionary(spc_str, dat_str, geo_dct, spc_type):
+def species_dictionary(spc_str, dat_str, geo_dct, spc_type,
+                       cache_dir=None):
     """ Read each of the species input files:
             (1) species.csv: CSV file with basic info like names,inchis,mults
             (2) species.dat:
             (3) *.xyz: XYZ-files with geometries
 
+        If a cache directory is given, the dictionaries are read from the
+        cache when built from the same input strings as the cached ones.
+
         :param job_path: directory path where the input file(s) exist
         :type job_path: str
+        :param cache_dir: directory of the cache of parsed inputs
+        :type cache_dir: str
         :rtype dict[str: dict]
     """
 
+    # The electronic levels and symmetry factors of the species are filled
+    # in from the phydat tables, so the dictionaries depend on them too
+    key = _cache.input_hash(spc_str, dat_str, geo_dct, spc_type,
+                            eleclvl.DCT, symm.DCT)
+
+    return _cache.cached(
+        cache_dir, 'species', key,
+        _species_dictionary, spc_str, dat_str, geo_dct, spc_type)
+
+
+def _species_dictionary(spc_str, dat_str, geo_dct, spc_type):
+    """ Build the species and global dictionaries from the input strings
+    """
+
     # Parse out the dcts from the strings
     spc_dct = mechanalyzer.parser.spc.build_spc_dct(spc_str, spc_type)
 
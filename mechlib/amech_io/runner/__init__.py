@@ -1,29 +1,23 @@
 """ Library used to obtain various information about the
     shell process and run node that is associated with the
-    MechDriver calculations the user launched.
+    MechDriver calculations the user launched, as well as to
+    run work concurrently, claim jobs shared between processes and
+    record the resources used by each run of a program.
 """
 
-import os
-import subprocess
-
-
-def get_host_node():
-    """ Calls the BASH `hostname` command to obtain the name of the
-        node server that MechDriver is running on.
-
-        :rtype: str
-    """
-    proc = subprocess.Popen(['hostname'], stdout=subprocess.PIPE)
-    host_node = proc.stdout.read()
-    host_node = host_node.decode('ascii')
-    host_node = host_node.strip()
-
-    return host_node
-
-
-def get_pid():
-    """ Gets the shell process ID for the MechDriver process running.
-
-        :rtype: int
-    """
-    return os.getpid()
+from mechlib.amech_io.runner._node import get_host_node
+from mechlib.amech_io.runner._node import get_pid
+from mechlib.amech_io.runner._pool import run_graph
+from mechlib.amech_io.runner._pool import run_map
+from mechlib.amech_io.runner import _lease as lease
+from mechlib.amech_io.runner import _telemetry as telemetry
+
+
+__all__ = [
+    'get_host_node',
+    'get_pid',
+    'run_graph',
+    'run_map',
+    'lease',
+    'telemetry'
+]
@@ -0,0 +1,274 @@
+""" Library to claim electronic structure jobs for a single MechDriver
+    process so that several processes may safely share one run filesystem.
+
+    A job is claimed by atomically creating a claim file in its run
+    directory that records the host node and process ID of the claimant,
+    along with the times of the claim, its last heartbeat and the time
+    at which the lease on the job expires.
+
+    While a process holds a claim, a background thread renews the lease
+    at regular intervals (the heartbeat). A claim whose lease has expired,
+    or whose process no longer exists on this node, is stale and may be
+    taken over by another process.
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+from mechlib.amech_io.runner import _node
+
+
+CLAIM_NAME = 'claim.json'
+
+# Seconds a lease lasts without renewal and seconds between renewals
+LEASE_TIME = 300.0
+HEARTBEAT_TIME = 60.0
+
+# Claims held by this process, renewed by the heartbeat thread
+_HELD = set()
+_HELD_LOCK = threading.Lock()
+_HEARTBEAT = {'thread': None}
+
+
+def claim(path):
+    """ Attempt to claim the job in a run directory for this process.
+        If the job is held under a stale claim, it is taken over.
+
+        :param path: path to the run directory of the job
+        :type path: str
+        :returns: whether the job was claimed
+        :rtype: bool
+    """
+
+    claim_path = _claim_path(path)
+    claimed = _create_claim(claim_path)
+    if not claimed:
+        inf = read(path)
+        if inf is None:
+            # Claim may be in the middle of being written by another process
+            time.sleep(1.0)
+            inf = read(path)
+        if inf is None or is_stale(inf):
+            owner = ('{}:{}'.format(inf['host'], inf['pid'])
+                     if inf is not None else 'unknown process')
+            print(' - Found stale claim on job from {}. Reclaiming...'
+                  .format(owner))
+            claimed = _take_over(claim_path, inf)
+
+    if claimed:
+        with _HELD_LOCK:
+            _HELD.add(claim_path)
+        _start_heartbeat()
+
+    return claimed
+
+
+def release(path):
+    """ Release the claim this process holds on the job in a run directory.
+
+        :param path: path to the run directory of the job
+        :type path: str
+    """
+
+    claim_path = _claim_path(path)
+    with _HELD_LOCK:
+        _HELD.discard(claim_path)
+    if _is_owner(read(path)):
+        try:
+            os.remove(claim_path)
+        except FileNotFoundError:
+            pass
+
+
+def read(path):
+    """ Read the claim on the job in a run directory.
+
+        :param path: path to the run directory of the job
+        :type path: str
+        :returns: claim information (None if no readable claim exists)
+        :rtype: dict[str: obj]
+    """
+
+    try:
+        with open(_claim_path(path), 'r') as claim_obj:
+            inf = json.load(claim_obj)
+    except (FileNotFoundError, ValueError):
+        inf = None
+
+    return inf
+
+
+def is_claimed(path):
+    """ Assess if the job in a run directory is held by an active claim,
+        from this or any other process.
+
+        :param path: path to the run directory of the job
+        :type path: str
+        :rtype: bool
+    """
+    inf = read(path)
+    return inf is not None and not is_stale(inf)
+
+
+def is_stale(inf):
+    """ Assess if a claim is stale: its lease has expired or it was made
+        by a process on this node which no longer exists.
+
+        :param inf: claim information
+        :type inf: dict[str: obj]
+        :rtype: bool
+    """
+
+    if time.time() > inf['expiry']:
+        stale = True
+    elif inf['host'] == _host():
+        stale = not _pid_exists(inf['pid'])
+    else:
+        stale = False
+
+    return stale
+
+
+# Helpers
+@functools.lru_cache(maxsize=1)
+def _host():
+    """ Name of the host node, which only needs to be looked up once
+    """
+    return _node.get_host_node()
+
+
+def _claim_path(path):
+    """ Absolute path to the claim file, so it is unaffected by any
+        changes of the working directory while jobs run
+    """
+    return os.path.join(os.path.abspath(path), CLAIM_NAME)
+
+
+def _claim_info(claimed=None):
+    """ Build the claim information for this process
+    """
+    now = time.time()
+    return {
+        'host': _host(),
+        'pid': _node.get_pid(),
+        'claimed': claimed if claimed is not None else now,
+        'heartbeat': now,
+        'expiry': now + LEASE_TIME
+    }
+
+
+def _create_claim(claim_path):
+    """ Atomically create the claim file, failing if it exists
+    """
+
+    try:
+        fdesc = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+
+    with os.fdopen(fdesc, 'w') as claim_obj:
+        json.dump(_claim_info(), claim_obj)
+
+    return True
+
+
+def _take_over(claim_path, stale_inf):
+    """ Replace a stale claim with a claim for this process. Only one
+        process can move the stale file out of the way; if the file moved
+        turns out to be a fresh claim made by another process in the
+        meantime, it is put back.
+    """
+
+    moved_path = '{}.stale.{}'.format(claim_path, _node.get_pid())
+    try:
+        os.rename(claim_path, moved_path)
+    except FileNotFoundError:
+        # Claim was released in the meantime
+        return _create_claim(claim_path)
+
+    with open(moved_path, 'r') as claim_obj:
+        try:
+            moved_inf = json.load(claim_obj)
+        except ValueError:
+            moved_inf = None
+
+    if moved_inf == stale_inf:
+        claimed = _create_claim(claim_path)
+    else:
+        try:
+            os.link(moved_path, claim_path)
+        except FileExistsError:
+            pass
+        claimed = False
+    os.remove(moved_path)
+
+    return claimed
+
+
+def _is_owner(inf):
+    """ Assess if a claim belongs to this process
+    """
+    return (inf is not None and
+            inf['host'] == _host() and
+            inf['pid'] == _node.get_pid())
+
+
+def _pid_exists(pid):
+    """ Assess if a process exists on this node
+    """
+    try:
+        os.kill(pid, 0)
+        exists = True
+    except ProcessLookupError:
+        exists = False
+    except PermissionError:
+        exists = True
+
+    return exists
+
+
+def _renew(claim_path):
+    """ Renew the lease of a claim held by this process, dropping the
+        claim if another process has since taken it over.
+    """
+
+    inf = read(os.path.dirname(claim_path))
+    if _is_owner(inf):
+        tmp_path = '{}.{}.tmp'.format(claim_path, _node.get_pid())
+        with open(tmp_path, 'w') as claim_obj:
+            json.dump(_claim_info(claimed=inf['claimed']), claim_obj)
+        os.replace(tmp_path, claim_path)
+    else:
+        with _HELD_LOCK:
+            _HELD.discard(claim_path)
+
+
+def _heartbeat():
+    """ Renew the leases of all held claims at regular intervals
+    """
+    while True:
+        time.sleep(HEARTBEAT_TIME)
+        with _HELD_LOCK:
+            held = tuple(_HELD)
+        for claim_path in held:
+            try:
+                _renew(claim_path)
+            except OSError:
+                pass
+
+
+def _start_heartbeat():
+    """ Start the heartbeat thread of this process, if not yet running.
+        The thread is checked against the PID so that a forked child
+        process starts its own.
+    """
+
+    thread = _HEARTBEAT['thread']
+    if (thread is None or not thread.is_alive() or
+       _HEARTBEAT.get('pid') != _node.get_pid()):
+        thread = threading.Thread(target=_heartbeat, daemon=True)
+        thread.start()
+        _HEARTBEAT['thread'] = thread
+        _HEARTBEAT['pid'] = _node.get_pid()
@@ -0,0 +1,216 @@
+""" Library to execute sets of independent or inter-dependent units of work
+    concurrently in a pool of worker processes.
+
+    Units of work (nodes) are described by a dependency dictionary:
+
+        {node: (nodes that must finish before node can start,)}
+
+    which describes a directed acyclic graph. Nodes are dispatched to the
+    pool as soon as all of the nodes they depend on have finished.
+
+    Independent units of work whose results are needed afterwards are
+    instead mapped over the pool, which returns the results in order.
+"""
+
+import sys
+import traceback
+import multiprocessing
+import concurrent.futures
+
+
+# Function called by the worker processes; set prior to building the pool
+# so that forked workers inherit it without needing to pickle large dcts
+_WORKER = None
+
+
+def run_graph(dep_dct, worker, njobs=1):
+    """ Execute all of the nodes of a directed acyclic graph, respecting
+        the dependencies between them, using a pool of `njobs` processes.
+
+        The `worker` function is called for each node as `worker(node)`
+        and should return a boolean signifying whether the node succeeded.
+        Any node depending on a node that failed is not run.
+
+        If `njobs` is 1, the nodes are run serially in the current process
+        in the (topological) order they are defined in `dep_dct`, and an
+        error raised for a node stops the run as it is raised again here.
+        With a pool, the error is printed and the node counted as failed.
+
+        :param dep_dct: nodes and the nodes they each depend on
+        :type dep_dct: dict[obj: tuple(obj)]
+        :param worker: function that executes the work for a node
+        :type worker: function
+        :param njobs: number of nodes that may run concurrently
+        :type njobs: int
+        :returns: success of each node (None if node was never run)
+        :rtype: dict[obj: bool]
+    """
+
+    _check_graph(dep_dct)
+
+    stat_dct = {node: None for node in dep_dct}
+    if njobs <= 1:
+        for node in _topological_order(dep_dct):
+            if all(stat_dct[dep] for dep in dep_dct[node]):
+                stat_dct[node] = _call_worker(
+                    node, worker=worker, capture=False)
+            else:
+                stat_dct[node] = False
+                _skip_message(node)
+    else:
+        _run_graph_pool(dep_dct, worker, njobs, stat_dct)
+
+    return stat_dct
+
+
+def _run_graph_pool(dep_dct, worker, njobs, stat_dct):
+    """ Dispatch the nodes of the graph to a process pool as they
+        become ready to run; updates `stat_dct` in place.
+    """
+
+    global _WORKER
+    _WORKER = worker
+
+    waiting = list(_topological_order(dep_dct))
+    running = {}
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=njobs,
+            mp_context=multiprocessing.get_context('fork')) as pool:
+        while waiting or running:
+
+            # Submit every node whose dependencies have all finished
+            for node in tuple(waiting):
+                deps = dep_dct[node]
+                if any(stat_dct[dep] is False for dep in deps):
+                    waiting.remove(node)
+                    stat_dct[node] = False
+                    _skip_message(node)
+                elif all(stat_dct[dep] for dep in deps):
+                    waiting.remove(node)
+                    running[pool.submit(_call_worker, node)] = node
+
+            if not running:
+                continue
+
+            # Block until at least one of the running nodes finishes
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                stat_dct[node] = bool(future.result())
+
+    _WORKER = None
+
+
+def run_map(worker, items, njobs=1):
+    """ Call a function for each of a set of independent items using a
+        pool of `njobs` processes, returning the results in the order of
+        the items regardless of the order the calls finish in.
+
+        Unlike `run_graph`, errors raised by the function are raised
+        again here, as when the calls are made serially. The items and
+        results must be picklable.
+
+        :param worker: function called as `worker(item)`
+        :type worker: function
+        :param items: items to call the function for
+        :type items: tuple(obj)
+        :param njobs: number of calls that may run concurrently
+        :type njobs: int
+        :rtype: tuple(obj)
+    """
+
+    items = tuple(items)
+    if njobs <= 1 or len(items) <= 1:
+        results = tuple(worker(item) for item in items)
+    else:
+        global _WORKER
+        _WORKER = worker
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(njobs, len(items)),
+                    mp_context=multiprocessing.get_context('fork')) as pool:
+                results = tuple(pool.map(_map_worker, items))
+        finally:
+            _WORKER = None
+
+    return results
+
+
+def _map_worker(item):
+    """ Call the worker inherited from the parent for an item of the map
+    """
+    result = _WORKER(item)
+    sys.stdout.flush()
+    return result
+
+
+def _call_worker(node, worker=None, capture=True):
+    """ Run the worker for a node. If `capture` is set, any errors
+        (including calls to sys.exit) are captured so that a single
+        failure does not kill the pool; otherwise they are raised.
+    """
+
+    worker = worker if worker is not None else _WORKER
+    try:
+        success = worker(node)
+        success = True if success is None else bool(success)
+    except (Exception, SystemExit):  # pylint: disable=broad-except
+        if not capture:
+            raise
+        print('Node {} failed with the following error:'.format(node))
+        traceback.print_exc()
+        success = False
+    sys.stdout.flush()
+
+    return success
+
+
+def _topological_order(dep_dct):
+    """ Order the nodes such that each node appears after all of
+        the nodes it depends on, otherwise preserving the input order.
+
+        :param dep_dct: nodes and the nodes they each depend on
+        :type dep_dct: dict[obj: tuple(obj)]
+        :rtype: tuple(obj)
+    """
+
+    ordered, placed = [], set()
+    remaining = list(dep_dct)
+    while remaining:
+        for node in remaining:
+            if all(dep in placed for dep in dep_dct[node]):
+                ordered.append(node)
+                placed.add(node)
+                remaining.remove(node)
+                break
+
+    return tuple(ordered)
+
+
+def _check_graph(dep_dct):
+    """ Assess that all dependencies are nodes of the graph and that
+        the graph has no cycles.
+    """
+
+    for node, deps in dep_dct.items():
+        for dep in deps:
+            assert dep in dep_dct, (
+                'Dependency {} of node {} is not in graph'.format(dep, node))
+
+    # Cycle check via repeated removal of nodes with no dependencies
+    remaining = {node: set(deps) for node, deps in dep_dct.items()}
+    while remaining:
+        ready = [node for node, deps in remaining.items() if not deps]
+        assert ready, (
+            'Dependency graph has a cycle among {}'.format(tuple(remaining)))
+        for node in ready:
+            remaining.pop(node)
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _skip_message(node):
+    """ Print that a node is skipped due to a failed dependency
+    """
+    print('Skipping {} since a task it depends on failed'.format(node))
@@ -0,0 +1,196 @@
+""" Library to record the resources used by each run of an electronic
+    structure or helper program (ProjRot, MESS, ThermP, PAC99, OneDMin)
+    and to aggregate them into a report of the cost of a MechDriver run.
+
+    Each run is measured as it is launched from Python: the wall time, the
+    CPU time of the child processes it started, the host node and the
+    number of cores it was given. The measurement is appended as a JSON
+    line to a telemetry file at the root of the run filesystem, labeled
+    with the species, PES, task and theory level it was run for.
+
+    The labels are set by the drivers for the units of work they run
+    using `labels`, and are inherited by every run measured within them
+    (including by the worker processes of a pool started within them).
+
+    The CPU time is read from the resource usage of the child processes
+    of this process, which only holds the peak memory of the largest
+    child it has ever had, so runs measured this way have no peak memory.
+    Jobs of an asynchronous queue are recorded with `write` instead, with
+    the CPU time and peak memory of their own job script where the
+    executor reports them.
+
+    The records are kept in the telemetry file only, and not in the info
+    objects of the runs, whose fields are fixed by autofile.
+"""
+
+import os
+import json
+import time
+import socket
+import resource
+import contextlib
+
+
+TELEMETRY_NAME = 'telemetry.jsonl'
+
+# Fields of a record that runs may be grouped by in a report
+GROUP_KEYS = ('spc', 'pes', 'tsk', 'thy', 'prog')
+
+# Labels of the unit of work being run: {label: value}
+_LABELS = {}
+
+
+@contextlib.contextmanager
+def labels(**kwargs):
+    """ Label all runs measured within the context, on top of any labels
+        already set. The root of the run filesystem the records are
+        written to is set with the `prefix` label.
+
+        :param kwargs: labels of the unit of work, e.g., spc, pes, tsk, thy
+        :type kwargs: dict[str: str]
+    """
+
+    old_labels = dict(_LABELS)
+    _LABELS.update(kwargs)
+    try:
+        yield
+    finally:
+        _LABELS.clear()
+        _LABELS.update(old_labels)
+
+
+def current_labels():
+    """ Labels set for the runs measured now, for runs which are
+        recorded later with `write`.
+
+        :rtype: dict[str: str]
+    """
+    return dict(_LABELS)
+
+
+@contextlib.contextmanager
+def measure(prog, path, nprocs=1, **kwargs):
+    """ Measure the resources used by the run of a program within the
+        context and record them in the telemetry file.
+
+        The record is yielded so that the caller may read the resources
+        used once the context exits (e.g., the wall time of ES jobs is
+        kept to size later jobs). Nothing is recorded if the run raises an
+        exception.
+
+        No peak memory is recorded: that of RUSAGE_CHILDREN is the largest
+        of any child this process has had, not the peak of this run.
+
+        :param prog: name of the program
+        :type prog: str
+        :param path: directory the program is run in
+        :type path: str
+        :param nprocs: number of cores given to the run
+        :type nprocs: int
+        :param kwargs: labels of the run, added to those set by `labels`
+        :type kwargs: dict[str: str]
+    """
+
+    record = dict(_LABELS)
+    record.update(kwargs)
+    record.update({'prog': prog, 'path': path, 'nprocs': nprocs,
+                   'host': socket.gethostname()})
+
+    start_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start_time = time.time()
+    yield record
+    end_time = time.time()
+    end_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    record.update({
+        'start': start_time,
+        'wall': end_time - start_time,
+        'cpu': ((end_usage.ru_utime + end_usage.ru_stime) -
+                (start_usage.ru_utime + start_usage.ru_stime)),
+        'max_rss_mb': None,
+    })
+
+    write(record)
+
+
+def write(record):
+    """ Append a record to the telemetry file at the root of the run
+        filesystem given by its `prefix` label. The record is dropped
+        if it has no prefix.
+
+        :param record: resources used by a run and its labels
+        :type record: dict[str: obj]
+    """
+
+    prefix = record.get('prefix')
+    if prefix is not None:
+        # A single short append, so lines of concurrent runs do not mix
+        with open(os.path.join(prefix, TELEMETRY_NAME), 'a') as tel_obj:
+            tel_obj.write(json.dumps(record, default=str) + '\n')
+
+
+def read(prefix):
+    """ Read all of the records in the telemetry file of a run filesystem.
+
+        :param prefix: root of the run filesystem
+        :type prefix: str
+        :rtype: tuple(dict[str: obj])
+    """
+
+    records = []
+    tel_path = os.path.join(prefix, TELEMETRY_NAME)
+    if os.path.exists(tel_path):
+        with open(tel_path) as tel_obj:
+            for line in tel_obj:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Line left incomplete by a process that was killed
+                    pass
+
+    return tuple(records)
+
+
+def summarize(records, key):
+    """ Aggregate the cost of the runs for each value of a label.
+
+        Runs without the label are grouped under None. The PES of ES runs
+        for a transition state is taken from its name (ts_{pes}_...).
+
+        :param records: records read from a telemetry file
+        :type records: tuple(dict[str: obj])
+        :param key: label to group the runs by (see GROUP_KEYS)
+        :type key: str
+        :returns: number of runs, wall hours, CPU hours, core hours
+            (wall time times cores) and largest peak memory of each group,
+            None if no run of the group has a peak memory
+        :rtype: dict[str: dict[str: float]]
+    """
+
+    sum_dct = {}
+    for rec in records:
+        val = rec.get(key)
+        if val is None and key == 'pes':
+            val = _ts_pes(rec.get('spc'))
+        grp = sum_dct.setdefault(val, {
+            'nruns': 0, 'wall_hours': 0.0, 'cpu_hours': 0.0,
+            'core_hours': 0.0, 'max_rss_mb': None})
+        grp['nruns'] += 1
+        grp['wall_hours'] += rec['wall'] / 3600.0
+        grp['cpu_hours'] += (rec.get('cpu') or 0.0) / 3600.0
+        grp['core_hours'] += rec['wall'] * (rec.get('nprocs') or 1) / 3600.0
+        if rec.get('max_rss_mb') is not None:
+            grp['max_rss_mb'] = max(grp['max_rss_mb'] or 0.0,
+                                    rec['max_rss_mb'])
+
+    return sum_dct
+
+
+def _ts_pes(spc_name):
+    """ Index of the PES of a transition state from its name, None for a
+        species
+    """
+    pes = None
+    if spc_name is not None and spc_name.startswith('ts_'):
+        pes = spc_name.split('_')[1]
+    return pes
@@ -8,8 +8,12 @@ from mechlib.filesys._build import reaction_fs
 from mechlib.filesys._build import root_locs
 from mechlib.filesys._rct import rcts_cnf_fs
 from mechlib.filesys import mincnf
+from mechlib.filesys import fingerprint
+from mechlib.filesys import journal
 from mechlib.filesys import models
+from mechlib.filesys import parsed
 from mechlib.filesys import read
+from mechlib.filesys import running
 from mechlib.filesys import save
 
 
@@ -20,7 +24,11 @@ __all__ = [
     'root_locs',
     'rcts_cnf_fs',
     'mincnf',
+    'fingerprint',
+    'journal',
     'models',
+    'parsed',
     'read',
+    'running',
     'save'
 ]
@@ -0,0 +1,393 @@
+""" Registry of the conformers saved for a species at a level of theory,
+    used to sort the saved conformers by energy and to find the few a new
+    one could duplicate without reading the files of every one of them.
+
+    Each conformer is entered in the registry with its locators, its
+    energy at the level of theory (without zero-point energy), its
+    harmonic zero-point energy if its frequencies are saved, a fingerprint
+    of its structure, and its status: `saved` once its energy is saved, or
+    `pending` while only its geometry is. The fingerprint is the sorted
+    eigenvalues of its Coulomb matrix, which do not change with the
+    orientation of the structure or the order of its atoms.
+
+    Saved entries are bucketed by their energy in bins of ENE_THRESH, the
+    threshold under which two conformers are compared for uniqueness, so
+    the conformers a new one must be compared against are found in its
+    own bin and the two neighboring ones. Of those, the ones with
+    fingerprints that could be symmetrically equivalent to it are found by
+    comparing fingerprints with a tolerance looser than that of the exact
+    comparison.
+
+    For ring conformer sampling, entries also hold the fingerprint of the
+    ring fragments of their structure, filled in with
+    `add_fragment_spectra`, so that a sample is only compared against
+    the saved conformers whose ring fragments it could duplicate.
+
+    The registry is kept in a file in the trunk of the CONFORMER save
+    filesystem, one for each level of theory, named by a hash of the
+    level. When it is loaded, it is brought up to date with the
+    conformers in the filesystem, so conformers saved without it (e.g.,
+    by another process, or before it existed) are entered, removed
+    conformers are dropped, and pending conformers whose energies have
+    since been saved are filled in. Only the files of those conformers
+    are read. Callers that only read the filesystem load it without
+    writing it, keeping the changes in memory.
+"""
+
+import os
+import json
+import hashlib
+import numpy
+import automol
+import autofile
+from phydat import phycon
+
+
+INDEX_VERSION = 2
+INDEX_NAME = 'fingerprints.{}.json'
+
+# Energy difference (hartree) under which two conformers are compared
+ENE_THRESH = 1.0e-5
+
+# Relative tolerance for fingerprints of candidates for the exact
+# comparison; looser than the tolerance of the symmetry check (1e-2)
+SPEC_RTOL = 2.0e-2
+
+# Index last loaded for each file: {path: (mtime, index)}
+_INDEX_CACHE = {}
+
+
+def spectrum(geo):
+    """ Fingerprint of a structure: the sorted eigenvalues of its
+        Coulomb matrix.
+
+        :param geo: molecular geometry
+        :type geo: automol geometry data structure
+        :rtype: tuple(float)
+    """
+    return tuple(float(val) for val in automol.geom.coulomb_spectrum(geo))
+
+
+def build(entries):
+    """ Build an index from its entries.
+
+        :param entries: entries of the index, each a dictionary of the
+            locators (`locs`), energy (`ene`) and fingerprint (`spec`) of
+            a conformer, along with its zero-point energy (`zpe`) and
+            status (`status`) if known
+        :type entries: list(dict[str: obj])
+        :rtype: dict[str: obj]
+    """
+
+    idx = {'entries': {}, 'bins': {}}
+    for entry in entries:
+        _enter(idx, entry)
+
+    return idx
+
+
+def candidates(idx, ene, spec=None, ethresh=ENE_THRESH):
+    """ Find the entries of conformers that a conformer could duplicate:
+        those with energies within `ethresh` of it and, if a fingerprint
+        is given, with fingerprints close enough to it to be equivalent.
+
+        :param idx: conformer index
+        :type idx: dict[str: obj]
+        :param ene: energy of the conformer
+        :type ene: float
+        :param spec: fingerprint of the conformer
+        :type spec: tuple(float)
+        :param ethresh: energy difference under which to compare
+        :type ethresh: float
+        :rtype: list(dict[str: obj])
+    """
+
+    ebin = _energy_bin(ene)
+    nbins = int(numpy.ceil(ethresh / ENE_THRESH))
+    entries = []
+    for ebin_ in range(ebin - nbins, ebin + nbins + 1):
+        for key in idx['bins'].get(ebin_, ()):
+            entry = idx['entries'][key]
+            if abs(entry['ene'] - ene) < ethresh:
+                if spec is None or _close_spectra(spec, entry['spec']):
+                    entries.append(entry)
+
+    # Sorted by locators so comparisons do not depend on the save order
+    return sorted(entries, key=lambda entry: entry['locs'])
+
+
+def conformers(idx, status='saved'):
+    """ Get the entries of the conformers with a status, those with
+        energies sorted from lowest to highest energy.
+
+        :param idx: conformer index
+        :type idx: dict[str: obj]
+        :param status: status of the conformers
+        :type status: str
+        :rtype: list(dict[str: obj])
+    """
+
+    entries = [entry for entry in idx['entries'].values()
+               if entry['status'] == status]
+    if status == 'saved':
+        entries.sort(key=lambda entry: (entry['ene'], entry['locs']))
+
+    return entries
+
+
+def fragment_candidates(idx, frag_spec, rtol):
+    """ Find the entries of saved conformers whose ring fragments could be
+        equivalent to those of a structure: those with fragment
+        fingerprints within `rtol` of its own.
+
+        :param idx: conformer index
+        :type idx: dict[str: obj]
+        :param frag_spec: fingerprint of the ring fragments of the structure
+        :type frag_spec: tuple(float)
+        :param rtol: relative tolerance on the fingerprints
+        :type rtol: float
+        :rtype: list(dict[str: obj])
+    """
+
+    entries = [entry for entry in conformers(idx)
+               if entry['frag_spec'] is not None and
+               _close_spectra(frag_spec, entry['frag_spec'], rtol=rtol)]
+
+    return sorted(entries, key=lambda entry: entry['locs'])
+
+
+def load(cnf_save_fs, thy_info, locs_lst=None, zpe=False, write=True):
+    """ Load the index of the conformers in a CONFORMER save filesystem,
+        bringing it up to date with the conformers in the filesystem.
+
+        Conformers without an energy at the level of theory saved yet are
+        entered as pending, to be filled in when the index is next loaded.
+        Zero-point energies are read as conformers are entered; those of
+        conformers whose frequencies were saved later are only looked for
+        if requested with `zpe`. Without `write`, the index is only
+        brought up to date in memory, and nothing is written to the
+        filesystem.
+
+        :param cnf_save_fs: CONFORMER save filesystem object
+        :type cnf_save_fs: autofile.fs.conformer object
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :param locs_lst: locators of the conformers in the filesystem,
+            if already listed
+        :type locs_lst: tuple(tuple(str))
+        :param zpe: look for zero-point energies missing from the index
+        :type zpe: bool
+        :param write: write the index if it has changed
+        :type write: bool
+        :rtype: dict[str: obj]
+    """
+
+    level = list(thy_info[1:4])
+    if write:
+        cnf_save_fs[0].create()
+    idx_path = _path(cnf_save_fs, level)
+
+    idx = _read(idx_path, level)
+    if locs_lst is None:
+        locs_lst = cnf_save_fs[-1].existing()
+    saved_keys = set()
+    changed = False
+    for locs in locs_lst:
+        key = _key(locs)
+        saved_keys.add(key)
+        entry = idx['entries'].get(key)
+        if entry is None or entry['status'] == 'pending':
+            entry = _saved_entry(cnf_save_fs, locs, thy_info)
+            if entry['status'] == 'saved' or key not in idx['entries']:
+                _enter(idx, entry)
+                changed = True
+        elif zpe and entry['zpe'] is None:
+            entry['zpe'] = _zero_point_energy(cnf_save_fs, locs)
+            changed = changed or entry['zpe'] is not None
+
+    for key in set(idx['entries']) - saved_keys:
+        _remove(idx, key)
+        changed = True
+
+    # Changes made without writing are kept in the cached index, to be
+    # written when it is next loaded to be written
+    changed = changed or idx.get('unwritten', False)
+    idx['path'] = idx_path
+    idx['level'] = level
+    idx['unwritten'] = changed and not write
+    if changed and write:
+        _write(idx)
+
+    return idx
+
+
+def add(idx, locs, geo, ene):
+    """ Enter a newly saved conformer in the index and write it.
+
+        :param idx: conformer index, as loaded by `load`
+        :type idx: dict[str: obj]
+        :param locs: locators of the conformer
+        :type locs: tuple(str)
+        :param geo: molecular geometry of the conformer
+        :type geo: automol geometry data structure
+        :param ene: energy of the conformer
+        :type ene: float
+    """
+    _enter(idx, {'locs': list(locs), 'ene': ene, 'spec': spectrum(geo)})
+    _write(idx)
+
+
+def add_fragment_spectra(idx, cnf_save_fs):
+    """ Fill in the fingerprints of the ring fragments of the saved
+        conformers that have none yet, reading only their geometries, and
+        write the index if any were.
+
+        :param idx: conformer index, as loaded by `load`
+        :type idx: dict[str: obj]
+        :param cnf_save_fs: CONFORMER save filesystem object
+        :type cnf_save_fs: autofile.fs.conformer object
+    """
+
+    changed = False
+    for entry in conformers(idx):
+        if entry['frag_spec'] is None:
+            geo = cnf_save_fs[-1].file.geometry.read(entry['locs'])
+            entry['frag_spec'] = spectrum(
+                automol.geom.ring_fragments_geometry(geo))
+            changed = True
+
+    if changed:
+        _write(idx)
+
+
+# Helpers
+def _saved_entry(cnf_save_fs, locs, thy_info):
+    """ Build the entry of a conformer from its files, pending if it has
+        no energy saved at the level of theory
+    """
+
+    path = cnf_save_fs[-1].path(locs)
+    sp_save_fs = autofile.fs.single_point(path)
+    if sp_save_fs[-1].file.energy.exists(thy_info[1:4]):
+        ene = sp_save_fs[-1].file.energy.read(thy_info[1:4])
+        geo = cnf_save_fs[-1].file.geometry.read(locs)
+        entry = {'locs': list(locs), 'ene': ene, 'spec': spectrum(geo),
+                 'zpe': _zero_point_energy(cnf_save_fs, locs),
+                 'status': 'saved'}
+    else:
+        entry = {'locs': list(locs), 'ene': None, 'spec': (),
+                 'status': 'pending'}
+
+    return entry
+
+
+def _zero_point_energy(cnf_save_fs, locs):
+    """ Harmonic zero-point energy (hartree) of a conformer from its saved
+        frequencies, None if it has none
+    """
+
+    zpe = None
+    if cnf_save_fs[-1].file.harmonic_frequencies.exists(locs):
+        freqs = cnf_save_fs[-1].file.harmonic_frequencies.read(locs)
+        zpe = (sum(freq for freq in freqs if freq > 0.0) / 2.0 *
+               phycon.WAVEN2EH)
+
+    return zpe
+
+
+def _enter(idx, entry):
+    """ Add an entry to the index in memory
+    """
+    key = _key(entry['locs'])
+    if key in idx['entries']:
+        _remove(idx, key)
+    entry = dict({'zpe': None, 'frag_spec': None, 'status': 'saved'},
+                 **entry)
+    entry.update(locs=list(entry['locs']), spec=tuple(entry['spec']))
+    if entry['frag_spec'] is not None:
+        entry['frag_spec'] = tuple(entry['frag_spec'])
+    idx['entries'][key] = entry
+    if entry['status'] == 'saved':
+        idx['bins'].setdefault(_energy_bin(entry['ene']), []).append(key)
+
+
+def _remove(idx, key):
+    """ Drop an entry from the index in memory
+    """
+    entry = idx['entries'].pop(key)
+    if entry['status'] == 'saved':
+        ebin = _energy_bin(entry['ene'])
+        idx['bins'][ebin].remove(key)
+        if not idx['bins'][ebin]:
+            idx['bins'].pop(ebin)
+
+
+def _read(idx_path, level):
+    """ Read the index for a level of theory from its file, an empty index
+        if there is none or it was written for another version or level
+    """
+
+    mtime = os.path.getmtime(idx_path) if os.path.exists(idx_path) else None
+    cached_mtime, idx = _INDEX_CACHE.get(idx_path, (None, None))
+    if idx is None or mtime != cached_mtime:
+        entries = []
+        if mtime is not None:
+            try:
+                with open(idx_path) as idx_obj:
+                    idx_dct = json.load(idx_obj)
+            except ValueError:
+                idx_dct = {}
+            if (idx_dct.get('version') == INDEX_VERSION and
+                    idx_dct.get('level') == level):
+                entries = idx_dct['entries']
+        idx = build(entries)
+        _INDEX_CACHE[idx_path] = (mtime, idx)
+
+    return idx
+
+
+def _write(idx):
+    """ Write the index to its file, replacing the file at once so that
+        readers in other processes never see it partly written
+    """
+
+    idx_dct = {
+        'version': INDEX_VERSION,
+        'level': idx['level'],
+        'entries': [dict(entry, spec=list(entry['spec']))
+                    for entry in idx['entries'].values()]
+    }
+    tmp_path = '{}.{}.tmp'.format(idx['path'], os.getpid())
+    with open(tmp_path, 'w') as idx_obj:
+        json.dump(idx_dct, idx_obj)
+    os.replace(tmp_path, idx['path'])
+
+    _INDEX_CACHE[idx['path']] = (os.path.getmtime(idx['path']), idx)
+
+
+def _path(cnf_save_fs, level):
+    """ Path to the index for a level of theory in the filesystem
+    """
+    level_hash = hashlib.sha1(json.dumps(level).encode('utf-8')).hexdigest()
+    return os.path.join(cnf_save_fs[0].path(),
+                        INDEX_NAME.format(level_hash[:12]))
+
+
+def _key(locs):
+    """ Key of an entry from the locators of its conformer
+    """
+    return '/'.join(map(str, locs))
+
+
+def _energy_bin(ene):
+    """ Energy bin of a conformer
+    """
+    return int(numpy.floor(ene / ENE_THRESH))
+
+
+def _close_spectra(spec1, spec2, rtol=SPEC_RTOL):
+    """ Assess if two fingerprints are close enough for the structures to
+        be equivalent
+    """
+    return (len(spec1) == len(spec2) and
+            numpy.allclose(spec1, spec2, rtol=rtol, atol=0.0))
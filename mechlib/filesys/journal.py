@@ -0,0 +1,144 @@
+""" Journal of the units of work (a task for a species at some level
+    of theory) completed in a save filesystem.
+
+    The journal is an append-only file at the root of the save filesystem,
+    with one JSON line written as each unit finishes. On a restart, a unit
+    found in the journal can be skipped without walking the filesystem
+    to find that its work is already done.
+
+    Each unit is identified by a key hashed from everything that sets
+    what the unit computes: the identity of the species (or TS), the task,
+    and the task keywords, where theory level names are replaced by the
+    full methods they refer to. Keywords that only control how the work
+    is run (e.g., retries or the number of jobs) are not part of the key.
+"""
+
+import os
+import json
+import time
+import hashlib
+
+
+JOURNAL_NAME = 'journal.jsonl'
+
+# Species information that sets what a task computes for it
+SPC_ID_KEYS = (
+    'inchi', 'charge', 'mult', 'rxn_info', 'zma_idx', 'ts_idx', 'ts_search',
+    'active', 'elec_levels', 'hind_inc', 'tors_names', 'kickoff',
+    'mc_nsamp', 'tau_nsamp'
+)
+# Task keywords that do not change the result of the task
+RUNTIME_KEYS = ('overwrite', 'retryfail', 'njobs', 'executor', 'nprocs')
+# Task keywords naming levels of theory in the theory dictionary
+THY_KEYS = (
+    'runlvl', 'inplvl', 'var_splvl1', 'var_splvl2', 'var_scnlvl',
+    'geolvl', 'proplvl'
+)
+
+# Keys read from each journal: {path: (bytes read, set(keys))}
+_JOURNAL_CACHE = {}
+
+
+def unit_key(spc_name, spc_dct_i, tsk, keyword_dct, thy_dct):
+    """ Build the key which identifies a unit of work in the journal.
+
+        :param spc_name: mechanism name of the species
+        :type spc_name: str
+        :param spc_dct_i: species dictionary for the species
+        :type spc_dct_i: dict[str: obj]
+        :param tsk: name of the task
+        :type tsk: str
+        :param keyword_dct: keyword-value pairs for the task
+        :type keyword_dct: dict[str: obj]
+        :param thy_dct: all of the theory information
+        :type thy_dct: dict[str: dict]
+        :rtype: str
+    """
+
+    # TS identified by name as the reaction may have several TSs
+    spc_id = {key: spc_dct_i.get(key) for key in SPC_ID_KEYS}
+    if 'ts_' in spc_name:
+        spc_id['name'] = spc_name
+
+    kwd_id = {}
+    for key, val in keyword_dct.items():
+        if key in THY_KEYS:
+            kwd_id[key] = thy_dct.get(val)
+        elif key not in RUNTIME_KEYS:
+            kwd_id[key] = val
+
+    unit_str = json.dumps([spc_id, tsk, kwd_id], sort_keys=True, default=str)
+
+    return hashlib.sha1(unit_str.encode('utf-8')).hexdigest()
+
+
+def is_complete(save_prefix, key):
+    """ Assess if a unit of work is recorded as complete in the journal.
+
+        :param save_prefix: root-path to the save-filesystem
+        :type save_prefix: str
+        :param key: key of the unit built by `unit_key`
+        :type key: str
+        :rtype: bool
+    """
+    return key in _read(save_prefix)
+
+
+def record(save_prefix, key, spc_name, tsk):
+    """ Append a completed unit of work to the journal. The species name
+        and task are written as well for the benefit of anyone reading it.
+
+        :param save_prefix: root-path to the save-filesystem
+        :type save_prefix: str
+        :param key: key of the unit built by `unit_key`
+        :type key: str
+        :param spc_name: mechanism name of the species
+        :type spc_name: str
+        :param tsk: name of the task
+        :type tsk: str
+    """
+
+    line = json.dumps({
+        'key': key,
+        'spc': spc_name,
+        'tsk': tsk,
+        'time': time.strftime('%Y-%m-%d %H:%M:%S')
+    }) + '\n'
+
+    # A single write to a file opened for appending is not interleaved
+    # with those from other processes
+    fdesc = os.open(_path(save_prefix),
+                    os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fdesc, line.encode('utf-8'))
+    finally:
+        os.close(fdesc)
+
+
+def _read(save_prefix):
+    """ Read the keys of the journal, only parsing the lines added since
+        the journal was last read by this process
+    """
+
+    path = _path(save_prefix)
+    nread, keys = _JOURNAL_CACHE.get(path, (0, set()))
+    if os.path.exists(path) and os.path.getsize(path) > nread:
+        with open(path, 'rb') as jrnl_obj:
+            jrnl_obj.seek(nread)
+            new_bytes = jrnl_obj.read()
+        # Leave any partially written last line for the next read
+        end = new_bytes.rfind(b'\n') + 1
+        for line in new_bytes[:end].decode('utf-8').splitlines():
+            try:
+                keys.add(json.loads(line)['key'])
+            except (ValueError, KeyError):
+                pass
+        _JOURNAL_CACHE[path] = (nread + end, keys)
+
+    return keys
+
+
+def _path(save_prefix):
+    """ Path to the journal in the save filesystem
+    """
+    return os.path.join(save_prefix, JOURNAL_NAME)
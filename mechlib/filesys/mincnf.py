@@ -2,10 +2,10 @@
   Functions to read the filesystem and pull objects from it
 """
 
-import time
 import autofile
 from phydat import phycon
 from mechlib.amech_io import printer as ioprinter
+from mechlib.filesys import fingerprint
 
 
 def min_energy_conformer_locators(cnf_save_fs, mod_thy_info):
@@ -60,6 +60,7 @@ def conformer_locators(cnf_save_fs, mod_thy_info, cnf_range='min'):
     if cnf_locs_lst:
         cnf_locs_lst, cnf_enes_lst = _sorted_cnf_lsts(
             cnf_locs_lst, cnf_save_fs, mod_thy_info)
+    if cnf_locs_lst:
         if cnf_range == 'min':
             fin_locs_lst = (cnf_locs_lst[0],)
         elif cnf_range == 'all':
@@ -94,49 +95,23 @@ def _sorted_cnf_lsts(cnf_locs_lst, cnf_save_fs, mod_thy_info):
         :rtype (tuple(tuple(tuple(str),tuple(str))), tuple(float))
     """
 
-    fnd_cnf_enes_lst = []
-    fnd_cnf_locs_lst = []
     if len(cnf_locs_lst) == 1:
-        fnd_cnf_enes_lst = [10]
-        fnd_cnf_locs_lst = cnf_locs_lst
-    else:
-        for idx, locs in enumerate(cnf_locs_lst):
-            cnf_path = cnf_save_fs[-1].path(locs)
-            sp_fs = autofile.fs.single_point(cnf_path)
-
-            if sp_fs[-1].file.energy.exists(mod_thy_info[1:4]):
-                fnd_cnf_enes_lst.append(sp_fs[-1].file.energy.read(
-                    mod_thy_info[1:4]))
-                fnd_cnf_locs_lst.append(cnf_locs_lst[idx])
-            else:
-                ioprinter.info_message(
-                    'No energy saved in single point directory for {}'
-                    .format(cnf_path))
-                geo_inf_obj = cnf_save_fs[-1].file.geometry_info.read(
-                    mod_thy_info[1:4])
-                geo_end_time = geo_inf_obj.utc_end_time
-                current_time = autofile.schema.utc_time()
-                if (current_time - geo_end_time).total_seconds() < 120:
-                    wait_time = (
-                        120 - (current_time - geo_end_time).total_seconds()
-                    )
-                    ioprinter.info_message(
-                        'Geo was saved in the last ' +
-                        '{:3.2f} seconds, waiting for {:3.2f} seconds'.format(
-                            (current_time - geo_end_time).total_seconds(),
-                            wait_time))
-                    time.sleep(wait_time)
-                    if sp_fs[-1].file.energy.exists(mod_thy_info[1:4]):
-                        fnd_cnf_enes_lst.append(sp_fs[-1].file.energy.read(
-                            mod_thy_info[1:4]))
-                        fnd_cnf_locs_lst.append(cnf_locs_lst[idx])
-                        ioprinter.info_message('the energy is now found')
-                    else:
-                        ioprinter.info_message('waiting helped nothing')
-
-    # Sort the cnf locs and cnf enes
-    cnf_enes_lst, cnf_locs_lst = zip(
-        *sorted(zip(fnd_cnf_enes_lst, fnd_cnf_locs_lst)))
+        return cnf_locs_lst, (10,)
+
+    # Energies are read from the conformer registry rather than from
+    # the single point directory of every conformer, without writing it
+    # since this is also used by the tasks only reading the filesystem
+    cnf_idx = fingerprint.load(
+        cnf_save_fs, mod_thy_info, locs_lst=cnf_locs_lst, write=False)
+    for entry in fingerprint.conformers(cnf_idx, status='pending'):
+        ioprinter.info_message(
+            'No energy saved in single point directory for {}'
+            .format(cnf_save_fs[-1].path(entry['locs'])))
+
+    locs_dct = {tuple(locs): locs for locs in cnf_locs_lst}
+    entries = fingerprint.conformers(cnf_idx)
+    cnf_locs_lst = tuple(locs_dct[tuple(entry['locs'])] for entry in entries)
+    cnf_enes_lst = tuple(entry['ene'] for entry in entries)
 
     return cnf_locs_lst, cnf_enes_lst
 
@@ -221,13 +196,16 @@ def locs_sort(save_fs):
     return sorted_locs
 
 
-def traj_sort(save_fs, mod_thy_info, rid=None):
+def traj_sort(save_fs, mod_thy_info, rid=None, cnf_idx=None):
     """ Reads all geometries and energies which exist at the
         lowest sub-layer of some specified layer in the save
         filesystem.
 
         The energies are obtained from the `SP`  sub-layer that
-        corresponds to the specified electronic structure method.
+        corresponds to the specified electronic structure method,
+        or from the conformer registry if it is given (see
+        `fingerprint`), in which case only the saved conformers in
+        it are written.
         The geometries and energies are then sorted together such
         that the energies are in ascending order.
 
@@ -241,16 +219,23 @@ def traj_sort(save_fs, mod_thy_info, rid=None):
         :type mod_thy_info: ???
         :param rid: ring-id locator for CONF filesystem
         :type rid: str
+        :param cnf_idx: conformer registry, as loaded by fingerprint.load
+        :type cnf_idx: dict[str: obj]
     """
 
-    locs_lst = save_fs[-1].existing()
-    if locs_lst:
+    if cnf_idx is not None:
+        entries = fingerprint.conformers(cnf_idx)
+        locs_lst = [tuple(entry['locs']) for entry in entries]
+        enes = [entry['ene'] for entry in entries]
+    else:
+        locs_lst = save_fs[-1].existing()
         enes = []
         for locs in locs_lst:
             cnf_path = save_fs[-1].path(locs)
             sp_fs = autofile.fs.single_point(cnf_path)
             enes.append(
                 sp_fs[-1].file.energy.read(mod_thy_info[1:4]))
+    if locs_lst:
         geos = [save_fs[-1].file.geometry.read(locs)
                 for locs in locs_lst]
         traj = []
@@ -263,25 +248,14 @@ def traj_sort(save_fs, mod_thy_info, rid=None):
         save_fs[0].file.trajectory.write(traj)
 
         if rid is not None:
-            locs_lst = save_fs[-1].existing()
-            if locs_lst:
-                enes, geos = [], []
-                for locs in locs_lst:
-                    trid, _ = locs
-                    if trid == rid:
-                        cnf_path = save_fs[-1].path(locs)
-                        sp_fs = autofile.fs.single_point(cnf_path)
-                        enes.append(
-                            sp_fs[-1].file.energy.read(mod_thy_info[1:4]))
-                        geos.append(save_fs[-1].file.geometry.read(locs))
-                traj = []
-                traj_sort_data = sorted(
-                    zip(enes, geos, locs_lst), key=lambda x: x[0])
-                for ene, geo, locs in traj_sort_data:
+            # The geometries already read are reused for the ring
+            traj = []
+            for ene, geo, locs in traj_sort_data:
+                if locs[0] == rid:
                     comment = (
                         'energy: {0:>15.10f} \t {1} {2}'
                     ).format(ene, locs[0], locs[1])
                     traj.append((geo, comment))
-                traj_path = save_fs[1].file.trajectory.path([rid])
-                print("Updating trajectory file at {}".format(traj_path))
-                save_fs[1].file.trajectory.write(traj, [rid])
+            traj_path = save_fs[1].file.trajectory.path([rid])
+            print("Updating trajectory file at {}".format(traj_path))
+            save_fs[1].file.trajectory.write(traj, [rid])
@@ -0,0 +1,281 @@
+""" Sidecar files with the values parsed from the output of an electronic
+    structure job, so that the output is only parsed once.
+
+    When a job finishes, its output is assessed for success and the values
+    it was run to obtain (energy, geometry, Z-Matrix, gradient, Hessian)
+    are read from it in a single pass. These are written to a JSON sidecar
+    file in the RUN directory of the job, next to the output, with arrays
+    as nested lists, along with the size and modification time of the
+    output they were read from and the version of the format.
+
+    The readers in this module have the same signatures as the readers of
+    elstruct. They return the value stored for an output string if one has
+    been loaded for it, and fall back to parsing the string otherwise, so
+    a sidecar that is missing or stale (the output has since changed)
+    only costs the full parse it was meant to avoid. The values loaded
+    are held in memory by the path, size and modification time of the
+    output, and by the hash of the output string for the readers; the
+    outputs themselves are not held.
+"""
+
+import os
+import json
+import collections
+import numpy
+import elstruct
+
+
+# Changing the version invalidates all existing sidecars; bump it whenever
+# the values stored in them, or how they are read, change
+PARSED_VERSION = 2
+SIDECAR_NAME = 'run.parsed.json'
+
+# Values read from the output of each successful job
+JOB_FIELD_DCT = {
+    elstruct.Job.ENERGY: ('energy',),
+    elstruct.Job.GRADIENT: ('gradient',),
+    elstruct.Job.HESSIAN: ('hessian', 'harmonic_frequencies'),
+    elstruct.Job.OPTIMIZATION: ('energy', 'opt_geometry', 'opt_zmatrix'),
+}
+
+# Number of outputs whose values are held in memory
+MEMO_SIZE = 64
+
+# Values loaded for recently read sidecars: {(output path, size, mtime): dct}
+_SIDECAR_MEMO = collections.OrderedDict()
+
+# Values for recently read outputs: {(length, hash of the string): dct}
+_MEMO = collections.OrderedDict()
+
+
+def write(path, out_path, job, prog, method, out_str, success):
+    """ Parse the values for a finished job from its output and write
+        them to the sidecar file in the RUN directory of the job.
+
+        :param path: RUN directory of the job
+        :type path: str
+        :param out_path: path to the output file of the job, as written
+        :type out_path: str
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param prog: name of the electronic structure program
+        :type prog: str
+        :param method: name of the electronic structure method
+        :type method: str
+        :param out_str: string for job output file
+        :type out_str: str
+        :param success: whether the job was assessed as successful
+        :type success: bool
+        :returns: the parsed values
+        :rtype: dict[str: obj]
+    """
+
+    parsed_dct = {
+        'version': PARSED_VERSION,
+        'output': list(_output_key(out_path)[1:]),
+        'job': job,
+        'prog': prog,
+        'method': method,
+        'success': bool(success),
+        'arrays': [],
+    }
+    if success:
+        for field in JOB_FIELD_DCT.get(job, ()):
+            try:
+                val = _parse(field, prog, method, out_str)
+            except Exception:  # pylint: disable=broad-except
+                # Left for the full parse, which raises where it is needed
+                continue
+            parsed_dct[field] = val
+            if isinstance(val, numpy.ndarray):
+                parsed_dct['arrays'].append(field)
+
+    sidecar_path = os.path.join(path, SIDECAR_NAME)
+    tmp_path = '{}.{}.tmp'.format(sidecar_path, os.getpid())
+    with open(tmp_path, 'w') as parsed_obj:
+        json.dump(parsed_dct, parsed_obj, default=_json_value)
+    os.replace(tmp_path, sidecar_path)
+
+    _remember(_SIDECAR_MEMO, _output_key(out_path), parsed_dct)
+    remember(out_str, parsed_dct)
+
+    return parsed_dct
+
+
+def read(path, out_path):
+    """ Read the sidecar file in the RUN directory of a job, if it exists
+        and was written for the output file as it is now.
+
+        :param path: RUN directory of the job
+        :type path: str
+        :param out_path: path to the output file of the job
+        :type out_path: str
+        :returns: the parsed values (None if missing or stale)
+        :rtype: dict[str: obj]
+    """
+
+    out_key = _output_key(out_path)
+    parsed_dct = _SIDECAR_MEMO.get(out_key)
+    if parsed_dct is not None:
+        return parsed_dct
+
+    sidecar_path = os.path.join(path, SIDECAR_NAME)
+    if os.path.exists(sidecar_path):
+        try:
+            with open(sidecar_path) as parsed_obj:
+                parsed_dct = json.load(parsed_obj)
+        except ValueError:
+            parsed_dct = None
+        if (parsed_dct is not None and
+                (parsed_dct.get('version') != PARSED_VERSION or
+                 parsed_dct.get('output') != list(out_key[1:]))):
+            parsed_dct = None
+
+    if parsed_dct is not None:
+        parsed_dct = _from_json(parsed_dct)
+        _remember(_SIDECAR_MEMO, out_key, parsed_dct)
+
+    return parsed_dct
+
+
+def remember(out_str, parsed_dct):
+    """ Hold the values parsed from an output in memory for the readers
+        of this module.
+
+        :param out_str: string for job output file
+        :type out_str: str
+        :param parsed_dct: the parsed values, as read by `read`
+        :type parsed_dct: dict[str: obj]
+    """
+    _remember(_MEMO, _string_key(out_str), parsed_dct)
+
+
+# Readers matching those of elstruct
+def energy(prog, method, out_str):
+    """ Read the energy from the output string
+
+        :rtype: float
+    """
+    return _value('energy', prog, method, out_str)
+
+
+def opt_geometry(prog, out_str):
+    """ Read the optimized geometry from the output string
+
+        :rtype: automol geometry data structure
+    """
+    return _value('opt_geometry', prog, None, out_str)
+
+
+def opt_zmatrix(prog, out_str):
+    """ Read the optimized Z-Matrix from the output string
+
+        :rtype: automol Z-Matrix data structure
+    """
+    return _value('opt_zmatrix', prog, None, out_str)
+
+
+def gradient(prog, out_str):
+    """ Read the gradient from the output string
+
+        :rtype: tuple(tuple(float))
+    """
+    return _value('gradient', prog, None, out_str)
+
+
+def hessian(prog, out_str):
+    """ Read the Hessian from the output string
+
+        :rtype: tuple(tuple(float))
+    """
+    return _value('hessian', prog, None, out_str)
+
+
+def harmonic_frequencies(prog, out_str):
+    """ Read the harmonic frequencies from the output string
+
+        :rtype: tuple(float)
+    """
+    return _value('harmonic_frequencies', prog, None, out_str)
+
+
+# Helpers
+def _value(field, prog, method, out_str):
+    """ Value stored for the output, or parsed from it if there is none
+    """
+
+    parsed_dct = _MEMO.get(_string_key(out_str))
+    if (parsed_dct is not None and field in parsed_dct and
+            parsed_dct['prog'] == prog and
+            (method is None or parsed_dct['method'] == method)):
+        val = parsed_dct[field]
+    else:
+        val = _parse(field, prog, method, out_str)
+
+    return val
+
+
+def _parse(field, prog, method, out_str):
+    """ Parse a value from the output with the elstruct reader
+    """
+    if field == 'energy':
+        val = elstruct.reader.energy(prog, method, out_str)
+    else:
+        val = getattr(elstruct.reader, field)(prog, out_str)
+    return val
+
+
+def _remember(memo, key, parsed_dct):
+    """ Hold the values for an output in a memo, dropping the oldest
+    """
+    memo[key] = parsed_dct
+    memo.move_to_end(key)
+    while len(memo) > MEMO_SIZE:
+        memo.popitem(last=False)
+
+
+def _output_key(out_path):
+    """ Key of an output file: its path, size and modification time
+    """
+    stat = os.stat(out_path)
+    return (out_path, stat.st_size, stat.st_mtime)
+
+
+def _string_key(out_str):
+    """ Key of an output string; the hash of a string is computed once and
+        kept with it, so looking it up again does not go through it
+    """
+    return (len(out_str), hash(out_str))
+
+
+def _json_value(val):
+    """ JSON value of a numpy array or number, as nested lists
+    """
+    if not hasattr(val, 'tolist'):
+        raise TypeError('{} is not JSON serializable'.format(val))
+    return val.tolist()
+
+
+def _from_json(parsed_dct):
+    """ Values of a sidecar as read from the JSON file: nested lists back
+        to the tuples the elstruct readers give, or arrays for those
+        that were arrays
+    """
+
+    parsed_dct = dict(parsed_dct)
+    for field in JOB_FIELD_DCT[parsed_dct['job']]:
+        if field in parsed_dct:
+            if field in parsed_dct['arrays']:
+                parsed_dct[field] = numpy.array(parsed_dct[field])
+            else:
+                parsed_dct[field] = _tuples(parsed_dct[field])
+
+    return parsed_dct
+
+
+def _tuples(val):
+    """ Convert nested lists to nested tuples
+    """
+    if isinstance(val, list):
+        val = tuple(_tuples(sub_val) for sub_val in val)
+    return val
@@ -0,0 +1,328 @@
+""" Index of the conformer optimizations running in a CONFORMER run
+    filesystem, used to see if an equivalent conformer is already being
+    optimized without reading the info and input of every run in it.
+
+    The index is an append-only file in the trunk of the run filesystem,
+    with one JSON line written as each optimization starts, giving its
+    locators, start time and a fingerprint of its input Z-Matrix (its
+    atoms and connectivity and the values of all of its coordinates), and
+    one as it finishes. The lines are replayed into the set of running
+    optimizations, only the lines added since the index was last read by
+    this process being parsed, so the processes sharing the filesystem
+    see each other's runs.
+
+    A conformer is taken to be running if a running optimization has the
+    same Z-Matrix, with distances within DIST_RTOL and angles within
+    ANG_ATOL of its own, so the check only goes through the few
+    optimizations running at once however many runs the filesystem holds.
+    Optimizations started more than MAX_AGE seconds ago, or whose run is
+    no longer marked as running when they match, are not taken to be
+    running, so a run that died without finishing does not block the
+    conformer for good.
+
+    Lines are only appended while holding a lock file next to the index.
+    Once the index grows past MAX_SIZE bytes, it is compacted under the
+    same lock when an optimization finishes: the optimizations still
+    running are written to a new file, which replaces the index in one
+    step, so no line is lost and readers, which take no lock, never find
+    the index missing. The new index starts with a line marking the
+    compaction so that processes reading it know to read it anew.
+"""
+
+import os
+import json
+import time
+import contextlib
+import numpy
+import automol
+import autofile
+import elstruct
+
+
+INDEX_NAME = 'running.jsonl'
+
+# Tolerances on the distances (relative) and angles (radian) of the
+# Z-Matrices of equivalent conformers
+DIST_RTOL = 0.018
+ANG_ATOL = 0.2
+
+# Seconds after which an optimization is no longer taken to be running
+MAX_AGE = 3000000.0
+
+# Size (bytes) of the index past which it is compacted
+MAX_SIZE = 1000000
+
+# Seconds after which a lock is taken to be left by a killed process, and
+# seconds between attempts to take the lock
+LOCK_TIME = 60.0
+LOCK_WAIT = 0.05
+
+# Running optimizations read from each index:
+# {path: (first line of the file, bytes read, dict)}
+_INDEX_CACHE = {}
+
+
+def fingerprint(zma):
+    """ Fingerprint of a Z-Matrix: its symbols and key matrix, and the
+        values of its distances (bohr) and angles (radian) by name.
+
+        :param zma: Z-Matrix
+        :type zma: automol Z-Matrix data structure
+        :rtype: dict[str: obj]
+    """
+
+    val_dct = automol.zmat.value_dictionary(zma, angstrom=False, degree=False)
+    name_mat = numpy.array(automol.zmat.name_matrix(zma))
+    ang_names = list(name_mat[2:, 1]) + list(name_mat[3:, 2])
+
+    return {
+        'symbs': list(automol.zmat.symbols(zma)),
+        'keys': [list(row) for row in automol.zmat.key_matrix(zma)],
+        'dists': {name: float(val_dct[name]) for name in name_mat[1:, 0]},
+        'angs': {name: float(val_dct[name]) for name in ang_names}
+    }
+
+
+def start(cnf_run_fs, locs, zma):
+    """ Enter an optimization of a conformer as running in the index.
+
+        :param cnf_run_fs: CONFORMER run filesystem object
+        :type cnf_run_fs: autofile.fs.conformer object
+        :param locs: locators of the conformer run
+        :type locs: tuple(str)
+        :param zma: input Z-Matrix of the optimization
+        :type zma: automol Z-Matrix data structure
+    """
+    _append(cnf_run_fs, {'event': 'start', 'locs': list(locs),
+                         'time': time.time(), 'zma': fingerprint(zma)})
+
+
+def finish(cnf_run_fs, locs):
+    """ Drop a finished optimization of a conformer from the index.
+
+        :param cnf_run_fs: CONFORMER run filesystem object
+        :type cnf_run_fs: autofile.fs.conformer object
+        :param locs: locators of the conformer run
+        :type locs: tuple(str)
+    """
+    _append(cnf_run_fs, {'event': 'finish', 'locs': list(locs)})
+
+    path = _path(cnf_run_fs)
+    if os.path.getsize(path) > MAX_SIZE:
+        with _locked(path):
+            # Checked again, in case compacted while waiting for the lock
+            if os.path.getsize(path) > MAX_SIZE:
+                _compact(path)
+
+
+def find(cnf_run_fs, zma):
+    """ Find a running optimization of a conformer equivalent to a
+        Z-Matrix.
+
+        :param cnf_run_fs: CONFORMER run filesystem object
+        :type cnf_run_fs: autofile.fs.conformer object
+        :param zma: Z-Matrix
+        :type zma: automol Z-Matrix data structure
+        :returns: the locators and start time (s since the epoch) of the
+            optimization, None if there is none
+        :rtype: (tuple(str), float)
+    """
+
+    zma_fp = fingerprint(zma)
+    now = time.time()
+    for entry in _read(cnf_run_fs).values():
+        if (now - entry['time'] < MAX_AGE and
+                _same_zmat(zma_fp, entry.get('zma')) and
+                _is_running(cnf_run_fs, entry['locs'])):
+            return tuple(entry['locs']), entry['time']
+
+    return None
+
+
+# Helpers
+def _append(cnf_run_fs, entry):
+    """ Append an event to the index
+    """
+
+    cnf_run_fs[0].create()
+    path = _path(cnf_run_fs)
+    with _locked(path):
+        _write_lines(path, (entry,))
+
+
+def _write_lines(path, entries):
+    """ Append events to an index file as JSON lines
+    """
+
+    lines = ''.join(json.dumps(entry) + '\n' for entry in entries)
+
+    # A single write to a file opened for appending is not interleaved
+    # with those from other processes
+    fdesc = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fdesc, lines.encode('utf-8'))
+    finally:
+        os.close(fdesc)
+
+
+def _read(cnf_run_fs):
+    """ Read the running optimizations of the index, only parsing the lines
+        added since the index was last read by this process (or all of
+        them if it has since been compacted)
+    """
+
+    path = _path(cnf_run_fs)
+    first, nread, running = _INDEX_CACHE.get(path, (None, 0, {}))
+    if os.path.exists(path):
+        with open(path, 'rb') as idx_obj:
+            # A compacted index starts with a line of its own
+            new_first = idx_obj.readline()
+            if new_first != first:
+                nread, running = 0, {}
+            idx_obj.seek(nread)
+            new_bytes = idx_obj.read()
+        # Leave any partially written last line for the next read
+        end = new_bytes.rfind(b'\n') + 1
+        _replay(new_bytes[:end], running)
+        _INDEX_CACHE[path] = (new_first, nread + end, running)
+
+    return running
+
+
+def _replay(new_bytes, running):
+    """ Replay the events of lines of the index into the running
+        optimizations
+    """
+
+    for line in new_bytes.decode('utf-8').splitlines():
+        try:
+            entry = json.loads(line)
+            if entry['event'] == 'start':
+                running['/'.join(entry['locs'])] = entry
+            elif entry['event'] == 'finish':
+                running.pop('/'.join(entry['locs']), None)
+        except (ValueError, KeyError):
+            pass
+
+
+def _compact(path):
+    """ Rewrite the index without the finished optimizations, by writing
+        the ones still running to a new file which then replaces it. Must
+        be called holding the lock of the index.
+    """
+
+    running = {}
+    with open(path, 'rb') as idx_obj:
+        _replay(idx_obj.read(), running)
+
+    now = time.time()
+    entries = [{'event': 'compact', 'time': now, 'pid': os.getpid()}]
+    entries.extend(entry for entry in running.values()
+                   if now - entry['time'] < MAX_AGE)
+
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    _write_lines(tmp_path, entries)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """ Hold the lock of an index within the context, waiting for it if
+        another process holds it. The lock is a file created atomically
+        next to the index.
+    """
+
+    lock_path = path + '.lock'
+    while not _create_lock(lock_path):
+        _break_stale_lock(lock_path)
+        time.sleep(LOCK_WAIT)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            # Broken by another process after LOCK_TIME
+            pass
+
+
+def _create_lock(lock_path):
+    """ Atomically create the lock file, failing if it exists
+    """
+
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+
+    return True
+
+
+def _break_stale_lock(lock_path):
+    """ Remove a lock held for longer than LOCK_TIME, left by a process
+        that was killed holding it. Only one process can move the lock
+        out of the way; if the lock moved turns out to be a fresh one
+        taken in the meantime, it is put back.
+    """
+
+    try:
+        stale = time.time() - os.path.getmtime(lock_path) > LOCK_TIME
+    except FileNotFoundError:
+        stale = False
+
+    if stale:
+        moved_path = '{}.stale.{}'.format(lock_path, os.getpid())
+        try:
+            os.rename(lock_path, moved_path)
+        except FileNotFoundError:
+            # Released or broken by another process in the meantime
+            return
+        if time.time() - os.path.getmtime(moved_path) <= LOCK_TIME:
+            try:
+                os.link(moved_path, lock_path)
+            except FileExistsError:
+                pass
+        os.remove(moved_path)
+
+
+def _is_running(cnf_run_fs, locs):
+    """ Assess if the optimization of a conformer run is still marked as
+        running in its run info, or has just been entered and has none yet
+    """
+
+    job = elstruct.Job.OPTIMIZATION
+    run_fs = autofile.fs.run(cnf_run_fs[-1].path(locs))
+    return (not run_fs[-1].file.info.exists([job]) or
+            run_fs[-1].file.info.read([job]).status ==
+            autofile.schema.RunStatus.RUNNING)
+
+
+def _same_zmat(zma_fp1, zma_fp2):
+    """ Assess if two Z-Matrix fingerprints are of equivalent conformers,
+        with the tolerances of `automol.zmat.almost_equal`
+    """
+
+    # Entries written by older versions of the index have no Z-Matrix
+    if (zma_fp2 is None or
+            zma_fp1['symbs'] != zma_fp2['symbs'] or
+            zma_fp1['keys'] != zma_fp2['keys'] or
+            set(zma_fp1['dists']) != set(zma_fp2['dists']) or
+            set(zma_fp1['angs']) != set(zma_fp2['angs'])):
+        return False
+
+    names = sorted(zma_fp1['dists'])
+    same = numpy.allclose(
+        [zma_fp1['dists'][name] for name in names],
+        [zma_fp2['dists'][name] for name in names], rtol=DIST_RTOL, atol=0.)
+
+    diffs = numpy.array([zma_fp1['angs'][name] - zma_fp2['angs'][name]
+                         for name in zma_fp1['angs']])
+    diffs = numpy.abs((diffs + numpy.pi) % (2.0 * numpy.pi) - numpy.pi)
+
+    return bool(same and numpy.all(diffs < ANG_ATOL))
+
+
+def _path(cnf_run_fs):
+    """ Path to the index in the run filesystem
+    """
+    return os.path.join(cnf_run_fs[0].path(), INDEX_NAME)
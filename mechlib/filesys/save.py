@@ -6,6 +6,7 @@ import automol
 import elstruct
 import autofile
 from mechlib.amech_io import printer as ioprinter
+from mechlib.filesys import parsed
 
 
 def atom(sp_ret, cnf_fs, thy_locs, zma,
@@ -262,10 +263,10 @@ def read_job_zma(ret, init_zma=None, rebuild=False):
     #         zma = automol.reac.ts_zmatrix(zrxn, geo)
 
     _, _, out_str, prog, _ = _unpack_ret(ret)
-    zma = elstruct.reader.opt_zmatrix(prog, out_str)
+    zma = parsed.opt_zmatrix(prog, out_str)
     if zma is None or rebuild:
         print('Getting ZMA from a geometry...')
-        geo = elstruct.reader.opt_geometry(prog, out_str)
+        geo = parsed.opt_geometry(prog, out_str)
         if init_zma is not None:
             print('Resetting ZMA coords using opt geoms...')
             zma = rebuild_zma_from_opt_geo(init_zma, geo)
@@ -298,7 +299,7 @@ def _save_geom(ret, cnf_fs, cnf_locs):
     print(" - Reading geometry from output...")
     inf_obj, inp_str, out_str, prog, _ = _unpack_ret(ret)
 
-    geo = elstruct.reader.opt_geometry(prog, out_str)
+    geo = parsed.opt_geometry(prog, out_str)
 
     cnf_fs[-1].create(cnf_locs)
     cnf_path = cnf_fs[-1].path(cnf_locs)
@@ -316,7 +317,7 @@ def _save_grad(ret, cnf_fs, cnf_locs):
     print(" - Reading gradient from output...")
     inf_obj, inp_str, out_str, prog, _ = _unpack_ret(ret)
 
-    grad = elstruct.reader.gradient(prog, out_str)
+    grad = parsed.gradient(prog, out_str)
 
     cnf_fs[-1].create(cnf_locs)
     cnf_path = cnf_fs[-1].path(cnf_locs)
@@ -355,7 +356,7 @@ def _save_energy(ret, sp_fs, sp_locs):
     print(" - Reading energy from output...")
     inf_obj, inp_str, out_str, prog, method = _unpack_ret(ret)
 
-    ene = elstruct.reader.energy(prog, method, out_str)
+    ene = parsed.energy(prog, method, out_str)
 
     sp_fs[-1].create(sp_locs)
     sp_path = sp_fs[-1].path(sp_locs)
@@ -373,8 +374,8 @@ def _save_hessian(ret, cnf_fs, cnf_locs):
     print(" - Reading hessian and harmonic frequencies from output...")
     inf_obj, inp_str, out_str, prog, _ = _unpack_ret(ret)
 
-    hess = elstruct.reader.hessian(prog, out_str)
-    freqs = elstruct.reader.harmonic_frequencies(prog, out_str)
+    hess = parsed.hessian(prog, out_str)
+    freqs = parsed.harmonic_frequencies(prog, out_str)
 
     cnf_fs[-1].create(cnf_locs)
     cnf_path = cnf_fs[-1].path(cnf_locs)
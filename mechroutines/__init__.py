@@ -1,12 +1,7 @@
 """ Routines for the various drivers
 """
 
-from mechroutines import es
-from mechroutines import thermo
-from mechroutines import ktp
-from mechroutines import trans
-from mechroutines import proc
-from mechroutines import models
+import importlib
 
 
 __all__ = [
@@ -17,3 +12,13 @@ __all__ = [
     'proc',
     'models'
 ]
+
+
+def __getattr__(name):
+    """ Import the routine libraries only when first accessed (PEP 562),
+        so that each driver only loads the routines it uses
+    """
+    if name in __all__:
+        return importlib.import_module('mechroutines.' + name)
+    raise AttributeError(
+        'module {} has no attribute {}'.format(__name__, name))
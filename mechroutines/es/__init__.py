@@ -3,9 +3,11 @@
 
 from mechroutines.es.tsk import run_tsk
 from mechroutines.es import runner
+from mechroutines.es import plan
 
 
 __all__ = [
     'run_tsk',
-    'runner'
+    'runner',
+    'plan'
 ]
@@ -0,0 +1,144 @@
+""" Statistics of the conformers found by conformer sampling, used to stop
+    the sampling once further samples are unlikely to turn up any new
+    low-energy conformers.
+
+    Each completed sample is tallied against the saved conformer it was
+    found to be: a new conformer if it was saved, or the one it duplicated
+    (in geometry or by symmetry). From the number of times each conformer
+    was found, the chance that the next sample finds a conformer not yet
+    seen is estimated with the Good-Turing estimate, the fraction of the
+    samples that found a conformer only found once, and the number of
+    conformers not yet seen is estimated with the bias-corrected Chao1
+    estimate from the conformers found once and twice. Both are taken for
+    all conformers and for the low-energy ones, those within
+    LOW_ENE_WINDOW of the lowest conformer found.
+
+    The sampling has converged once at least MIN_SAMP samples are tallied,
+    the chance of finding a new low-energy conformer is under P_NEW_THRESH
+    and fewer than UNSEEN_THRESH low-energy conformers are estimated to be
+    left unseen.
+
+    The tallies, along with the estimates made from them, are kept in a
+    file in the ring directory of the CONFORMER save filesystem, so they
+    carry over to later runs of the sampling. They are kept there rather
+    than in the info file of the ring, whose fields are fixed by autofile,
+    and only for searches stopped on them.
+"""
+
+import os
+import json
+
+
+STATS_NAME = 'samp_stats.json'
+
+# Energy window (hartree, ~2 kcal/mol) above the lowest conformer
+# within which conformers count as low in energy
+LOW_ENE_WINDOW = 3.2e-3
+
+# Thresholds on the statistics for the sampling to have converged
+MIN_SAMP = 10
+P_NEW_THRESH = 0.05
+UNSEEN_THRESH = 0.5
+
+# Factor on the requested number of samples giving the most samples run
+# when the sampling is stopped on the statistics
+MAX_SAMP_FACTOR = 3
+
+
+def load(path):
+    """ Read the tallies of the conformers found by the samples of a ring,
+        empty tallies if none have been kept yet.
+
+        :param path: ring directory of the CONFORMER save filesystem
+        :type path: str
+        :rtype: dict[str: obj]
+    """
+
+    stats_path = os.path.join(path, STATS_NAME)
+    stats = {'hits': {}, 'enes': {}}
+    if os.path.exists(stats_path):
+        try:
+            with open(stats_path) as stats_obj:
+                stats_dct = json.load(stats_obj)
+            stats.update(hits=stats_dct['hits'], enes=stats_dct['enes'])
+        except (ValueError, KeyError):
+            pass
+    stats['path'] = stats_path
+
+    return stats
+
+
+def add(stats, locs, ene):
+    """ Tally a sample against the conformer it was found to be and write
+        the tallies and the estimates made from them.
+
+        :param stats: tallies, as loaded by `load`
+        :type stats: dict[str: obj]
+        :param locs: locators of the conformer found by the sample
+        :type locs: tuple(str)
+        :param ene: energy of the conformer
+        :type ene: float
+    """
+
+    key = '/'.join(map(str, locs))
+    stats['hits'][key] = stats['hits'].get(key, 0) + 1
+    stats['enes'][key] = ene
+
+    tmp_path = '{}.{}.tmp'.format(stats['path'], os.getpid())
+    with open(tmp_path, 'w') as stats_obj:
+        json.dump({'hits': stats['hits'], 'enes': stats['enes'],
+                   'est': estimate(stats)}, stats_obj)
+    os.replace(tmp_path, stats['path'])
+
+
+def estimate(stats):
+    """ Estimate the chance of finding new conformers and the number of
+        conformers not yet seen from the tallies.
+
+        :param stats: tallies, as loaded by `load`
+        :type stats: dict[str: obj]
+        :returns: number of samples tallied (`nobs`), conformers found
+            (`nuniq`) and low-energy conformers found (`nlow`), chance the
+            next sample finds a new conformer (`p_new`) and a new
+            low-energy conformer (`p_new_low`), and estimated number of
+            low-energy conformers not yet seen (`nunseen_low`)
+        :rtype: dict[str: obj]
+    """
+
+    hits, enes = stats['hits'], stats['enes']
+    nobs = sum(hits.values())
+    if not nobs:
+        return {'nobs': 0, 'nuniq': 0, 'nlow': 0,
+                'p_new': 1.0, 'p_new_low': 1.0, 'nunseen_low': None}
+
+    min_ene = min(enes.values())
+    low_keys = [key for key in hits
+                if enes[key] - min_ene <= LOW_ENE_WINDOW]
+    low_counts = [hits[key] for key in low_keys]
+
+    nsingle_low = low_counts.count(1)
+    ndouble_low = low_counts.count(2)
+    nunseen_low = ((nobs - 1) / nobs *
+                   nsingle_low * max(nsingle_low - 1, 0) /
+                   (2 * (ndouble_low + 1)))
+
+    return {
+        'nobs': nobs,
+        'nuniq': len(hits),
+        'nlow': len(low_keys),
+        'p_new': list(hits.values()).count(1) / nobs,
+        'p_new_low': nsingle_low / nobs,
+        'nunseen_low': nunseen_low
+    }
+
+
+def converged(est):
+    """ Assess if the sampling has converged from the estimates.
+
+        :param est: estimates, as given by `estimate`
+        :type est: dict[str: obj]
+        :rtype: bool
+    """
+    return (est['nobs'] >= MIN_SAMP and
+            est['p_new_low'] < P_NEW_THRESH and
+            est['nunseen_low'] < UNSEEN_THRESH)
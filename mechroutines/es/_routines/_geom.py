@@ -7,7 +7,9 @@ import elstruct
 import autorun
 from phydat import phycon
 from mechanalyzer.inf import thy as tinfo
+from mechlib import filesys
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechroutines.es import runner as es_runner
 from mechroutines.es.runner import qchem_params
 
@@ -93,15 +95,16 @@ def _check_imaginary(spc_info, geo, mod_thy_info, run_fs, script_str,
     if success:
         inf_obj, _, out_str = ret
         prog = inf_obj.prog
-        hess = elstruct.reader.hessian(prog, out_str)
+        hess = filesys.parsed.hessian(prog, out_str)
 
         # Calculate vibrational frequencies
         if hess:
             run_path = run_fs[-1].path([elstruct.Job.HESSIAN])
             # run_path = run_fs[-1].path(['VIB'])
             script_str = autorun.SCRIPT_DCT['projrot']
-            _, _, imag_freq, _ = autorun.projrot.frequencies(
-               script_str, run_path, [geo], [[]], [hess])
+            with telemetry.measure('projrot', run_path):
+                _, _, imag_freq, _ = autorun.projrot.frequencies(
+                   script_str, run_path, [geo], [[]], [hess])
 
             # Mode for now set the imaginary frequency check to -100:
             # Should decrease once freq projector functions properly
@@ -153,6 +156,6 @@ def _kickoff_saddle(geo, norm_coords, spc_info, mod_thy_info,
     if success:
         inf_obj, _, out_str = ret
         prog = inf_obj.prog
-        geo = elstruct.reader.opt_geometry(prog, out_str)
+        geo = filesys.parsed.opt_geometry(prog, out_str)
 
     return geo, ret
@@ -9,6 +9,7 @@ from mechanalyzer.inf import rxn as rinfo
 from mechanalyzer.inf import thy as tinfo
 from mechlib.reaction import grid as rxngrid
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechlib import filesys
 from mechroutines.es import runner as es_runner
 from mechroutines.es.runner import qchem_params
@@ -38,6 +39,9 @@ def obtain_saddle_point(guess_zmas, ts_dct, method_dct,
                         es_keyword_dct):
     """ Given the saddle point guess structure, obtain a
         proper saddle point
+
+        :returns: whether a saddle point was found and saved
+        :rtype: bool
     """
 
     # Get info (move later)
@@ -68,6 +72,7 @@ def obtain_saddle_point(guess_zmas, ts_dct, method_dct,
         run_fs, script_str, overwrite, **kwargs)
 
     # Calculate the Hessian for the optimized structure
+    saved = False
     if opt_ret is not None:
         # Get the Hessian and check the saddle point
         # (maybe just have remove imag do this?)
@@ -96,11 +101,14 @@ def obtain_saddle_point(guess_zmas, ts_dct, method_dct,
             filesys.save.conformer(
                 opt_ret, hess_ret, runlvl_cnf_save_fs, mod_thy_info[1:],
                 zrxn=zrxn, rng_locs=(rid,), tors_locs=(cid,), zma_locs=None)
+            saved = True
 
     else:
         ioprinter.warning_message(
             '\n TS optimization failed. No geom to check and save.')
 
+    return saved
+
 
 def _check_filesys_for_guess(savefs_dct, zma_locs, es_keyword_dct):
     """ Check if the filesystem for any TS structures at the input
@@ -258,7 +266,7 @@ def saddle_point_hessian(opt_ret, ts_info, method_dct,
     # Obtain geometry from optimization
     opt_inf_obj, _, opt_out_str = opt_ret
     opt_prog = opt_inf_obj.prog
-    geo = elstruct.reader.opt_geometry(opt_prog, opt_out_str)
+    geo = filesys.parsed.opt_geometry(opt_prog, opt_out_str)
 
     # Run a Hessian
     hess_success, hess_ret = es_runner.execute_job(
@@ -275,12 +283,13 @@ def saddle_point_hessian(opt_ret, ts_info, method_dct,
     # If successful, Read the geom and energy from the optimization
     if hess_success:
         hess_inf_obj, _, hess_out_str = hess_ret
-        hess = elstruct.reader.hessian(hess_inf_obj.prog, hess_out_str)
+        hess = filesys.parsed.hessian(hess_inf_obj.prog, hess_out_str)
         freq_run_path = run_fs[-1].path(['hessian'])
         run_fs[-1].create(['hessian'])
         script_str = autorun.SCRIPT_DCT['projrot']
-        freqs, _, imags, _ = autorun.projrot.frequencies(
-            script_str, freq_run_path, [geo], [[]], [hess])
+        with telemetry.measure('projrot', freq_run_path):
+            freqs, _, imags, _ = autorun.projrot.frequencies(
+                script_str, freq_run_path, [geo], [[]], [hess])
     else:
         freqs, imags = [], []
 
@@ -0,0 +1,430 @@
+""" Batch sampling of torsions for conformer searches.
+
+    Rather than drawing one sample at a time and testing it for clashes,
+    candidates are generated in batches with numpy:
+        1. NCAND torsion vectors are drawn at once within the sampling
+           ranges of the torsions;
+        2. the Z-Matrix of each is converted to Cartesians in a single
+           pass over the atoms, placing the atom in all candidates at once
+           (natural extension reference frame, NeRF);
+        3. candidates with a repulsion score (see `repulsion_scores`)
+           well above that of the reference structure are rejected;
+        4. of the survivors, those to optimize are picked one at a time as
+           the farthest in torsion space from the reference structure and
+           all those already picked, so that every optimization starts
+           from a structurally new point.
+
+    The Cartesians are only used to screen the candidates; the Z-Matrices
+    of the picked ones are built with automol as before.
+
+    Optionally, the survivors are first relaxed in torsion space with a
+    simple force field (Lennard-Jones terms between non-bonded atoms and a
+    threefold term for each sampled torsion, see `ff_energies`). The
+    relaxed structures that fall into the same force-field minimum are
+    merged, and only the lowest-energy distinct minima are handed out,
+    which ends the sampling once no new low-energy minima are found.
+"""
+
+import numpy
+import automol
+from mechlib.amech_io import printer as ioprinter
+
+
+# Number of candidates drawn for each batch of samples
+NCAND = 5000
+
+# Approximate covalent radii (bohr); atoms are bonded when closer than
+# BOND_SCALE times the sum of their radii, and the contact distance of
+# two atoms for the repulsion is REP_SCALE times that sum
+COV_RAD_DCT = {
+    'H': 0.59, 'C': 1.44, 'N': 1.34, 'O': 1.25, 'F': 1.08, 'Si': 2.10,
+    'P': 2.02, 'S': 1.98, 'Cl': 1.89, 'Br': 2.27, 'I': 2.63
+}
+DEFAULT_COV_RAD = 1.60
+BOND_SCALE = 1.3
+REP_SCALE = 1.5
+
+# Repulsion a candidate may have above that of the reference structure,
+# in units of one pair of atoms at contact
+REP_THRESH = 1.0
+
+# Force field: Lennard-Jones well distance (bohr) and depth (hartree) of
+# each element (UFF), and the barrier (hartree) of each sampled torsion
+LJ_PAR_DCT = {
+    'H': (5.454, 7.01e-5), 'C': (7.277, 1.673e-4), 'N': (6.916, 1.100e-4),
+    'O': (6.614, 9.56e-5), 'F': (6.357, 7.97e-5), 'Si': (8.105, 6.41e-4),
+    'P': (7.836, 4.88e-4), 'S': (7.625, 4.37e-4), 'Cl': (7.459, 3.62e-4),
+    'Br': (7.697, 4.02e-4), 'I': (8.342, 5.42e-4)
+}
+DEFAULT_LJ_PAR = (7.277, 1.673e-4)
+TORS_BARRIER = 3.2e-3
+
+# Relaxation: number of candidates of a batch relaxed, steepest descent
+# steps and the step (radian) of the finite differences of the gradient
+NRELAX = 500
+NSTEPS = 100
+GRAD_STEP = 1.0e-3
+
+# Relaxed structures closer than this in every torsion (radian) are the
+# same minimum; minima higher than the lowest one by more than the window
+# (hartree) are not optimized
+MIN_TOL = 0.35
+ENE_WINDOW = 0.016
+
+
+def diverse_samples(zma, tors_range_dct, nbatch, ncand=NCAND, rng=None,
+                    relax=False):
+    """ Generate sampled Z-Matrices over the torsions, free of clashes
+        and spread out in torsion space, `nbatch` at a time from a batch
+        of `ncand` candidates, for as long as they are asked for.
+
+        With `relax`, the samples are instead the distinct force-field
+        minima of each batch, lowest in energy first, and the generator
+        stops once a batch gives no new minima within ENE_WINDOW of the
+        lowest one found (see `_relaxed_picks`).
+
+        :param zma: reference Z-Matrix
+        :type zma: automol Z-Matrix data structure
+        :param tors_range_dct: sampling range of each torsion (radian)
+        :type tors_range_dct: dict[str: (float, float)]
+        :param nbatch: number of samples picked from each batch
+        :type nbatch: int
+        :param ncand: number of candidates drawn for each batch
+        :type ncand: int
+        :param rng: random number generator
+        :type rng: numpy.random.RandomState
+        :param relax: relax the candidates with the force field
+        :type relax: bool
+        :rtype: generator of automol Z-Matrix data structures
+    """
+
+    rng = numpy.random.RandomState() if rng is None else rng
+    names = tuple(tors_range_dct.keys())
+    ranges = numpy.array([tors_range_dct[name] for name in names],
+                         dtype=float)
+    periods = ranges[:, 1] - ranges[:, 0]
+
+    ref_vals = numpy.array(
+        [automol.zmat.value_dictionary(
+            zma, angstrom=False, degree=False)[name] for name in names])
+    ref_xyzs = batch_cartesians(zma, names, ref_vals[None, :])
+    symbs = automol.zmat.symbols(zma)
+    pair_idxs, contacts = _repulsive_pairs(symbs, ref_xyzs[0])
+    ref_score = repulsion_scores(ref_xyzs, pair_idxs, contacts)[0]
+    ff_dct = {
+        'zma': zma,
+        'names': names,
+        'periods': periods,
+        'pair_idxs': pair_idxs,
+        'lj_pars': _lj_pars(symbs, pair_idxs),
+        'min_ene': None
+    }
+
+    # Samples are spread out from the reference and all previous picks
+    picked_vals = ref_vals[None, :]
+    while True:
+        cand_vals = rng.uniform(ranges[:, 0], ranges[:, 1],
+                                size=(ncand, len(names)))
+        scores = repulsion_scores(
+            batch_cartesians(zma, names, cand_vals), pair_idxs, contacts)
+        keep = scores <= ref_score + REP_THRESH
+        ioprinter.info_message(
+            ' - Sampled {} torsion candidates, {} free of clashes'.format(
+                ncand, int(keep.sum())))
+        if not keep.any():
+            # Use the least repulsive candidates rather than none
+            keep = scores <= numpy.sort(scores)[min(nbatch, ncand) - 1]
+
+        if relax:
+            sel_vals = _relaxed_picks(
+                cand_vals[keep], nbatch, picked_vals, ff_dct)
+            if not len(sel_vals):
+                ioprinter.info_message(
+                    ' - No new force-field minima found, ending sampling')
+                return
+        else:
+            sel = farthest_points(
+                cand_vals[keep], nbatch, periods, seed_vals=picked_vals)
+            sel_vals = cand_vals[keep][sel]
+
+        for vals in sel_vals:
+            picked_vals = numpy.vstack((picked_vals, vals))
+            yield automol.zmat.set_values_by_name(
+                zma, dict(zip(names, map(float, vals))),
+                angstrom=False, degree=False)
+
+
+def batch_cartesians(zma, names, vals):
+    """ Convert a batch of Z-Matrices, differing from a reference one in
+        the values of some coordinates, to Cartesian coordinates.
+
+        :param zma: reference Z-Matrix
+        :type zma: automol Z-Matrix data structure
+        :param names: names of the coordinates set for each Z-Matrix
+        :type names: tuple(str)
+        :param vals: values of the coordinates for each Z-Matrix (bohr,
+            radian), with shape (nzma, len(names))
+        :type vals: numpy.ndarray
+        :returns: Cartesian coordinates (bohr), with shape
+            (nzma, natoms, 3), including any dummy atoms
+        :rtype: numpy.ndarray
+    """
+
+    key_mat = automol.zmat.key_matrix(zma)
+    name_mat = automol.zmat.name_matrix(zma)
+    val_mat = automol.zmat.value_matrix(zma, angstrom=False, degree=False)
+
+    nzma, natms = len(vals), len(key_mat)
+    col_dct = {name: idx for idx, name in enumerate(names)}
+
+    def _column(row, col):
+        """ Value of a coordinate for every Z-Matrix
+        """
+        name = name_mat[row][col]
+        if name in col_dct:
+            return vals[:, col_dct[name]]
+        return numpy.full(nzma, val_mat[row][col], dtype=float)
+
+    xyzs = numpy.zeros((nzma, natms, 3))
+    for row in range(1, natms):
+        dist = _column(row, 0)
+        key1 = key_mat[row][0]
+        if row == 1:
+            xyzs[:, 1, 2] = dist
+            continue
+
+        ang = _column(row, 1)
+        key2 = key_mat[row][1]
+        # The first three atoms lie in the xz-plane
+        if row == 2:
+            bvec = _unit(xyzs[:, key2] - xyzs[:, key1])
+            perp = numpy.zeros_like(bvec)
+            perp[:, 0] = 1.0
+            xyzs[:, 2] = xyzs[:, key1] + dist[:, None] * (
+                numpy.cos(ang)[:, None] * bvec +
+                numpy.sin(ang)[:, None] * perp)
+            continue
+
+        dih = _column(row, 2)
+        key3 = key_mat[row][2]
+        bc_vec = _unit(xyzs[:, key1] - xyzs[:, key2])
+        n_vec = _unit(numpy.cross(xyzs[:, key2] - xyzs[:, key3], bc_vec))
+        m_vec = numpy.cross(n_vec, bc_vec)
+        xyzs[:, row] = xyzs[:, key1] + dist[:, None] * (
+            -numpy.cos(ang)[:, None] * bc_vec +
+            (numpy.sin(ang) * numpy.cos(dih))[:, None] * m_vec +
+            (numpy.sin(ang) * numpy.sin(dih))[:, None] * n_vec)
+
+    return xyzs
+
+
+def repulsion_scores(xyzs, pair_idxs, contacts):
+    """ Score the repulsion of the non-bonded atoms of each structure of a
+        batch, as the sum of (contact distance / distance)^12 over pairs
+        of atoms, which is about one for each pair at contact and grows
+        steeply for pairs that clash.
+
+        :param xyzs: Cartesian coordinates of the batch, with shape
+            (nstruct, natoms, 3)
+        :type xyzs: numpy.ndarray
+        :param pair_idxs: indices of the pairs of atoms scored, with
+            shape (2, npairs)
+        :type pair_idxs: numpy.ndarray
+        :param contacts: contact distance of each pair
+        :type contacts: numpy.ndarray
+        :rtype: numpy.ndarray
+    """
+    dists = numpy.linalg.norm(
+        xyzs[:, pair_idxs[0]] - xyzs[:, pair_idxs[1]], axis=-1)
+    return numpy.sum((contacts / numpy.maximum(dists, 1e-3))**12, axis=1)
+
+
+def farthest_points(vals, npick, periods, seed_vals=None):
+    """ Pick points one at a time as the farthest from all of the points
+        picked before it (and the seed points), with periodic distances.
+
+        :param vals: coordinates of the points, with shape (npts, ndim)
+        :type vals: numpy.ndarray
+        :param npick: number of points to pick
+        :type npick: int
+        :param periods: period of each coordinate
+        :type periods: numpy.ndarray
+        :param seed_vals: points the picks are spread out from
+        :type seed_vals: numpy.ndarray
+        :returns: indices of the picked points
+        :rtype: list(int)
+    """
+
+    npick = min(npick, len(vals))
+    if npick == 0:
+        return []
+
+    def _dists(point):
+        """ Periodic distance of every point to a point
+        """
+        diff = numpy.abs(vals - point)
+        diff = numpy.minimum(diff, periods - diff)
+        return numpy.sqrt(numpy.sum(diff**2, axis=1))
+
+    if seed_vals is None or not len(seed_vals):
+        picks = [0]
+        min_dists = _dists(vals[0])
+    else:
+        picks = []
+        min_dists = numpy.min([_dists(point) for point in seed_vals], axis=0)
+
+    while len(picks) < npick:
+        idx = int(numpy.argmax(min_dists))
+        picks.append(idx)
+        min_dists = numpy.minimum(min_dists, _dists(vals[idx]))
+
+    return picks
+
+
+def ff_energies(zma, names, vals, pair_idxs, lj_pars):
+    """ Energies of a batch of structures with a simple force field: a
+        Lennard-Jones term for each pair of non-bonded atoms and a
+        threefold term, with staggered minima, for each sampled torsion.
+
+        :param zma: reference Z-Matrix
+        :type zma: automol Z-Matrix data structure
+        :param names: names of the torsions set for each structure
+        :type names: tuple(str)
+        :param vals: values of the torsions (radian), with shape
+            (nstruct, len(names))
+        :type vals: numpy.ndarray
+        :param pair_idxs: indices of the pairs of non-bonded atoms, with
+            shape (2, npairs)
+        :type pair_idxs: numpy.ndarray
+        :param lj_pars: well distance and depth of each pair, with shape
+            (2, npairs)
+        :type lj_pars: numpy.ndarray
+        :returns: energies (hartree)
+        :rtype: numpy.ndarray
+    """
+
+    xyzs = batch_cartesians(zma, names, vals)
+    dists = numpy.linalg.norm(
+        xyzs[:, pair_idxs[0]] - xyzs[:, pair_idxs[1]], axis=-1)
+    rat6 = (lj_pars[0] / numpy.maximum(dists, 1e-3))**6
+    lj_enes = numpy.sum(lj_pars[1] * (rat6**2 - 2.0 * rat6), axis=1)
+    tors_enes = numpy.sum(
+        0.5 * TORS_BARRIER * (1.0 + numpy.cos(3.0 * vals)), axis=1)
+
+    return lj_enes + tors_enes
+
+
+def ff_relax(zma, names, vals, pair_idxs, lj_pars, nsteps=NSTEPS):
+    """ Relax a batch of structures in torsion space with the force field
+        of `ff_energies`, by steepest descent with a step for each
+        structure that grows while the energy falls and is cut when it
+        does not.
+
+        :param nsteps: number of descent steps
+        :type nsteps: int
+        :returns: relaxed torsion values and their energies
+        :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+
+    def _energies(vals_):
+        return ff_energies(zma, names, vals_, pair_idxs, lj_pars)
+
+    nstruct, ntors = vals.shape
+    vals = numpy.array(vals, dtype=float)
+    enes = _energies(vals)
+    steps = numpy.full(nstruct, 0.1)
+    disps = GRAD_STEP * numpy.eye(ntors)
+    for _ in range(nsteps):
+        # Central differences for all torsions of all structures at once
+        shifted = numpy.concatenate(
+            [vals + disp for disp in disps] + [vals - disp for disp in disps])
+        shift_enes = _energies(shifted).reshape(2, ntors, nstruct)
+        grads = ((shift_enes[0] - shift_enes[1]) / (2.0 * GRAD_STEP)).T
+        norms = numpy.maximum(numpy.linalg.norm(grads, axis=1), 1e-12)
+
+        trial_vals = vals - (steps / norms)[:, None] * grads
+        trial_enes = _energies(trial_vals)
+        down = trial_enes < enes
+        vals[down] = trial_vals[down]
+        enes[down] = trial_enes[down]
+        steps = numpy.where(down, 1.2 * steps, 0.5 * steps)
+        if numpy.all(steps < GRAD_STEP):
+            break
+
+    return vals, enes
+
+
+# Helpers
+def _relaxed_picks(cand_vals, nbatch, picked_vals, ff_dct):
+    """ Relax the most diverse candidates of a batch with the force field
+        and pick the lowest-energy minima distinct from each other and
+        from the previous picks
+    """
+
+    periods = ff_dct['periods']
+    sel = farthest_points(cand_vals, NRELAX, periods, seed_vals=picked_vals)
+    vals, enes = ff_relax(
+        ff_dct['zma'], ff_dct['names'], cand_vals[sel],
+        ff_dct['pair_idxs'], ff_dct['lj_pars'])
+
+    min_ene = numpy.min(enes)
+    if ff_dct['min_ene'] is not None:
+        min_ene = min(min_ene, ff_dct['min_ene'])
+    ff_dct['min_ene'] = min_ene
+
+    picks = []
+    for idx in numpy.argsort(enes):
+        if len(picks) == nbatch or enes[idx] > min_ene + ENE_WINDOW:
+            break
+        seen_vals = numpy.vstack([picked_vals] + [vals[picks]])
+        diff = numpy.abs((vals[idx] - seen_vals) % periods)
+        diff = numpy.minimum(diff, periods - diff)
+        if not numpy.any(numpy.all(diff < MIN_TOL, axis=1)):
+            picks.append(idx)
+
+    ioprinter.info_message(
+        ' - Relaxed {} candidates with the force field, {} new minima'.format(
+            len(sel), len(picks)))
+
+    return vals[picks]
+
+
+def _lj_pars(symbs, pair_idxs):
+    """ Lennard-Jones well distance and depth of pairs of atoms, from those
+        of the elements by arithmetic and geometric means
+    """
+    pars = numpy.array([LJ_PAR_DCT.get(symb, DEFAULT_LJ_PAR)
+                        for symb in symbs])
+    return numpy.array([
+        0.5 * (pars[pair_idxs[0], 0] + pars[pair_idxs[1], 0]),
+        numpy.sqrt(pars[pair_idxs[0], 1] * pars[pair_idxs[1], 1])])
+
+
+def _repulsive_pairs(symbs, xyzs):
+    """ Pairs of real atoms separated by more than two bonds in a
+        structure, and their contact distances
+    """
+
+    idxs = [idx for idx, symb in enumerate(symbs) if symb != 'X']
+    rads = numpy.array([COV_RAD_DCT.get(symbs[idx], DEFAULT_COV_RAD)
+                        for idx in idxs])
+    rad_sums = rads[:, None] + rads[None, :]
+    dists = numpy.linalg.norm(
+        xyzs[idxs][:, None] - xyzs[idxs][None, :], axis=-1)
+
+    bonded = (dists < BOND_SCALE * rad_sums).astype(int)
+    numpy.fill_diagonal(bonded, 0)
+    near = (bonded + bonded @ bonded) > 0
+    numpy.fill_diagonal(near, True)
+
+    rows, cols = numpy.nonzero(numpy.triu(~near, k=1))
+    pair_idxs = numpy.array([numpy.array(idxs)[rows], numpy.array(idxs)[cols]])
+    pair_idxs = pair_idxs.reshape(2, -1)
+
+    return pair_idxs, REP_SCALE * rad_sums[rows, cols]
+
+
+def _unit(vecs):
+    """ Normalize a batch of vectors
+    """
+    return vecs / numpy.linalg.norm(vecs, axis=-1, keepdims=True)
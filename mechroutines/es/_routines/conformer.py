@@ -13,9 +13,15 @@ from mechlib import filesys
 from mechlib.amech_io import printer as ioprinter
 from mechroutines.es import runner as es_runner
 from mechroutines.es._routines import _util as util
+from mechroutines.es._routines import _sampler as sampler
+from mechroutines.es._routines import _adapt as adapt
 from mechroutines.es._routines._geom import remove_imag
 
 
+# Seconds between checks of the sample optimizations running at once
+SAMP_POLL_INTERVAL = 2.0
+
+
 # Initial conformer
 def initial_conformer(spc_dct_i, spc_info, ini_method_dct, method_dct,
                       ini_cnf_save_fs, cnf_run_fs, cnf_save_fs,
@@ -230,8 +236,8 @@ def _optimize_molecule(spc_info, zma_init,
     # read the geometry
     if success:
         inf_obj, _, out_str = ret
-        geo = elstruct.reader.opt_geometry(inf_obj.prog, out_str)
-        zma = elstruct.reader.opt_zmatrix(inf_obj.prog, out_str)
+        geo = filesys.parsed.opt_geometry(inf_obj.prog, out_str)
+        zma = filesys.parsed.opt_zmatrix(inf_obj.prog, out_str)
         if zma is None:
             zma = automol.geom.zmatrix(geo)
         geo_conn = bool(automol.geom.connected(geo))
@@ -280,7 +286,12 @@ def single_conformer(zma, spc_info, mod_thy_info,
                      **kwargs):
     """ generate single optimized geometry to be saved into a
         filesystem
+
+        :returns: whether the optimization was run and succeeded (False
+            if an equivalent conformer is still running elsewhere)
+        :rtype: bool
     """
+    success = False
     if not _this_conformer_is_running(zma, cnf_run_fs):
         # Build the filesystem
         if use_locs is None:
@@ -295,31 +306,37 @@ def single_conformer(zma, spc_info, mod_thy_info,
 
         # Run the optimization
         ioprinter.info_message('Optimizing a single conformer', zrxn)
-        success, ret = es_runner.execute_job(
-            job=elstruct.Job.OPTIMIZATION,
-            script_str=script_str,
-            run_fs=run_fs,
-            geo=zma,
-            spc_info=spc_info,
-            thy_info=mod_thy_info,
-            overwrite=overwrite,
-            frozen_coordinates=(),
-            saddle=bool(zrxn is not None),
-            retryfail=retryfail,
-            **kwargs
-        )
+        filesys.running.start(cnf_run_fs, locs, zma)
+        try:
+            success, ret = es_runner.execute_job(
+                job=elstruct.Job.OPTIMIZATION,
+                script_str=script_str,
+                run_fs=run_fs,
+                geo=zma,
+                spc_info=spc_info,
+                thy_info=mod_thy_info,
+                overwrite=overwrite,
+                frozen_coordinates=(),
+                saddle=bool(zrxn is not None),
+                retryfail=retryfail,
+                **kwargs
+            )
+        finally:
+            filesys.running.finish(cnf_run_fs, locs)
 
         if success:
             inf_obj, _, out_str = ret
             prog = inf_obj.prog
             method = inf_obj.method
-            ene = elstruct.reader.energy(prog, method, out_str)
-            geo = elstruct.reader.opt_geometry(prog, out_str)
-            zma = elstruct.reader.opt_zmatrix(prog, out_str)
-            saved_locs, saved_geos, saved_enes = _saved_cnf_info(
-                cnf_save_fs, mod_thy_info)
+            ene = filesys.parsed.energy(prog, method, out_str)
+            geo = filesys.parsed.opt_geometry(prog, out_str)
+            zma = filesys.parsed.opt_zmatrix(prog, out_str)
+            cnf_idx = filesys.fingerprint.load(cnf_save_fs, mod_thy_info)
+            (_, saved_geos, saved_enes), sym_cnf_info = _similar_cnf_info(
+                cnf_idx, cnf_save_fs, geo, ene)
 
             if _geo_unique(geo, ene, saved_geos, saved_enes, zrxn=zrxn):
+                _, saved_geos, saved_enes = sym_cnf_info
                 sym_id = _sym_unique(
                     geo, ene, saved_geos, saved_enes)
                 if sym_id is None:
@@ -351,14 +368,12 @@ def single_conformer(zma, spc_info, mod_thy_info,
                     filesys.save.conformer(
                         ret, None, cnf_save_fs, mod_thy_info[1:], zrxn=zrxn,
                         rng_locs=(locs[0],), tors_locs=(locs[1],))
-                    saved_geos.append(geo)
-                    saved_enes.append(ene)
-                    saved_locs.append(locs)
+                    filesys.fingerprint.add(cnf_idx, locs, geo, ene)
 
             # Update the conformer trajectory file
-            ioprinter.obj('vspace')
-            filesys.mincnf.traj_sort(cnf_save_fs, mod_thy_info)
-            filesys.mincnf.traj_sort(cnf_save_fs, mod_thy_info, locs[0])
+            _write_traj(cnf_save_fs, mod_thy_info, rid=locs[0])
+
+    return success
 
 
 def conformer_sampling(zma, spc_info, thy_info,
@@ -368,8 +383,35 @@ def conformer_sampling(zma, spc_info, thy_info,
                        tors_names=(),
                        zrxn=None, two_stage=False,
                        retryfail=False, resave=False,
+                       njobs=1, executor='local', ffopt=False,
+                       adaptive=False, batch_samp=True,
                        **kwargs):
     """ run sampling algorithm to find conformers
+
+        With `njobs` > 1, the optimizations for up to `njobs` samples are
+        kept running at once by the executor, and each is saved as it
+        finishes (see `_run_samples_at_once`). Two-stage optimizations
+        are always run one at a time.
+
+        The samples are drawn in batches, screened for clashes and spread
+        out in torsion space (see `_sampler`). Without `batch_samp`, they
+        are instead drawn one at a time and redrawn until
+        automol.pot.low_repulsion_struct accepts them.
+
+        With `ffopt`, the batched samples are first relaxed with a force
+        field and only the distinct low-energy minima are optimized,
+        lowest first; the search ends early once no new minima are found.
+
+        With `adaptive`, every completed sample is tallied against the
+        conformer it found, and the tallies and statistics of the search
+        are kept in a file in the ring directory (see `_adapt`). Up to
+        MAX_SAMP_FACTOR times the requested number of samples are run,
+        and the search ends once the statistics show new low-energy
+        conformers are unlikely to be found.
+
+        :returns: whether the search ran to completion, rather than being
+            ended by the cap on the number of sample attempts
+        :rtype: bool
     """
 
     # Check if any saving needs to be done before hand
@@ -379,12 +421,15 @@ def conformer_sampling(zma, spc_info, thy_info,
 
     # Build filesys
     cnf_save_fs[1].create([rid])
-    inf_obj = autofile.schema.info_objects.conformer_branch(0)
 
     # Set the samples
     nsamp, tors_range_dct = _calc_nsamp(tors_names, nsamp_par, zma, zrxn=zrxn)
+    if adaptive:
+        nsamp *= adapt.MAX_SAMP_FACTOR
     nsamp0 = nsamp
     nsampd = _calc_nsampd(cnf_save_fs, cnf_run_fs, rid)
+    samp_stats = adapt.load(cnf_save_fs[1].path([rid])) if adaptive else None
+    conv = adaptive and adapt.converged(adapt.estimate(samp_stats))
 
     tot_samp = nsamp - nsampd
     brk_tot_samp = nsamp * 5
@@ -396,8 +441,28 @@ def conformer_sampling(zma, spc_info, thy_info,
     if nsamp-nsampd > 0:
         ioprinter.info_message(
             'Running {} samples...'.format(nsamp-nsampd), newline=1)
+
+    # Draw the samples, screened for clashes
+    tors_names = tuple(tors_range_dct.keys())
+    samp_zmas = _sample_zmas(
+        zma, tors_range_dct, max(nsamp0 - nsampd, 1), relax=ffopt,
+        batch=batch_samp)
+
+    if njobs > 1 and not (two_stage and tors_names):
+        complete = _run_samples_at_once(
+            zma, spc_info, thy_info,
+            cnf_run_fs, cnf_save_fs, rid,
+            script_str, overwrite,
+            nsamp0, nsampd, samp_zmas, samp_stats,
+            zrxn=zrxn, retryfail=retryfail,
+            njobs=njobs, executor=executor, adaptive=adaptive,
+            **kwargs)
+        _write_traj(cnf_save_fs, thy_info, rid=rid)
+        return complete
+
     samp_idx = 1
     samp_attempt_idx = 1
+    complete = True
     while True:
         nsamp = nsamp0 - nsampd
         # Break the while loop if enough sampls completed
@@ -410,26 +475,21 @@ def conformer_sampling(zma, spc_info, thy_info,
             ioprinter.info_message(
                 'Max sample num: 5*{} attempted, ending search'.format(nsamp),
                 'Run again if more samples desired.')
+            complete = False
+            break
+        if conv:
+            ioprinter.info_message(
+                'New low-energy conformers unlikely to be found.',
+                'Conformer search complete.')
             break
 
         # Run the conformer sampling
-        if nsampd > 0:
-            samp_zma, = automol.zmat.samples(zma, 1, tors_range_dct)
-        else:
-            samp_zma = zma
-
-        bad_geom_count = 0
-        geo = automol.zmat.geometry(zma)
-        samp_geo = automol.zmat.geometry(samp_zma)
-        while (not automol.pot.low_repulsion_struct(geo, samp_geo) and
-               bad_geom_count < 1000):
-            ioprinter.warning_message('ZMA has high repulsion.', indent=1/2.)
-            ioprinter.warning_message(
-                'Generating new sample ZMA', indent=1/2., newline=1)
-            samp_zma, = automol.zmat.samples(zma, 1, tors_range_dct)
-            samp_geo = automol.zmat.geometry(samp_zma)
-            bad_geom_count += 1
-        ioprinter.debug_message('ZMA is fine...', indent=1/2.)
+        samp_zma = zma if nsampd == 0 else next(samp_zmas, None)
+        if samp_zma is None:
+            ioprinter.info_message(
+                'No new force-field minima remain to be optimized.',
+                'Conformer search complete.')
+            break
 
         cid = autofile.schema.generate_new_conformer_id()
         locs = [rid, cid]
@@ -439,23 +499,138 @@ def conformer_sampling(zma, spc_info, thy_info,
         run_fs = autofile.fs.run(cnf_run_path)
 
         ioprinter.info_message("Run {}/{}".format(samp_idx, tot_samp))
-        tors_names = tuple(tors_range_dct.keys())
-        if two_stage and tors_names:
-            frozen_coords_lst = ((), tors_names)
-            success, ret = es_runner.multi_stage_optimization(
-                script_str=script_str,
-                run_fs=run_fs,
-                geo=samp_zma,
-                spc_info=spc_info,
-                thy_info=thy_info,
-                frozen_coords_lst=frozen_coords_lst,
-                overwrite=overwrite,
-                saddle=bool(zrxn is not None),
-                retryfail=retryfail,
-                **kwargs
-            )
-        else:
-            success, ret = es_runner.execute_job(
+        filesys.running.start(cnf_run_fs, locs, samp_zma)
+        try:
+            if two_stage and tors_names:
+                frozen_coords_lst = ((), tors_names)
+                success, ret = es_runner.multi_stage_optimization(
+                    script_str=script_str,
+                    run_fs=run_fs,
+                    geo=samp_zma,
+                    spc_info=spc_info,
+                    thy_info=thy_info,
+                    frozen_coords_lst=frozen_coords_lst,
+                    overwrite=overwrite,
+                    saddle=bool(zrxn is not None),
+                    retryfail=retryfail,
+                    **kwargs
+                )
+            else:
+                success, ret = es_runner.execute_job(
+                    job=elstruct.Job.OPTIMIZATION,
+                    script_str=script_str,
+                    run_fs=run_fs,
+                    geo=samp_zma,
+                    spc_info=spc_info,
+                    thy_info=thy_info,
+                    overwrite=overwrite,
+                    saddle=bool(zrxn is not None),
+                    retryfail=retryfail,
+                    **kwargs
+                )
+        finally:
+            filesys.running.finish(cnf_run_fs, locs)
+
+        # save function added here
+        if success:
+            nsampd, conv = _save_sample(
+                ret, spc_info, thy_info, cnf_run_fs, cnf_save_fs, locs,
+                samp_zma, samp_stats, zrxn=zrxn, adaptive=adaptive)
+            samp_idx += 1
+
+        # Increment attempt counter
+        samp_attempt_idx += 1
+
+    # Update the conformer trajectory files once the search is done
+    _write_traj(cnf_save_fs, thy_info, rid=rid)
+
+    return complete
+
+
+def _run_samples_at_once(zma, spc_info, thy_info,
+                         cnf_run_fs, cnf_save_fs, rid,
+                         script_str, overwrite,
+                         nsamp0, nsampd, samp_zmas, samp_stats,
+                         zrxn=None, retryfail=False,
+                         njobs=1, executor='local', adaptive=False,
+                         **kwargs):
+    """ Run the sample optimizations of `conformer_sampling` with up to
+        `njobs` of them in flight at once.
+
+        Finished samples go through the same checks and saving as in the
+        blocking loop, in the order they are seen to finish. New samples
+        are only started while the samples completed and in flight fall
+        short of the number requested, so the count of samples in the
+        info files is the same as for the blocking loop.
+
+        :returns: whether the search ran to completion, rather than being
+            ended by the cap on the number of sample attempts
+        :rtype: bool
+    """
+
+    tot_samp = nsamp0 - nsampd
+    brk_tot_samp = nsamp0 * 5
+    conv = adaptive and adapt.converged(adapt.estimate(samp_stats))
+
+    queue = es_runner.job_queue(njobs, executor=executor)
+    inflight = []
+    samp_idx = 1
+    samp_attempt_idx = 1
+    try:
+        while True:
+            # Save the samples whose optimizations have finished
+            es_runner.poll_jobs(queue)
+            for handle, run_fs, locs, samp_zma in tuple(inflight):
+                if handle['status'] != 'running':
+                    inflight.remove((handle, run_fs, locs, samp_zma))
+                    filesys.running.finish(cnf_run_fs, locs)
+                    success, ret = es_runner.read_job(
+                        job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
+                    if success:
+                        nsampd, conv = _save_sample(
+                            ret, spc_info, thy_info, cnf_run_fs, cnf_save_fs,
+                            locs, samp_zma, samp_stats,
+                            zrxn=zrxn, adaptive=adaptive)
+
+            nsamp = nsamp0 - nsampd
+            stop, complete = None, True
+            if samp_zmas is None:
+                stop = ('No new force-field minima remain to be optimized.',
+                        'Conformer search complete.')
+            elif nsamp <= 0:
+                stop = ('Requested number of samples have been completed.',
+                        'Conformer search complete.')
+            elif samp_attempt_idx >= brk_tot_samp:
+                stop = ('Max sample num: 5*{} attempted, ending search'.format(
+                    nsamp), 'Run again if more samples desired.')
+                complete = False
+            elif conv:
+                stop = ('New low-energy conformers unlikely to be found.',
+                        'Conformer search complete.')
+            if stop is not None or nsamp <= len(inflight):
+                # Wait on the samples in flight before starting any more
+                if stop is not None and not inflight:
+                    ioprinter.info_message(*stop)
+                    return complete
+                time.sleep(SAMP_POLL_INTERVAL)
+                continue
+
+            samp_zma = (zma if nsampd == 0 and not inflight else
+                        next(samp_zmas, None))
+            if samp_zma is None:
+                samp_zmas = None
+                continue
+
+            cid = autofile.schema.generate_new_conformer_id()
+            locs = [rid, cid]
+
+            cnf_run_fs[-1].create(locs)
+            cnf_run_path = cnf_run_fs[-1].path(locs)
+            run_fs = autofile.fs.run(cnf_run_path)
+
+            ioprinter.info_message("Run {}/{}".format(samp_idx, tot_samp))
+            handle = es_runner.submit_job(
+                queue,
                 job=elstruct.Job.OPTIMIZATION,
                 script_str=script_str,
                 run_fs=run_fs,
@@ -467,23 +642,83 @@ def conformer_sampling(zma, spc_info, thy_info,
                 retryfail=retryfail,
                 **kwargs
             )
+            filesys.running.start(cnf_run_fs, locs, samp_zma)
+            inflight.append((handle, run_fs, locs, samp_zma))
 
-        # save function added here
-        if success:
-            _save_conformer(
-                ret, cnf_save_fs, locs, thy_info,
-                zrxn=zrxn, orig_ich=spc_info[0], rid_traj=True,
-                init_zma=samp_zma)
-
-            nsampd = _calc_nsampd(cnf_save_fs, cnf_run_fs, rid)
-            nsampd += 1
             samp_idx += 1
-            inf_obj.nsamp = nsampd
-            cnf_save_fs[1].file.info.write(inf_obj, [rid])
-            cnf_run_fs[1].file.info.write(inf_obj, [rid])
+            samp_attempt_idx += 1
+    finally:
+        # Drop the samples still in flight if the search ends on an error
+        for _, _, locs, _ in inflight:
+            filesys.running.finish(cnf_run_fs, locs)
 
-        # Increment attempt counter
-        samp_attempt_idx += 1
+
+def _sample_zmas(zma, tors_range_dct, nbatch, relax=False, batch=True):
+    """ Generate the Z-Matrices sampled over the torsions for the
+        optimizations, `nbatch` at a time, relaxed with the force field
+        if requested; or one at a time without `batch`
+    """
+    if not tors_range_dct:
+        samp_zmas = iter(lambda: zma, None)
+    elif batch:
+        samp_zmas = sampler.diverse_samples(
+            zma, tors_range_dct, nbatch, relax=relax)
+    else:
+        samp_zmas = iter(lambda: _sample_zma(zma, tors_range_dct), None)
+    return samp_zmas
+
+
+def _sample_zma(zma, tors_range_dct):
+    """ Sample a Z-Matrix over the torsions without high repulsion
+    """
+
+    samp_zma, = automol.zmat.samples(zma, 1, tors_range_dct)
+
+    bad_geom_count = 0
+    geo = automol.zmat.geometry(zma)
+    samp_geo = automol.zmat.geometry(samp_zma)
+    while (not automol.pot.low_repulsion_struct(geo, samp_geo) and
+           bad_geom_count < 1000):
+        ioprinter.warning_message('ZMA has high repulsion.', indent=1/2.)
+        ioprinter.warning_message(
+            'Generating new sample ZMA', indent=1/2., newline=1)
+        samp_zma, = automol.zmat.samples(zma, 1, tors_range_dct)
+        samp_geo = automol.zmat.geometry(samp_zma)
+        bad_geom_count += 1
+    ioprinter.debug_message('ZMA is fine...', indent=1/2.)
+
+    return samp_zma
+
+
+def _save_sample(ret, spc_info, thy_info, cnf_run_fs, cnf_save_fs, locs,
+                 samp_zma, samp_stats, zrxn=None, adaptive=False):
+    """ Save the conformer from a successful sample optimization and
+        count it as a completed sample in the info files of its ring;
+        with `adaptive`, tally it against the conformer it found as well
+
+        :returns: the number of samples completed, and whether the search
+            is stopped on the statistics
+        :rtype: (int, bool)
+    """
+
+    rid = locs[0]
+    found = _save_conformer(
+        ret, cnf_save_fs, locs, thy_info,
+        zrxn=zrxn, orig_ich=spc_info[0], init_zma=samp_zma)
+    conv = False
+    if adaptive:
+        if found is not None:
+            adapt.add(samp_stats, *found)
+        conv = adapt.converged(adapt.estimate(samp_stats))
+
+    nsampd = _calc_nsampd(cnf_save_fs, cnf_run_fs, rid)
+    nsampd += 1
+    inf_obj = autofile.schema.info_objects.conformer_branch(0)
+    inf_obj.nsamp = nsampd
+    cnf_save_fs[1].file.info.write(inf_obj, [rid])
+    cnf_run_fs[1].file.info.write(inf_obj, [rid])
+
+    return nsampd, conv
 
 
 def _num_samp_zmas(ring_atoms, nsamp_par):
@@ -503,6 +738,9 @@ def ring_conformer_sampling(
         zrxn=None, two_stage=False, retryfail=False,
         **kwargs):
     """ run sampling algorithm to find conformers
+
+        :returns: whether the requested samples were all completed
+        :rtype: bool
     """
 
     # Build filesys
@@ -515,11 +753,11 @@ def ring_conformer_sampling(
         'dist': 3.5e-1,
         'coulomb': 1.5e-2,
     }
-    _, saved_geos, _ = _saved_cnf_info(
-        cnf_save_fs, thy_info)
-    frag_saved_geos = []
-    for geoi in saved_geos:
-        frag_saved_geos.append(automol.geom.ring_fragments_geometry(geoi))
+    # Samples are only compared against the saved conformers with ring
+    # fragments of similar fingerprints, whose geometries are read once
+    cnf_idx = filesys.fingerprint.load(cnf_save_fs, thy_info)
+    filesys.fingerprint.add_fragment_spectra(cnf_idx, cnf_save_fs)
+    frag_geo_dct = {}
 
     # Make sample zmas
     unique_geos, unique_frag_geos, unique_zmas = [], [], []
@@ -537,7 +775,11 @@ def ring_conformer_sampling(
                 if automol.geom.ring_angles_reasonable(samp_geo, ring_atoms):
                     if not automol.pot.low_repulsion_struct(geo, samp_geo):
                         frag_samp_unique = automol.geom.is_unique(
-                            frag_samp_geo, frag_saved_geos, check_dct)
+                            frag_samp_geo,
+                            _saved_frag_geos(cnf_idx, cnf_save_fs,
+                                             frag_samp_geo, check_dct,
+                                             frag_geo_dct),
+                            check_dct)
                         samp_unique = automol.geom.is_unique(
                             samp_geo, unique_frag_geos, check_dct)
                         if frag_samp_unique:
@@ -581,43 +823,46 @@ def ring_conformer_sampling(
         run_fs = autofile.fs.run(cnf_run_path)
 
         ioprinter.info_message("Run {}/{}".format(samp_idx, tot_samp))
-        tors_names = tuple(set(names
-                               for tors_dct in ring_tors_dct.values()
-                               for names in tors_dct.keys()))
-        if two_stage and tors_names:
-            frozen_coords_lst = ((), tors_names)
-            success, ret = es_runner.multi_stage_optimization(
-                script_str=script_str,
-                run_fs=run_fs,
-                geo=samp_zma,
-                spc_info=spc_info,
-                thy_info=thy_info,
-                frozen_coords_lst=frozen_coords_lst,
-                overwrite=overwrite,
-                saddle=bool(zrxn is not None),
-                retryfail=retryfail,
-                **kwargs
-            )
-        else:
-            success, ret = es_runner.execute_job(
-                job=elstruct.Job.OPTIMIZATION,
-                script_str=script_str,
-                run_fs=run_fs,
-                geo=samp_zma,
-                spc_info=spc_info,
-                thy_info=thy_info,
-                overwrite=overwrite,
-                saddle=bool(zrxn is not None),
-                retryfail=retryfail,
-                **kwargs
-            )
+        filesys.running.start(cnf_run_fs, locs, samp_zma)
+        try:
+            tors_names = tuple(set(names
+                                   for tors_dct in ring_tors_dct.values()
+                                   for names in tors_dct.keys()))
+            if two_stage and tors_names:
+                frozen_coords_lst = ((), tors_names)
+                success, ret = es_runner.multi_stage_optimization(
+                    script_str=script_str,
+                    run_fs=run_fs,
+                    geo=samp_zma,
+                    spc_info=spc_info,
+                    thy_info=thy_info,
+                    frozen_coords_lst=frozen_coords_lst,
+                    overwrite=overwrite,
+                    saddle=bool(zrxn is not None),
+                    retryfail=retryfail,
+                    **kwargs
+                )
+            else:
+                success, ret = es_runner.execute_job(
+                    job=elstruct.Job.OPTIMIZATION,
+                    script_str=script_str,
+                    run_fs=run_fs,
+                    geo=samp_zma,
+                    spc_info=spc_info,
+                    thy_info=thy_info,
+                    overwrite=overwrite,
+                    saddle=bool(zrxn is not None),
+                    retryfail=retryfail,
+                    **kwargs
+                )
+        finally:
+            filesys.running.finish(cnf_run_fs, locs)
 
         # save function added here
         if success:
             _save_conformer(
                 ret, cnf_save_fs, locs, thy_info,
-                zrxn=zrxn, orig_ich=spc_info[0], rid_traj=False,
-                init_zma=samp_zma)
+                zrxn=zrxn, orig_ich=spc_info[0], init_zma=samp_zma)
 
             nsampd = _calc_nsampd(cnf_save_fs, cnf_run_fs)
             nsampd += 1
@@ -626,6 +871,11 @@ def ring_conformer_sampling(
             cnf_save_fs[0].file.info.write(inf_obj)
             cnf_run_fs[0].file.info.write(inf_obj)
 
+    # Update the conformer trajectory file once the search is done
+    _write_traj(cnf_save_fs, thy_info)
+
+    return nsampd >= nsamp0
+
 
 def _calc_nsamp(tors_names, nsamp_par, zma, zrxn=None):
     """ Determine the number of samples to od
@@ -712,24 +962,27 @@ def _presamp_save(spc_info, cnf_run_fs, cnf_save_fs,
 
         # Update the conformer trajectory file
         print('')
-        filesys.mincnf.traj_sort(cnf_save_fs, thy_info, rid=rid)
+        _write_traj(cnf_save_fs, thy_info, rid=rid)
 
 
 def _save_conformer(ret, cnf_save_fs, locs, thy_info, zrxn=None,
-                    orig_ich='', rid_traj=False, init_zma=None):
+                    orig_ich='', init_zma=None):
     """ save the conformers that have been found so far
           # Only go through save procedure if conf not in save
           # may need to get geo, ene, etc; maybe make function
+
+        :returns: the locators and energy of the saved conformer the
+            optimized one was found to be, None if it was not viable
+        :rtype: (tuple(str), float)
     """
 
-    saved_locs, saved_geos, saved_enes = _saved_cnf_info(
-        cnf_save_fs, thy_info)
+    cnf_idx = filesys.fingerprint.load(cnf_save_fs, thy_info)
 
     inf_obj, _, out_str = ret
     prog = inf_obj.prog
     method = inf_obj.method
-    ene = elstruct.reader.energy(prog, method, out_str)
-    geo = elstruct.reader.opt_geometry(prog, out_str)
+    ene = filesys.parsed.energy(prog, method, out_str)
+    geo = filesys.parsed.opt_geometry(prog, out_str)
     zma = filesys.save.read_job_zma(ret, init_zma=init_zma)
 
     # Assess if geometry is properly connected
@@ -742,73 +995,84 @@ def _save_conformer(ret, cnf_save_fs, locs, thy_info, zrxn=None,
             viable = _inchi_are_same(orig_ich, geo)
 
     # Determine uniqueness of conformer, save if needed
+    found = None
     if viable:
-        if _geo_unique(geo, ene, saved_geos, saved_enes, zrxn):
+        (geo_locs, saved_geos, saved_enes), sym_cnf_info = _similar_cnf_info(
+            cnf_idx, cnf_save_fs, geo, ene)
+        geo_id = _geo_match(geo, ene, saved_geos, saved_enes, zrxn)
+        if geo_id is None:
+            saved_locs, saved_geos, saved_enes = sym_cnf_info
             sym_id = _sym_unique(
                 geo, ene, saved_geos, saved_enes)
             if sym_id is None:
                 filesys.save.conformer(
                     ret, None, cnf_save_fs, thy_info[1:], zrxn=zrxn,
                     rng_locs=(locs[0],), tors_locs=(locs[1],))
+                filesys.fingerprint.add(cnf_idx, locs, geo, ene)
+                found = (tuple(locs), ene)
             else:
                 sym_locs = saved_locs[sym_id]
                 filesys.save.sym_indistinct_conformer(
                     geo, cnf_save_fs, locs, sym_locs)
+                found = (tuple(sym_locs), saved_enes[sym_id])
+        else:
+            found = (tuple(geo_locs[geo_id]), saved_enes[geo_id])
 
-        # Update the conformer trajectory file
-        ioprinter.obj('vspace')
-        rid = None
-        if rid_traj:
-            rid = locs[0]
-        filesys.mincnf.traj_sort(cnf_save_fs, thy_info, rid=rid)
+    return found
 
 
-def _saved_cnf_info(cnf_save_fs, mod_thy_info):
-    """ get the locs, geos and enes for saved conformers
+def _similar_cnf_info(cnf_idx, cnf_save_fs, geo, ene):
+    """ get the locs, geos and enes for the saved conformers that a
+        conformer could duplicate, found with the conformer index:
+        those with similar energies, and the subset of them with
+        similar fingerprints that could be symmetrically equivalent
     """
 
-    saved_locs = list(cnf_save_fs[-1].existing())
-    saved_geos = [cnf_save_fs[-1].file.geometry.read(locs)
-                  for locs in saved_locs]
-    found_saved_locs = []
-    found_saved_geos = []
-    found_saved_enes = []
-    for idx, locs in enumerate(saved_locs):
-        path = cnf_save_fs[-1].path(locs)
-        sp_save_fs = autofile.fs.single_point(path)
-        if sp_save_fs[-1].file.energy.exists(mod_thy_info[1:4]):
-            found_saved_enes.append(sp_save_fs[-1].file.energy.read(
-                mod_thy_info[1:4]))
-            found_saved_locs.append(saved_locs[idx])
-            found_saved_geos.append(saved_geos[idx])
-        else:
-            ioprinter.info_message(
-                'No energy saved in single point directory for {}'
-                .format(path))
-            # geo_inf_obj = cnf_save_fs[-1].file.geometry_info.read(
-            #     mod_thy_info[1:4])
-            geo_inf_obj = cnf_save_fs[-1].file.geometry_info.read(
-                locs)
-            geo_end_time = geo_inf_obj.utc_end_time
-            current_time = autofile.schema.utc_time()
-            if (current_time - geo_end_time).total_seconds() < 120:
-                wait_time = 120 - (current_time - geo_end_time).total_seconds()
-                ioprinter.info_message(
-                    'Geo was saved in the last ' +
-                    '{:3.2f} seconds, waiting for {:3.2f} seconds'.format(
-                        (current_time - geo_end_time).total_seconds(),
-                        wait_time))
-                time.sleep(wait_time)
-                if sp_save_fs[-1].file.energy.exists(mod_thy_info[1:4]):
-                    found_saved_enes.append(sp_save_fs[-1].file.energy.read(
-                        mod_thy_info[1:4]))
-                    found_saved_locs.append(saved_locs[idx])
-                    found_saved_geos.append(saved_geos[idx])
-                    ioprinter.info_message('the energy is now found')
-                else:
-                    ioprinter.info_message('waiting helped nothing')
+    geo_entries = filesys.fingerprint.candidates(cnf_idx, ene)
+    sym_entries = filesys.fingerprint.candidates(
+        cnf_idx, ene, spec=filesys.fingerprint.spectrum(geo))
+
+    # Only the geometries of the candidates are read from the filesystem
+    geo_dct = {tuple(entry['locs']):
+               cnf_save_fs[-1].file.geometry.read(entry['locs'])
+               for entry in geo_entries}
+
+    similar_cnf_info = ()
+    for entries in (geo_entries, sym_entries):
+        similar_cnf_info += ((
+            [entry['locs'] for entry in entries],
+            [geo_dct[tuple(entry['locs'])] for entry in entries],
+            [entry['ene'] for entry in entries]),)
 
-    return found_saved_locs, found_saved_geos, found_saved_enes
+    return similar_cnf_info
+
+
+def _saved_frag_geos(cnf_idx, cnf_save_fs, frag_geo, check_dct,
+                     frag_geo_dct):
+    """ get the ring fragment geometries of the saved conformers that a
+        ring fragment geometry could duplicate, found with the conformer
+        index by their fingerprints; the geometries read are kept in
+        `frag_geo_dct` for the next samples
+    """
+
+    entries = filesys.fingerprint.fragment_candidates(
+        cnf_idx, filesys.fingerprint.spectrum(frag_geo),
+        rtol=2.0*check_dct['coulomb'])
+    for entry in entries:
+        locs = tuple(entry['locs'])
+        if locs not in frag_geo_dct:
+            frag_geo_dct[locs] = automol.geom.ring_fragments_geometry(
+                cnf_save_fs[-1].file.geometry.read(locs))
+
+    return [frag_geo_dct[tuple(entry['locs'])] for entry in entries]
+
+
+def _write_traj(cnf_save_fs, thy_info, rid=None):
+    """ write the conformer trajectory files from the conformer index
+    """
+    ioprinter.obj('vspace')
+    cnf_idx = filesys.fingerprint.load(cnf_save_fs, thy_info)
+    filesys.mincnf.traj_sort(cnf_save_fs, thy_info, rid=rid, cnf_idx=cnf_idx)
 
 
 def _init_geom_is_running(cnf_run_fs):
@@ -837,38 +1101,22 @@ def _init_geom_is_running(cnf_run_fs):
 
 
 def _this_conformer_is_running(zma, cnf_run_fs):
-    """ Check the RUN filesystem for similar geometry
-        submissions that are currently running
+    """ Check the index of running conformer optimizations for similar
+        geometry submissions that are currently running
     """
 
     running = False
-    job = elstruct.Job.OPTIMIZATION
     cnf_run_path = cnf_run_fs[0].path()
     ioprinter.debug_message('cnf path ' + cnf_run_path)
-    for locs in cnf_run_fs[-1].existing(ignore_bad_formats=True):
-        cnf_run_path = cnf_run_fs[-1].path(locs)
-        run_fs = autofile.fs.run(cnf_run_path)
-        run_path = run_fs[-1].path([job])
-        inf_obj = run_fs[-1].file.info.read([job])
-        status = inf_obj.status
-        if status == autofile.schema.RunStatus.RUNNING:
-            start_time = inf_obj.utc_start_time
-            current_time = autofile.schema.utc_time()
-            if (current_time - start_time).total_seconds() < 3000000:
-                subrun_fs = autofile.fs.subrun(run_path)
-                inp_str = subrun_fs[0].file.input.read([0, 0])
-                inp_str = inp_str.replace('=', '')
-                prog = inf_obj.prog
-                inp_zma = elstruct.reader.inp_zmatrix(prog, inp_str)
-                if automol.zmat.almost_equal(inp_zma, zma,
-                                             dist_rtol=0.018, ang_atol=.2):
-                    ioprinter.info_message(
-                        'This conformer was started in the last ' +
-                        '{:3.4f} hours in {}.'.format(
-                            (current_time - start_time).total_seconds()/3600.,
-                            run_path))
-                    running = True
-                    break
+    found = filesys.running.find(cnf_run_fs, zma)
+    if found is not None:
+        locs, start_time = found
+        ioprinter.info_message(
+            'This conformer was started in the last ' +
+            '{:3.4f} hours in {}.'.format(
+                (time.time() - start_time)/3600.,
+                cnf_run_fs[-1].path(locs)))
+        running = True
     return running
 
 
@@ -900,6 +1148,13 @@ def _geo_unique(geo, ene, seen_geos, seen_enes, zrxn=None):
 
         Need to pass the torsions
     """
+    return _geo_match(geo, ene, seen_geos, seen_enes, zrxn=zrxn) is None
+
+
+def _geo_match(geo, ene, seen_geos, seen_enes, zrxn=None):
+    """ Find the index of the saved geo a geometry duplicates, None if
+        it is unique
+    """
 
     if zrxn is None:
         check_dct = {'dist': 0.3, 'tors': None}
@@ -912,15 +1167,15 @@ def _geo_unique(geo, ene, seen_geos, seen_enes, zrxn=None):
             no_similar_energies = False
 
     if no_similar_energies:
-        unique = True
+        unique, idx = True, None
     else:
-        unique, _ = automol.geom.is_unique(
+        unique, idx = automol.geom.is_unique(
             geo, seen_geos, check_dct=check_dct)
 
     if not unique:
         ioprinter.bad_conformer('not unique')
 
-    return unique
+    return idx if not unique else None
 
 
 def _inchi_are_same(orig_ich, geo):
@@ -16,6 +16,9 @@ def hindered_rotor_scans(
         increment=0.5235987756,
         retryfail=True):
     """ Perform scans over each of the torsional coordinates
+
+        :returns: whether every point of every scan is saved
+        :rtype: bool
     """
 
     if tors_model != '1dhrfa':
@@ -37,6 +40,7 @@ def hindered_rotor_scans(
         zma, run_tors_names, tors_model)
 
     ioprinter.run_rotors(run_tors_names, const_names)
+    complete = True
     for tors_names, tors_grids in zip(run_tors_names, run_tors_grids):
 
         ioprinter.info_message(
@@ -47,7 +51,7 @@ def hindered_rotor_scans(
         constraint_dct = automol.zmat.constraint_dct(
             zma, const_names, tors_names)
 
-        scan.execute_scan(
+        complete &= scan.execute_scan(
             zma=zma,
             spc_info=spc_info,
             mod_thy_info=mod_thy_info,
@@ -66,6 +70,8 @@ def hindered_rotor_scans(
             **kwargs,
         )
 
+    return complete
+
 
 def check_hr_pot(tors_pots, tors_zmas, tors_paths, emax=-0.5, emin=-10.0):
     """ Check hr pot to see if a new mimnimum is needed
@@ -10,7 +10,9 @@ import elstruct
 import autofile
 import autorun
 from phydat import phycon, symm
+from mechlib import filesys
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechroutines.es import runner as es_runner
 
 
@@ -44,10 +46,13 @@ def run_energy(zma, geo, spc_info, thy_info,
         :param script_str: shell script for executing electronic structure job
         :type script_str: str
         :param overwrite:
+        :returns: whether the energy is in the save filesys
+        :rtype: bool
     """
 
     geo_run_path = geo_run_fs[-1].path(locs)
     geo_save_path = geo_save_fs[-1].path(locs)
+    success = True
 
     # Prepare unique filesystem since many energies may be under same directory
     if not highspin:
@@ -109,7 +114,7 @@ def run_energy(zma, geo, spc_info, thy_info,
             inf_obj, inp_str, out_str = ret
 
             ioprinter.info_message(" - Reading energy from output...")
-            ene = elstruct.reader.energy(inf_obj.prog, inf_obj.method, out_str)
+            ene = filesys.parsed.energy(inf_obj.prog, inf_obj.method, out_str)
 
             ioprinter.energy(ene)
             sp_save_fs[-1].file.input.write(inp_str, thy_info[1:4])
@@ -122,16 +127,20 @@ def run_energy(zma, geo, spc_info, thy_info,
         ene = sp_save_fs[-1].file.energy.read(thy_info[1:4])
         ioprinter.energy(ene)
 
+    return success
+
 
 def run_gradient(zma, geo, spc_info, thy_info,
                  geo_run_fs, geo_save_fs, locs,
                  script_str, overwrite,
                  retryfail=True, **kwargs):
-    """ Determine the gradient for the geometry in the given location
+    """ Determine the gradient for the geometry in the given location,
+        returning whether it is in the save filesys (or not needed)
     """
 
     geo_run_path = geo_run_fs[-1].path(locs)
     geo_save_path = geo_save_fs[-1].path(locs)
+    success = True
 
     # Set input geom
     if geo is not None:
@@ -181,7 +190,7 @@ def run_gradient(zma, geo, spc_info, thy_info,
                 else:
                     ioprinter.info_message(
                         " - Reading gradient from output...")
-                    grad = elstruct.reader.gradient(inf_obj.prog, out_str)
+                    grad = filesys.parsed.gradient(inf_obj.prog, out_str)
 
                     ioprinter.info_message(" - Saving gradient...")
                     if _json_database(geo_save_path):
@@ -202,18 +211,22 @@ def run_gradient(zma, geo, spc_info, thy_info,
     else:
         ioprinter.info_message('Species is an atom. Skipping gradient task.')
 
+    return success
+
 
 def run_hessian(zma, geo, spc_info, thy_info,
                 geo_run_fs, geo_save_fs, locs,
                 script_str, overwrite,
                 retryfail=True, **kwargs):
-    """ Determine the hessian for the geometry in the given location
+    """ Determine the hessian for the geometry in the given location,
+        returning whether it is in the save filesys (or not needed)
     """
 
     # Set the run filesystem information
     geo_run_path = geo_run_fs[-1].path(locs)
     geo_save_path = geo_save_fs[-1].path(locs)
     run_fs = autofile.fs.run(geo_run_path)
+    success = True
 
     # Set input geom
     # Warning using internal coordinates leads to inconsistencies with Gaussian
@@ -261,7 +274,7 @@ def run_hessian(zma, geo, spc_info, thy_info,
                 inf_obj, inp_str, out_str = ret
 
                 ioprinter.info_message(" - Reading hessian from output...")
-                hess = elstruct.reader.hessian(inf_obj.prog, out_str)
+                hess = filesys.parsed.hessian(inf_obj.prog, out_str)
 
                 ioprinter.info_message(" - Saving Hessian...")
                 if _json_database(geo_save_path):
@@ -290,12 +303,15 @@ def run_hessian(zma, geo, spc_info, thy_info,
     else:
         ioprinter.info_message('Species is an atom. Skipping Hessian task.')
 
+    return success
+
 
 def run_vpt2(zma, geo, spc_info, thy_info,
              geo_run_fs, geo_save_fs, locs,
              script_str, overwrite,
              retryfail=True, **kwargs):
-    """ Perform vpt2 analysis for the geometry in the given location
+    """ Perform vpt2 analysis for the geometry in the given location,
+        returning whether it is in the save filesys (or not needed)
     """
 
     # Set the run filesystem information
@@ -330,6 +346,7 @@ def run_vpt2(zma, geo, spc_info, thy_info,
     if is_atom:
         ioprinter.info_message('Species is an atom, Skipping VPT2 task.')
 
+    success = job_geo is not None
     if job_geo is not None and not is_atom:
 
         exists = geo_save_fs[-1].file.anharmonicity_matrix.exists(locs)
@@ -385,17 +402,21 @@ def run_vpt2(zma, geo, spc_info, thy_info,
         else:
             ioprinter.existing_path('VPT2 information', geo_save_path)
 
+    return success
+
 
 def run_prop(zma, geo, spc_info, thy_info,
              geo_run_fs, geo_save_fs, locs,
              script_str, overwrite,
              retryfail=True, **kwargs):
-    """ Determine the properties in the given location
+    """ Determine the properties in the given location, returning
+        whether they are in the save filesys
     """
 
     # Set input geom
     geo_run_path = geo_run_fs[-1].path(locs)
     geo_save_path = geo_save_fs[-1].path(locs)
+    success = True
     if geo is not None:
         job_geo = geo
     else:
@@ -466,6 +487,8 @@ def run_prop(zma, geo, spc_info, thy_info,
             'Dipole moment and polarizability',
             geo_save_path)
 
+    return success
+
 
 def _hess_freqs(geo, geo_save_fs, run_path, save_path, locs, overwrite):
     """ Calculate harmonic frequencies using Hessian
@@ -497,8 +520,9 @@ def _hess_freqs(geo, geo_save_fs, run_path, save_path, locs, overwrite):
         ioprinter.info_message(
                 " - Calculating harmonic frequencies from Hessian...")
         script_str = autorun.SCRIPT_DCT['projrot']
-        rt_freqs, _, rt_imags, _ = autorun.projrot.frequencies(
-            script_str, run_path, [geo], [[]], [hess])
+        with telemetry.measure('projrot', run_path):
+            rt_freqs, _, rt_imags, _ = autorun.projrot.frequencies(
+                script_str, run_path, [geo], [[]], [hess])
         freqs = sorted(rt_imags + rt_freqs)
         ioprinter.frequencies(freqs)
         ioprinter.geometry(geo)
@@ -538,7 +562,7 @@ def _hess_grad(prog, out_str, geo_save_fs,
         # Read the Gradient from the electronic structure output
         ioprinter.info_message(
             " - Attempting to read gradient from Hessian from output...")
-        grad = elstruct.reader.gradient(prog, out_str)
+        grad = filesys.parsed.gradient(prog, out_str)
 
         if grad is not None:
 
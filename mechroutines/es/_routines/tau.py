@@ -16,8 +16,12 @@ def tau_sampling(zma, ref_ene, spc_info, tors_name_grps, nsamp_par,
                  mod_thy_info,
                  tau_run_fs, tau_save_fs,
                  script_str, overwrite,
-                 saddle=False, **opt_kwargs):
-    """ Sample over torsions optimizing all other coordinates
+                 saddle=False, njobs=1, executor='local', **opt_kwargs):
+    """ Sample over torsions optimizing all other coordinates;
+        `njobs` sample optimizations are run at once by the executor.
+
+        :returns: whether as many samples as requested are saved
+        :rtype: bool
     """
 
     # Read the geometry from the initial filesystem and set sampling
@@ -45,6 +49,8 @@ def tau_sampling(zma, ref_ene, spc_info, tors_name_grps, nsamp_par,
         script_str=script_str,
         overwrite=overwrite,
         saddle=saddle,
+        njobs=njobs,
+        executor=executor,
         **opt_kwargs,
     )
 
@@ -58,11 +64,16 @@ def tau_sampling(zma, ref_ene, spc_info, tors_name_grps, nsamp_par,
         'Assessing the convergence of the Monte Carlo Partition Function...')
     assess_pf_convergence(tau_save_fs, ref_ene)
 
+    return len(tau_save_fs[-1].existing()) >= nsamp
+
 
 def run_tau(zma, spc_info, thy_info, nsamp, tors_range_dct,
             tau_run_fs, tau_save_fs, script_str, overwrite,
-            saddle, **kwargs):
+            saddle, njobs=1, executor='local', **kwargs):
     """ run sampling algorithm to find tau dependent geometries
+
+        The optimizations for up to `njobs` samples are kept running
+        in the background at once.
     """
     if not tors_range_dct:
         ioprinter.info_message(
@@ -79,6 +90,7 @@ def run_tau(zma, spc_info, thy_info, nsamp, tors_range_dct,
     idx = 0
     nsamp0 = nsamp
     inf_obj = autofile.schema.info_objects.tau_trunk(0, tors_range_dct)
+    queue = es_runner.job_queue(njobs, executor=executor)
     while True:
         if tau_save_fs[0].file.info.exists():
             inf_obj_s = tau_save_fs[0].file.info.read()
@@ -115,7 +127,8 @@ def run_tau(zma, spc_info, thy_info, nsamp, tors_range_dct,
         samp_geo = automol.zmat.geometry(samp_zma)
         if automol.pot.low_repulsion_struct(geo, samp_geo):
             ioprinter.debug_message('ZMA fine.')
-            es_runner.run_job(
+            es_runner.submit_job(
+                queue,
                 job=elstruct.Job.OPTIMIZATION,
                 script_str=script_str,
                 run_fs=run_fs,
@@ -160,6 +173,8 @@ def run_tau(zma, spc_info, thy_info, nsamp, tors_range_dct,
         tau_save_fs[0].file.info.write(inf_obj)
         tau_run_fs[0].file.info.write(inf_obj)
 
+    es_runner.wait_all(queue)
+
 
 def save_tau(tau_run_fs, tau_save_fs, mod_thy_info):
     """ save the tau dependent geometries that have been found so far
@@ -191,9 +206,9 @@ def save_tau(tau_run_fs, tau_save_fs, mod_thy_info):
                 inf_obj, inp_str, out_str = ret
                 prog = inf_obj.prog
                 method = inf_obj.method
-                ene = elstruct.reader.energy(prog, method, out_str)
+                ene = filesys.parsed.energy(prog, method, out_str)
 
-                geo = elstruct.reader.opt_geometry(prog, out_str)
+                geo = filesys.parsed.opt_geometry(prog, out_str)
                 if db_style == 'directory':
                     ioprinter.save_geo(save_path)
                     tau_save_fs[-1].create(locs)
@@ -20,6 +20,9 @@ from mechroutines.es._routines import _sadpt as sadpt
 def findts(spc_dct, tsname, thy_dct, es_keyword_dct,
            run_prefix, save_prefix):
     """ New run function
+
+        :returns: whether the transition state was found and saved
+        :rtype: bool
     """
 
     method_dct = thy_dct.get(es_keyword_dct['runlvl'])
@@ -31,18 +34,22 @@ def findts(spc_dct, tsname, thy_dct, es_keyword_dct,
 
     # Find the transition state
     search_method = _ts_search_method(spc_dct[tsname])
+    found = False
     if search_method == 'sadpt':
-        run_sadpt(spc_dct, tsname, method_dct, es_keyword_dct,
-                  runfs_dct, savefs_dct)
+        found = run_sadpt(spc_dct, tsname, method_dct, es_keyword_dct,
+                          runfs_dct, savefs_dct)
     elif search_method == 'pst':
         run_pst(spc_dct, tsname, savefs_dct, zma_locs=(0,))
+        found = True
     elif search_method is None:
         print('No TS search algorithm was specified or able to determined')
 
+    return found
+
 
 def run_sadpt(spc_dct, tsname, method_dct, es_keyword_dct,
               runfs_dct, savefs_dct):
-    """ find a transition state
+    """ find a transition state, returning whether one is saved
     """
 
     # Get objects for the calculations
@@ -65,15 +72,18 @@ def run_sadpt(spc_dct, tsname, method_dct, es_keyword_dct,
               cnf_save_fs[-1].path(cnf_save_locs))
         _run = False
 
+    found = not _run
     if _run:
         # split below in guess, scan
         guess_zmas = sadpt.generate_guess_structure(
             ts_dct, method_dct, es_keyword_dct,
             runfs_dct, savefs_dct)
-        sadpt.obtain_saddle_point(
+        found = sadpt.obtain_saddle_point(
             guess_zmas, ts_dct, method_dct,
             runfs_dct, savefs_dct, es_keyword_dct)
 
+    return found
+
 
 def run_pst(spc_dct, tsname, savefs_dct,
             zma_locs=(0,)):
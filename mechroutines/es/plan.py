@@ -0,0 +1,343 @@
+""" Plan the electronic structure jobs that remain to be run for the
+    tasks requested for a species or transition state, without running
+    any jobs, along with an estimate of their computational cost.
+
+    The counts are built by reading the save filesystem the same way the
+    tasks do to decide if work is already done. Where a task depends on
+    the results of an earlier task that has not been run yet (e.g., the
+    torsions of the initial conformer), the counts are estimated from
+    the InChI or reaction information of the species.
+"""
+
+import numpy
+import autofile
+import automol
+from phydat import phycon
+from mechanalyzer.inf import thy as tinfo
+from mechanalyzer.inf import rxn as rinfo
+from mechanalyzer.inf import spc as sinfo
+from mechlib.filesys import build_fs
+from mechlib.filesys import root_locs
+from mechroutines.es._routines import _util as util
+from mechroutines.es.runner import basis_count
+from mechroutines.es.runner import method_power
+from mechroutines.es.tsk import skip_task
+
+
+# Types of jobs counted by the planner
+JOB_TYPES = ('opt', 'hess', 'scan', 'sp', 'grad', 'vpt2', 'prop')
+
+# Cost of each type of job relative to a single-point energy
+JOB_COST_DCT = {
+    'opt': 15.0,
+    'hess': 10.0,
+    'scan': 10.0,
+    'sp': 1.0,
+    'grad': 2.0,
+    'vpt2': 40.0,
+    'prop': 2.0
+}
+
+# Points assumed for searches whose length is not known ahead of time
+TS_SCAN_NPOINTS = 10
+RPATH_NPOINTS = 21
+
+
+def plan_tsk(tsk, spc_dct, spc_name,
+             thy_dct, es_keyword_dct,
+             run_prefix, save_prefix):
+    """ Count the jobs still needed for an electronic structure task.
+
+        :param tsk: name of electronic structure task
+        :type tsk: str
+        :param spc_name: name of species
+        :type spc_name: str
+        :param es_keyword_dct: keyword-value pairs for electronic structure tsk
+        :type es_keyword_dct: dict[str:str]
+        :param run_prefix: root-path to the run-filesystem
+        :type run_prefix: str
+        :param save_prefix: root-path to the save-filesystem
+        :type save_prefix: str
+        :returns: number of jobs of each type
+        :rtype: dict[str: int]
+    """
+
+    cnts = dict.fromkeys(JOB_TYPES, 0)
+    if skip_task(tsk, spc_dct, spc_name, thy_dct, es_keyword_dct, save_prefix):
+        return cnts
+
+    spc_dct_i = spc_dct[spc_name]
+    saddle = bool('ts_' in spc_name)
+    if not saddle:
+        spc_info = sinfo.from_dct(spc_dct_i)
+    else:
+        spc_info = rinfo.ts_info(spc_dct_i['rxn_info'])
+
+    thy_info = tinfo.from_dct(thy_dct.get(es_keyword_dct['runlvl']))
+    ini_thy_info = tinfo.from_dct(thy_dct.get(es_keyword_dct['inplvl']))
+    mod_thy_info = tinfo.modify_orb_label(thy_info, spc_info)
+    mod_ini_thy_info = tinfo.modify_orb_label(ini_thy_info, spc_info)
+
+    _root = root_locs(spc_dct_i, saddle=saddle, name=spc_name)
+    _, ini_cnf_save_fs = build_fs(
+        run_prefix, save_prefix, 'CONFORMER',
+        thy_locs=mod_ini_thy_info[1:], **_root)
+    _, cnf_save_fs = build_fs(
+        run_prefix, save_prefix, 'CONFORMER',
+        thy_locs=mod_thy_info[1:], **_root)
+
+    job = tsk.split('_', 1)[1]
+    cnf_range = es_keyword_dct.get('cnf_range', 'min')
+    if tsk in ('init_geom', 'find_ts'):
+        if not _existing(cnf_save_fs[-1]):
+            cnts['opt'] = 1
+            cnts['hess'] = 1
+            if tsk == 'find_ts':
+                cnts['scan'] = TS_SCAN_NPOINTS
+    elif tsk in ('conf_samp', 'conf_pucker'):
+        nsamp = util.nsamp_init(
+            spc_dct_i['mc_nsamp'],
+            _ntaudof(spc_dct_i, ini_cnf_save_fs, saddle))
+        cnts['opt'] = max(nsamp - _nsampd(cnf_save_fs), 0)
+    elif tsk == 'conf_opt':
+        nini = len(_range_locs(ini_cnf_save_fs, cnf_range))
+        cnts['opt'] = max(nini - len(_existing(cnf_save_fs[-1])), 0)
+    elif 'conf' in tsk:
+        cnts[_job_type(job)] = _npending_cnfs(
+            job, ini_cnf_save_fs, mod_thy_info, cnf_range)
+    elif tsk == 'hr_scan':
+        cnts['scan'] = _npending_scan(
+            spc_dct_i, ini_cnf_save_fs, saddle,
+            es_keyword_dct.get('tors_model', '1dhr'))
+    elif 'hr' in tsk:
+        cnts[_job_type(job)] = _npoints_scan(ini_cnf_save_fs)
+    elif tsk == 'tau_samp':
+        _, tau_save_fs = build_fs(
+            run_prefix, save_prefix, 'TAU',
+            spc_locs=spc_info, thy_locs=mod_ini_thy_info[1:])
+        nsamp = util.nsamp_init(
+            spc_dct_i['tau_nsamp'],
+            _ntaudof(spc_dct_i, ini_cnf_save_fs, saddle))
+        cnts['opt'] = max(nsamp - _nsampd(tau_save_fs, layer=0), 0)
+    elif 'tau' in tsk:
+        _, tau_save_fs = build_fs(
+            run_prefix, save_prefix, 'TAU',
+            spc_locs=spc_info, thy_locs=mod_thy_info[1:])
+        cnts[_job_type(job)] = sum(
+            not _has_result(job, tau_save_fs, locs, mod_thy_info)
+            for locs in _existing(tau_save_fs[-1]))
+    elif 'rpath' in tsk:
+        cnts['scan' if job == 'scan' else _job_type(job)] = RPATH_NPOINTS
+
+    return cnts
+
+
+def cost(cnts, spc_dct_i, method_dct):
+    """ Estimate the cost of a set of jobs from the number of atoms of the
+        species and the scaling of the method with the size of the basis.
+
+        Costs are in units of a single-point energy with 100 basis functions
+        and a method scaling as the cube of the basis size.
+
+        :param cnts: number of jobs of each type
+        :type cnts: dict[str: int]
+        :param spc_dct_i: species dictionary for the species
+        :type spc_dct_i: dict[str: obj]
+        :param method_dct: description of the method the jobs are run with
+        :type method_dct: dict[str: str]
+        :rtype: float
+    """
+
+    nheavy, nhyd = _atom_counts(spc_dct_i)
+    nbasis = basis_count(nheavy, nhyd, method_dct.get('basis'))
+    power = method_power(method_dct.get('method'))
+
+    unit = (max(nbasis, 1) / 100.0)**power
+
+    return sum(JOB_COST_DCT[typ] * num for typ, num in cnts.items()) * unit
+
+
+# Helpers
+def _existing(layer):
+    """ Locators existing in a filesystem layer, which is empty if the
+        layer has not yet been created
+    """
+    try:
+        locs_lst = tuple(layer.existing())
+    except OSError:
+        locs_lst = ()
+    return locs_lst
+
+
+def _job_type(job):
+    """ Job type counted for a subtask name
+    """
+    return {'energy': 'sp'}.get(job, job)
+
+
+def _atom_counts(spc_dct_i):
+    """ Number of heavy atoms and hydrogens of a species; for a TS, from
+        the reactants
+    """
+
+    if spc_dct_i.get('rxn_info') is not None:
+        ichs = rinfo.value(spc_dct_i['rxn_info'], 'inchi')[0]
+    else:
+        ichs = (spc_dct_i['inchi'],)
+
+    nheavy, nhyd = 0, 0
+    for ich in ichs:
+        fml = automol.inchi.formula(ich)
+        nhyd += fml.get('H', 0)
+        nheavy += sum(num for sym, num in fml.items() if sym != 'H')
+
+    return nheavy, nhyd
+
+
+def _ini_zma(ini_cnf_save_fs):
+    """ Z-Matrix and torsions of the first conformer of the input level,
+        None if no conformer exists
+    """
+
+    zma, tors_dct = None, None
+    for locs in _existing(ini_cnf_save_fs[-1]):
+        zma_fs = autofile.fs.zmatrix(ini_cnf_save_fs[-1].path(locs))
+        if zma_fs[-1].file.zmatrix.exists([0]):
+            zma = zma_fs[-1].file.zmatrix.read([0])
+            if zma_fs[-1].file.torsions.exists([0]):
+                tors_dct = zma_fs[-1].file.torsions.read([0])
+            break
+
+    return zma, tors_dct
+
+
+def _ntaudof(spc_dct_i, ini_cnf_save_fs, saddle):
+    """ Number of non-methyl torsions, from the input level conformer if
+        it exists, otherwise from the InChI or TS Z-Matrix
+    """
+
+    zma, tors_dct = _ini_zma(ini_cnf_save_fs)
+    if saddle:
+        ntaudof = len(tors_dct) if tors_dct is not None else 0
+    else:
+        if zma is not None:
+            gra = automol.zmat.graph(zma)
+        else:
+            gra = automol.inchi.graph(spc_dct_i['inchi'])
+        ntaudof = len(
+            automol.graph.rotational_bond_keys(gra, with_h_rotors=False))
+
+    return ntaudof
+
+
+def _nsampd(save_fs, layer=1):
+    """ Number of samples recorded as done, summed over ring conformers
+    """
+
+    nsampd = 0
+    if layer == 0:
+        if save_fs[0].exists() and save_fs[0].file.info.exists():
+            nsampd = save_fs[0].file.info.read().nsamp
+    else:
+        for locs in _existing(save_fs[1]):
+            if save_fs[1].file.info.exists(locs):
+                nsampd += save_fs[1].file.info.read(locs).nsamp
+
+    return nsampd
+
+
+def _range_locs(cnf_save_fs, cnf_range):
+    """ Conformer locators a task with the `cnf_range` keyword may act on,
+        without sorting them by energy. Energy ranges are bounded by all
+        of the conformers.
+    """
+
+    locs_lst = _existing(cnf_save_fs[-1])
+    if cnf_range == 'min':
+        nlocs = 1
+    elif 'n' in cnf_range:
+        nlocs = int(cnf_range.split('n')[1])
+    elif 'r' in cnf_range:
+        nlocs = int(cnf_range.split('r')[1])
+    else:
+        nlocs = max(len(locs_lst), 1)
+
+    return locs_lst[:nlocs] if locs_lst else ((),) * nlocs
+
+
+def _npending_cnfs(job, ini_cnf_save_fs, mod_thy_info, cnf_range):
+    """ Number of conformers in range without the result of the job
+    """
+
+    locs_lst = _range_locs(ini_cnf_save_fs, cnf_range)
+
+    npend = 0
+    for locs in locs_lst:
+        if not locs or not _has_result(
+                job, ini_cnf_save_fs, locs, mod_thy_info):
+            npend += 1
+
+    return npend
+
+
+def _has_result(job, save_fs, locs, mod_thy_info):
+    """ Assess if the result of a job exists for a saved structure,
+        using the same files the tasks check before running a job
+    """
+
+    if job == 'energy':
+        sp_fs = autofile.fs.single_point(save_fs[-1].path(locs))
+        done = sp_fs[-1].file.energy.exists(mod_thy_info[1:4])
+    elif job == 'grad':
+        done = save_fs[-1].file.gradient.exists(locs)
+    elif job == 'hess':
+        done = save_fs[-1].file.hessian.exists(locs)
+    elif job == 'vpt2':
+        done = save_fs[-1].file.anharmonicity_matrix.exists(locs)
+    else:
+        done = (save_fs[-1].file.dipole_moment.exists(locs) and
+                save_fs[-1].file.polarizability.exists(locs))
+
+    return done
+
+
+def _npending_scan(spc_dct_i, ini_cnf_save_fs, saddle, tors_model):
+    """ Number of hindered-rotor scan points not yet in the filesystem
+    """
+
+    increment = spc_dct_i.get('hind_inc', 30.0*phycon.DEG2RAD)
+    npts_rotor = int(numpy.round(2.0 * numpy.pi / increment))
+
+    zma, tors_dct = _ini_zma(ini_cnf_save_fs)
+    if tors_dct is not None:
+        nrotor = len(tors_dct)
+    elif not saddle:
+        gra = (automol.zmat.graph(zma) if zma is not None else
+               automol.inchi.graph(spc_dct_i['inchi']))
+        nrotor = len(
+            automol.graph.rotational_bond_keys(gra, with_h_rotors=True))
+    else:
+        nrotor = 0
+
+    if 'md' in tors_model:
+        ntot = npts_rotor**nrotor if nrotor else 0
+    else:
+        ntot = npts_rotor * nrotor
+
+    return max(ntot - _npoints_scan(ini_cnf_save_fs), 0)
+
+
+def _npoints_scan(ini_cnf_save_fs):
+    """ Number of scan points saved for the first input level conformer
+    """
+
+    npts = 0
+    for locs in _existing(ini_cnf_save_fs[-1]):
+        zma_path = autofile.fs.zmatrix(
+            ini_cnf_save_fs[-1].path(locs))[-1].path([0])
+        for scn_fs in (autofile.fs.scan(zma_path),
+                       autofile.fs.cscan(zma_path)):
+            npts += len(_existing(scn_fs[-1]))
+        break
+
+    return npts
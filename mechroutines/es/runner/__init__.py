@@ -2,15 +2,25 @@
     electronic structure calculations.
 
     This includes single-file jobs (e.g., energies, optimizations) as
-    well as sequences of jobs (e.g., coordinate scans).
+    well as sequences of jobs (e.g., coordinate scans), which may be run
+    either in a blocking manner or submitted to a queue of jobs that run
+    in the background.
 """
 
 from mechroutines.es.runner._run import execute_job
 from mechroutines.es.runner._run import run_job
 from mechroutines.es.runner._run import read_job
+from mechroutines.es.runner._async import job_queue
+from mechroutines.es.runner._async import submit_job
+from mechroutines.es.runner._async import poll_jobs
+from mechroutines.es.runner._async import wait_job
+from mechroutines.es.runner._async import wait_all
 from mechroutines.es.runner._opt import multi_stage_optimization
 from mechroutines.es.runner._par import qchem_params
 from mechroutines.es.runner._par import molpro_opts_mat
+from mechroutines.es.runner._size import basis_count
+from mechroutines.es.runner._size import method_power
+from mechroutines.es.runner._size import time_limits
 from mechroutines.es.runner import scan
 
 
@@ -18,8 +28,16 @@ __all__ = [
     'execute_job',
     'run_job',
     'read_job',
+    'job_queue',
+    'submit_job',
+    'poll_jobs',
+    'wait_job',
+    'wait_all',
     'multi_stage_optimization',
     'qchem_params',
     'molpro_opts_mat',
+    'basis_count',
+    'method_power',
+    'time_limits',
     'scan'
 ]
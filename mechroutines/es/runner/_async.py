@@ -0,0 +1,449 @@
+""" Non-blocking runners for electronic structure calculations.
+
+    Rather than blocking until the program exits, a job is submitted to a
+    queue, which launches it in the background and returns a handle. The
+    handle is polled (or waited on) to advance the job: as each subrun of
+    the options matrix finishes its output is checked for errors and
+    either the next set of options is launched, or the job is finalized
+    by writing its output, info and input into the RUN filesystem, exactly
+    as done by the blocking `run_job` function.
+
+    The queue caps the number of jobs in flight at once; submitting a job
+    to a full queue waits for one of the running jobs to finish. Jobs are
+    launched by the executor of the queue (see `_exec`), where the jobs
+    launched in the same poll of the queue go out as one array job when
+    submitted to a batch scheduler. The output of each running job is
+    followed as it is polled, and a job found to be stuck or doomed is
+    killed and handed to the options matrix early (see `_watch`).
+
+    Handles are dictionaries with the following notable keys:
+        'job': elstruct job label
+        'run_fs': RUN filesystem object of the job
+        'status': one of 'running', 'done' or 'skipped'
+        'success': whether the job ran successfully (None until done)
+"""
+
+import os
+import stat
+import time
+import socket
+import warnings
+import automol
+import elstruct
+from mechlib.amech_io.runner import lease
+from mechlib.amech_io.runner import telemetry
+from mechroutines.es.runner import _seq as optseq
+from mechroutines.es.runner import _exec
+from mechroutines.es.runner import _dedup as dedup
+from mechroutines.es.runner import _size as size
+from mechroutines.es.runner import _watch as watch
+from mechroutines.es.runner._run import JOB_RUNNER_DCT
+from mechroutines.es.runner._run import job_needs_run
+from mechroutines.es.runner._run import claim_job
+from mechroutines.es.runner._run import start_job
+from mechroutines.es.runner._run import finish_job
+
+
+# File names used by elstruct.run.direct
+INPUT_NAME = 'run.inp'
+OUTPUT_NAME = 'run.out'
+SCRIPT_NAME = _exec.SCRIPT_NAME
+
+# Input writers used for each job in the options matrix runners
+JOB_WRITER_DCT = {
+    elstruct.Job.ENERGY: elstruct.writer.energy,
+    elstruct.Job.GRADIENT: elstruct.writer.gradient,
+    elstruct.Job.HESSIAN: elstruct.writer.hessian,
+    elstruct.Job.VPT2: elstruct.writer.vpt2,
+    elstruct.Job.MOLPROP: elstruct.writer.molecular_properties,
+    elstruct.Job.OPTIMIZATION: elstruct.writer.optimization,
+    elstruct.Job.IRCF: elstruct.writer.irc,
+    elstruct.Job.IRCR: elstruct.writer.irc,
+}
+
+# Seconds between checks of running jobs when waiting on them
+POLL_INTERVAL = 2.0
+
+
+# QUEUE OF JOBS
+def job_queue(njobs=1, executor='local'):
+    """ Build a queue that allows `njobs` electronic structure jobs
+        to run at once.
+
+        :param njobs: maximum number of jobs in flight
+        :type njobs: int
+        :param executor: name of the executor that launches the jobs
+        :type executor: str
+        :rtype: dict[str: obj]
+    """
+    assert executor in _exec.EXECUTOR_DCT, (
+        'Executor {} not in {}'.format(executor, tuple(_exec.EXECUTOR_DCT)))
+    return {'njobs': max(njobs, 1), 'executor': executor,
+            'handles': [], 'pending': []}
+
+
+def submit_job(queue, job, script_str, run_fs,
+               geo, spc_info, thy_info,
+               errors=(), options_mat=(), retryfail=True, feedback=False,
+               frozen_coordinates=(), freeze_dummy_atoms=True,
+               overwrite=False,
+               **kwargs):
+    """ Submit an electronic structure job to the queue without waiting
+        for it to finish. Arguments match those of `run_job`.
+
+        If the RUN filesystem shows the job does not need to be run, or
+        it is claimed by another process, a handle with a 'skipped' status
+        is returned. If an identical job has been completed elsewhere in
+        the RUN filesystem, its result is reused and a handle with a 'done'
+        status is returned. Otherwise, if the
+        queue is full, waits for a running job to finish prior to
+        launching the new job.
+
+        :param queue: queue the job is added to
+        :type queue: dict[str: obj]
+        :returns: handle for the job
+        :rtype: dict[str: obj]
+    """
+
+    assert job in JOB_RUNNER_DCT
+
+    run_fs[-1].create([job])
+    run_path = run_fs[-1].path([job])
+
+    handle = {
+        'job': job,
+        'run_fs': run_fs,
+        'status': 'skipped',
+        'success': None,
+    }
+    if not job_needs_run(job, run_fs, overwrite=overwrite,
+                         retryfail=retryfail):
+        return handle
+
+    # Wait for a free slot in the queue
+    while nrunning(queue) >= queue['njobs']:
+        if not poll_jobs(queue):
+            time.sleep(POLL_INTERVAL)
+
+    if not claim_job(job, run_fs, overwrite=overwrite, retryfail=retryfail):
+        return handle
+
+    # Reuse an identical job completed elsewhere in the RUN filesystem
+    key = dedup.job_key(job, geo, spc_info, thy_info,
+                        frozen_coordinates=frozen_coordinates, **kwargs)
+    if not overwrite and dedup.reuse(key, job, run_fs):
+        lease.release(run_path)
+        handle.update({'status': 'done', 'success': True})
+        return handle
+
+    print(" - Submitting {} job at {}".format(job, run_path))
+
+    inf_obj = start_job(job, run_fs, geo, thy_info)
+
+    # Give the job the share of processors and memory its cost warrants
+    script_str, kwargs, nprocs = size.size_job(
+        job, script_str, geo, thy_info, run_path, **kwargs)
+
+    if (job == elstruct.Job.OPTIMIZATION and
+       freeze_dummy_atoms and automol.zmat.is_valid(geo)):
+        frozen_coordinates = (tuple(frozen_coordinates) +
+                              automol.zmat.dummy_coordinate_names(geo))
+
+    # Keywords passed to every input written for the job
+    wrt_kwargs = {
+        'charge': spc_info[1],
+        'mult': spc_info[2],
+        'method': thy_info[1],
+        'basis': thy_info[2],
+        'prog': thy_info[0],
+        'orb_type': thy_info[3]
+    }
+    if job == elstruct.Job.OPTIMIZATION:
+        wrt_kwargs['frozen_coordinates'] = frozen_coordinates
+
+    assert len(errors) == len(options_mat)
+    subrun_fs, macro_idx = optseq.new_subrun(run_path)
+    handle.update({
+        'status': 'running',
+        'script_str': script_str,
+        'inf_obj': inf_obj,
+        'geo': geo,
+        'step_geo': geo,
+        'feedback': feedback,
+        'errors': errors,
+        'options_mat': options_mat,
+        'wrt_kwargs': wrt_kwargs,
+        'kwargs': kwargs,
+        'kwargs_': dict(kwargs),
+        'subrun_fs': subrun_fs,
+        'subrun_idxs': [macro_idx, 0],
+        'queue': queue,
+        'ref': None,
+        'inp_str': None,
+        'key': key,
+        'thy_info': thy_info,
+        'nprocs': nprocs,
+        'time_limit': size.time_limit(job, geo, thy_info, run_path, nprocs),
+        'start_time': time.time(),
+        'usage': {'cpu': None, 'max_rss_mb': None},
+        'labels': telemetry.current_labels(),
+    })
+    _launch(handle)
+    queue['handles'].append(handle)
+
+    return handle
+
+
+def nrunning(queue):
+    """ Count the number of jobs in the queue still running.
+
+        :param queue: queue of jobs
+        :type queue: dict[str: obj]
+        :rtype: int
+    """
+    return sum(1 for handle in queue['handles']
+               if handle['status'] == 'running')
+
+
+def poll_jobs(queue):
+    """ Check all of the running jobs of the queue, advancing any
+        whose current subrun has finished.
+
+        :param queue: queue of jobs
+        :type queue: dict[str: obj]
+        :returns: whether any job of the queue finished during the poll
+        :rtype: bool
+    """
+
+    _flush(queue)
+
+    nfinished = 0
+    for handle in queue['handles']:
+        if handle['status'] == 'running' and poll_job(handle):
+            nfinished += 1
+
+    # Finished handles no longer need to be tracked by the queue
+    queue['handles'] = [handle for handle in queue['handles']
+                        if handle['status'] == 'running']
+
+    return bool(nfinished)
+
+
+def poll_job(handle):
+    """ Check if a job has finished, without blocking. If the current
+        subrun has exited, its output is assessed and the next set of
+        options is launched or the job is finalized as needed.
+
+        :param handle: handle for the job
+        :type handle: dict[str: obj]
+        :returns: whether the job is finished
+        :rtype: bool
+    """
+
+    if handle['status'] != 'running':
+        return True
+    if handle['ref'] is None:
+        # Written, but waiting to be submitted with the rest of the queue
+        return False
+
+    returncode = _exec.poll(handle['queue']['executor'], handle['ref'])
+    if returncode is None:
+        # Kill a run that is stuck or doomed, to be polled as finished
+        if handle['watch']['reason'] is None and watch.check(handle['watch']):
+            print(' - Aborting run in {}: {}'.format(
+                handle['path'], handle['watch']['reason']))
+            _exec.kill(handle['queue']['executor'], handle['ref'])
+        return False
+
+    _add_usage(handle)
+    out_str = _read_output(handle, returncode)
+    if _retry(handle, out_str):
+        _launch(handle)
+        done = False
+    else:
+        wall = time.time() - handle['start_time']
+        run_path = handle['run_fs'][-1].path([handle['job']])
+        telemetry.write(dict(
+            handle['labels'], prog=handle['thy_info'][0], path=run_path,
+            nprocs=handle['nprocs'], host=socket.gethostname(),
+            job=handle['job'], method=handle['thy_info'][1],
+            basis=handle['thy_info'][2], start=handle['start_time'],
+            wall=wall, **handle['usage']))
+        handle['success'] = finish_job(
+            handle['job'], handle['run_fs'], handle['inf_obj'],
+            handle['inp_str'], out_str)
+        if handle['success']:
+            dedup.record(handle['key'], handle['job'], handle['run_fs'])
+            size.record_timing(
+                handle['job'], handle['geo'], handle['thy_info'],
+                run_path, handle['nprocs'], wall)
+        handle['status'] = 'done'
+        handle['ref'] = None
+        lease.release(handle['run_fs'][-1].path([handle['job']]))
+        done = True
+
+    return done
+
+
+def wait_job(handle):
+    """ Block until the job for the handle has finished.
+
+        :param handle: handle for the job
+        :type handle: dict[str: obj]
+        :returns: whether the job ran successfully
+        :rtype: bool
+    """
+
+    if handle['status'] == 'running':
+        _flush(handle['queue'])
+    while not poll_job(handle):
+        _flush(handle['queue'])
+        time.sleep(POLL_INTERVAL)
+
+    return handle['success']
+
+
+def wait_all(queue):
+    """ Block until every job in the queue has finished.
+
+        :param queue: queue of jobs
+        :type queue: dict[str: obj]
+    """
+
+    while nrunning(queue):
+        if not poll_jobs(queue):
+            time.sleep(POLL_INTERVAL)
+
+
+# OPTIONS MATRIX STATE MACHINE
+def _launch(handle):
+    """ Write the input for the current subrun of the job, mirroring what
+        is done by elstruct.run.direct, and add it to the jobs of the queue
+        waiting to be launched by the executor.
+    """
+
+    subrun_fs = handle['subrun_fs']
+    locs = handle['subrun_idxs']
+    subrun_fs[-1].create(locs)
+    path = subrun_fs[-1].path(locs)
+
+    kwargs_ = handle['kwargs_']
+    if handle['errors']:
+        kwargs_ = optseq.warm_start_kwargs(
+            handle['wrt_kwargs']['prog'], kwargs_, path,
+            handle.get('prev_path'))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        inp_str = JOB_WRITER_DCT[handle['job']](
+            geo=handle['step_geo'], **handle['wrt_kwargs'], **kwargs_)
+
+    with open(os.path.join(path, INPUT_NAME), 'w') as inp_obj:
+        inp_obj.write(inp_str)
+    script_path = os.path.join(path, SCRIPT_NAME)
+    with open(script_path, 'w') as script_obj:
+        script_obj.write(handle['script_str'])
+    os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IXUSR)
+
+    handle['inp_str'] = inp_str
+    handle['path'] = path
+    handle['watch'] = watch.watcher(
+        path, handle['wrt_kwargs']['prog'], time_limit=handle['time_limit'])
+    handle['ref'] = None
+    handle['queue']['pending'].append(handle)
+    if not _exec.EXECUTOR_DCT[handle['queue']['executor']]['array']:
+        _flush(handle['queue'])
+
+
+def _flush(queue):
+    """ Launch all of the jobs waiting in the queue with its executor
+    """
+
+    pending = queue['pending']
+    if pending:
+        queue['pending'] = []
+        refs = _exec.submit(
+            queue['executor'], [handle['path'] for handle in pending])
+        for handle, ref in zip(pending, refs):
+            handle['ref'] = ref
+
+
+def _add_usage(handle):
+    """ Add the CPU time and peak memory of the finished subrun of the
+        job to those of its earlier subruns, if the executor reports them
+    """
+
+    usage_dct = _exec.usage(handle['queue']['executor'], handle['ref'])
+    if usage_dct is not None:
+        tot_dct = handle['usage']
+        tot_dct['cpu'] = (tot_dct['cpu'] or 0.0) + usage_dct['cpu']
+        tot_dct['max_rss_mb'] = max(
+            tot_dct['max_rss_mb'] or 0.0, usage_dct['max_rss_mb'])
+
+
+def _read_output(handle, returncode):
+    """ Read the output of the finished subrun of the job
+    """
+
+    if returncode != 0:
+        warnings.resetwarnings()
+        warnings.warn("run failed in {}".format(handle['path']))
+
+    out_path = os.path.join(handle['path'], OUTPUT_NAME)
+    if os.path.exists(out_path):
+        with open(out_path, 'r') as out_obj:
+            out_str = out_obj.read()
+    else:
+        out_str = ''
+
+    return out_str
+
+
+def _retry(handle, out_str):
+    """ Assess the output of the finished subrun for errors and, if a new
+        set of options remains in the matrix, update the handle so the
+        next subrun uses them. Follows the options matrix runners.
+
+        :rtype: bool
+    """
+
+    prog = handle['wrt_kwargs']['prog']
+    errors = handle['errors']
+    options_mat = handle['options_mat']
+
+    error_vals = [
+        elstruct.reader.has_error_message(prog, error, out_str) or
+        error == handle['watch']['error'] for error in errors]
+
+    is_opt = handle['job'] == elstruct.Job.OPTIMIZATION
+    if is_opt and optseq.is_hopeless_optimization(out_str):
+        retry = False
+    elif handle['watch']['error'] == watch.TIMEOUT:
+        retry = False
+        warnings.resetwarnings()
+        warnings.warn("elstruct run failed for exceeding its time limit; "
+                      "last run was in, {}".format(handle['path']))
+        size.record_timeout(handle['run_fs'][-1].path([handle['job']]))
+    elif not any(error_vals) and handle['watch']['error'] is None:
+        retry = False
+    elif any(error_vals) and not optseq.is_exhausted(options_mat):
+        retry = True
+        handle['subrun_idxs'][1] += 1
+        handle['prev_path'] = handle['path']
+        error_row_idx = error_vals.index(True)
+        handle['kwargs_'] = optseq.updated_kwargs(
+            handle['kwargs'], options_mat)
+        handle['options_mat'] = optseq.advance(error_row_idx, options_mat)
+        if is_opt and handle['feedback']:
+            geo = (elstruct.reader.opt_zmatrix(prog, out_str)
+                   if automol.zmat.is_valid(handle['geo']) else
+                   elstruct.reader.opt_geometry(prog, out_str))
+            if geo is not None:
+                handle['step_geo'] = geo
+    else:
+        retry = False
+        warnings.resetwarnings()
+        warnings.warn("elstruct robust run failed; "
+                      "last run was in, {}".format(handle['path']))
+
+    return retry
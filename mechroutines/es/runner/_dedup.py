@@ -0,0 +1,192 @@
+""" Index of the electronic structure jobs completed in a RUN filesystem,
+    keyed by the content of each job rather than where it was run.
+
+    The same calculation is often requested at several places in the
+    filesystem (e.g., an energy at one geometry reached through the
+    conformer, scan and tau layers, or a species listed under several names).
+    Each job is identified by a key hashed from everything that sets its
+    result: the job type, program, method, basis, orbital type, charge,
+    multiplicity, the geometry rounded to GEO_DECIMALS and the options
+    used to write the input. Options that only set how the job is run
+    (memory, processors, the options matrix) are not part of the key.
+
+    The index is a directory at the root of the RUN filesystem with a file
+    for each key holding the path of the job that completed it. A job with
+    a key in the index has the files of the completed job copied into its
+    own RUN directory instead of being run.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import elstruct
+import autofile
+import automol
+from mechlib.amech_io.runner import lease
+
+
+INDEX_DIR_NAME = 'JOBS'
+
+# Top layers of the RUN filesystem, whose parent is its root
+ROOT_LAYERS = ('SPC', 'RXN')
+
+# Number of decimals (in bohr or radian) the geometry is rounded to
+GEO_DECIMALS = 4
+
+# Keyword arguments which do not change the result of a job
+RUNTIME_KWARGS = (
+    'memory', 'machine_options', 'nprocs', 'errors', 'options_mat',
+    'feedback', 'retryfail', 'overwrite', 'executor', 'freeze_dummy_atoms'
+)
+
+# Jobs whose results do not depend on the position of the molecule,
+# so the geometry is keyed in Cartesians centered at the origin
+POSITION_FREE_JOBS = (elstruct.Job.ENERGY,)
+
+
+def job_key(job, geo, spc_info, thy_info, **kwargs):
+    """ Build the key which identifies the content of a job.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param spc_info: (inchi, charge, mult)
+        :type spc_info: tuple(str, int, int)
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :param kwargs: options used to write the input of the job
+        :type kwargs: dict[str: obj]
+        :rtype: str
+    """
+
+    if job in POSITION_FREE_JOBS:
+        if automol.zmat.is_valid(geo):
+            geo = automol.zmat.geometry(geo)
+        xyzs = automol.geom.coordinates(geo)
+        cent = tuple(sum(xyz[i] for xyz in xyzs) / len(xyzs)
+                     for i in range(3))
+        geo = tuple(
+            (symb, tuple(xyz[i] - cent[i] for i in range(3)))
+            for symb, xyz in zip(automol.geom.symbols(geo), xyzs))
+
+    opts = {key: val for key, val in kwargs.items()
+            if key not in RUNTIME_KWARGS}
+    key_str = json.dumps(
+        [job, tuple(thy_info[:4]), spc_info[1], spc_info[2],
+         _rounded(geo), opts],
+        sort_keys=True, default=str)
+
+    return hashlib.sha1(key_str.encode('utf-8')).hexdigest()
+
+
+def reuse(key, job, run_fs):
+    """ Copy the files of a completed job with the same key into the RUN
+        directory of the job, if there is one in the index.
+
+        :param key: key of the job built by `job_key`
+        :type key: str
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+        :returns: whether the result of a completed job was reused
+        :rtype: bool
+    """
+
+    run_path = run_fs[-1].path([job])
+    index_dir = _index_dir(run_path)
+    if index_dir is None:
+        return False
+
+    entry_path = os.path.join(index_dir, key)
+    src_path = None
+    if os.path.exists(entry_path):
+        with open(entry_path) as entry_obj:
+            src_path = os.path.join(
+                os.path.dirname(index_dir), entry_obj.read().strip())
+    if (src_path is None or not os.path.isdir(src_path) or
+            os.path.samefile(src_path, run_path)):
+        return False
+
+    for name in os.listdir(src_path):
+        if name != lease.CLAIM_NAME:
+            file_path = os.path.join(src_path, name)
+            if os.path.isfile(file_path):
+                shutil.copyfile(file_path, os.path.join(run_path, name))
+
+    reused = (run_fs[-1].file.info.exists([job]) and
+              run_fs[-1].file.output.exists([job]) and
+              run_fs[-1].file.info.read([job]).status ==
+              autofile.schema.RunStatus.SUCCESS)
+    if reused:
+        print(" - Reusing identical {} job completed at {}"
+              .format(job, src_path))
+
+    return reused
+
+
+def record(key, job, run_fs):
+    """ Add a completed job to the index, so identical jobs may reuse it.
+
+        :param key: key of the job built by `job_key`
+        :type key: str
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+    """
+
+    run_path = run_fs[-1].path([job])
+    index_dir = _index_dir(run_path)
+    if index_dir is not None:
+        if not os.path.exists(index_dir):
+            os.makedirs(index_dir, exist_ok=True)
+        entry_path = os.path.join(index_dir, key)
+        tmp_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+        with open(tmp_path, 'w') as entry_obj:
+            entry_obj.write(
+                os.path.relpath(run_path, os.path.dirname(index_dir)))
+        os.replace(tmp_path, entry_path)
+
+
+def run_root(run_path):
+    """ Root of the RUN filesystem of a job, found from the path of the
+        job as the parent of its top layer.
+
+        :param run_path: RUN directory of the job
+        :type run_path: str
+        :returns: the root (None if the path is not in a RUN filesystem)
+        :rtype: str
+    """
+
+    root = None
+    path = os.path.abspath(run_path)
+    while os.path.dirname(path) != path:
+        path, name = os.path.split(path)
+        if name in ROOT_LAYERS:
+            root = path
+            break
+
+    return root
+
+
+def _index_dir(run_path):
+    """ Directory of the index at the root of the RUN filesystem of a job,
+        None if the root cannot be found from the path of the job
+    """
+    root = run_root(run_path)
+    return os.path.join(root, INDEX_DIR_NAME) if root is not None else None
+
+
+def _rounded(obj):
+    """ Round all floats in a nested data structure, without negative zeros
+    """
+
+    if isinstance(obj, float):
+        obj = round(obj, GEO_DECIMALS) + 0.0
+    elif isinstance(obj, (tuple, list)):
+        obj = tuple(map(_rounded, obj))
+
+    return obj
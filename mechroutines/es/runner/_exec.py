@@ -0,0 +1,454 @@
+""" Executors which launch the submission scripts of electronic
+    structure jobs and report when they have finished.
+
+    Each executor is a dictionary of four functions and a flag:
+        'submit': launches the scripts in a list of run directories, as
+                  one array job where supported, returning a reference
+                  for each directory
+        'poll': takes a reference and returns the exit code of the script
+                or None if it is still running
+        'kill': takes a reference and terminates the script, which is
+                then polled as having failed
+        'usage': takes the reference of a finished script and returns the
+                 CPU time and peak memory used by it and the processes it
+                 started, or None if they are not known
+        'array': whether jobs should be collected and submitted together
+
+    Supported executors:
+        'local': runs the scripts as background processes on this node
+        'slurm': submits an array job with `sbatch`; options such as the
+                 partition and account are read by sbatch from the
+                 SBATCH_* environment variables
+        'pbs': submits an array job with `qsub -J`
+        'fake': runs the same array scripts as the batch executors, but as
+                background processes on this node, standing in for a queue
+                (e.g., for testing)
+
+    The batch executors wrap the array in a script which runs the job
+    script in each directory and then writes its exit code into a
+    sentinel file, which is how the jobs are seen to have finished.
+
+    The resources used by a job are those of its own script: for local
+    jobs they are taken from the process when it is waited for, and for
+    array tasks they are written into a usage file by GNU time, where it
+    is installed.
+"""
+
+import os
+import stat
+import time
+import signal
+import subprocess
+
+
+SCRIPT_NAME = 'run.sh'
+SENTINEL_NAME = 'run.done'
+USAGE_NAME = 'run.usage'
+ARRAY_SCRIPT_NAME = 'array.sh'
+
+# Seconds a check of the scheduler that a job is alive is trusted for
+ALIVE_LIFETIME = 30.0
+
+# Exit code given to a killed job (that of a shell killed by SIGTERM)
+KILLED_CODE = 128 + signal.SIGTERM
+
+# Variable each scheduler sets to the index of the task in the array
+ARRAY_IDX_VAR_DCT = {
+    'slurm': 'SLURM_ARRAY_TASK_ID',
+    'pbs': 'PBS_ARRAY_INDEX',
+    'fake': 'FAKE_ARRAY_TASK_ID'
+}
+
+# Process objects of the fake queue: {job id: [procs]}
+_FAKE_PROCS = {}
+# Last check of the scheduler: {job id: (time, alive)}
+_ALIVE_CACHE = {}
+# Resources used by finished local processes: {pid: resource usage}
+_LOCAL_USAGE = {}
+
+
+# LOCAL
+def _local_submit(paths):
+    """ Launch the job script in each directory as a background process
+    """
+    return [subprocess.Popen([os.path.join(path, SCRIPT_NAME)], cwd=path)
+            for path in paths]
+
+
+def _local_poll(ref):
+    """ Get the exit code of a local process, None if still running.
+        The process is waited for here rather than by `poll`, to keep
+        the resources used by it and the processes it started.
+    """
+
+    if ref.returncode is None:
+        try:
+            pid, status, rusage = os.wait4(ref.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Already waited for elsewhere, without its resource usage
+            pid, status, rusage = 0, None, None
+            ref.poll()
+        if pid != 0:
+            ref.returncode = os.waitstatus_to_exitcode(status)
+            _LOCAL_USAGE[ref.pid] = rusage
+
+    return ref.returncode
+
+
+def _local_usage(ref):
+    """ CPU time and peak memory of a finished local process
+    """
+
+    usage_dct = None
+    rusage = _LOCAL_USAGE.pop(ref.pid, None)
+    if rusage is not None:
+        # The peak is in kilobytes on Linux
+        usage_dct = {'cpu': rusage.ru_utime + rusage.ru_stime,
+                     'max_rss_mb': rusage.ru_maxrss / 1024.0}
+
+    return usage_dct
+
+
+def _local_kill(ref):
+    """ Terminate a local process along with the program it started
+    """
+    kill_path(os.path.dirname(ref.args[0]))
+
+
+# BATCH QUEUES
+def _batch_submit(paths, queue):
+    """ Write the array script for the directories and submit it to
+        the queue, returning (queue, job id, directory, index) for each
+        array task.
+    """
+
+    for path in paths:
+        for name in (SENTINEL_NAME, USAGE_NAME):
+            if os.path.exists(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+
+    array_path = _write_array_script(paths, ARRAY_IDX_VAR_DCT[queue])
+    ntask = len(paths)
+    if queue == 'slurm':
+        out = subprocess.check_output(
+            ['sbatch', '--parsable', '--array=0-{}'.format(ntask-1),
+             array_path], cwd=paths[0])
+        job_id = out.decode('ascii').strip().split(';')[0]
+    elif queue == 'pbs':
+        # PBS arrays need at least two tasks, so submit one as a plain job
+        if ntask > 1:
+            cmd = ['qsub', '-J', '0-{}'.format(ntask-1), array_path]
+        else:
+            cmd = ['qsub', '-v', 'PBS_ARRAY_INDEX=0', array_path]
+        out = subprocess.check_output(cmd, cwd=paths[0])
+        job_id = out.decode('ascii').strip()
+    else:
+        job_id = 'fake.{}'.format(len(_FAKE_PROCS))
+        _FAKE_PROCS[job_id] = [
+            subprocess.Popen(
+                [array_path], cwd=paths[0],
+                env=dict(os.environ, FAKE_ARRAY_TASK_ID=str(idx)))
+            for idx in range(ntask)]
+
+    print(' - Submitted {} job(s) to {} queue as {}'.format(
+        ntask, queue, job_id))
+
+    return [(queue, job_id, path, idx) for idx, path in enumerate(paths)]
+
+
+def _batch_poll(ref):
+    """ Get the exit code written to the sentinel file of an array task,
+        None if it is still running. A task which is no longer known to
+        the scheduler but never wrote the sentinel is treated as failed.
+    """
+
+    queue, job_id, path, _ = ref
+
+    code = _read_sentinel(path)
+    if code is None and not _is_alive(queue, job_id):
+        # Check again in case the task finished since the first read
+        code = _read_sentinel(path)
+        if code is None:
+            print(' - Job {} left the {} queue without finishing'.format(
+                job_id, queue))
+            code = 1
+
+    return code
+
+
+def _batch_kill(ref):
+    """ Cancel an array task and write its sentinel file, which the task
+        no longer gets to write itself
+    """
+
+    queue, job_id, path, idx = ref
+
+    if queue == 'fake':
+        kill_path(path)
+    else:
+        if queue == 'slurm':
+            cmd = ['scancel', '{}_{}'.format(job_id, idx)]
+        else:
+            # Tasks of PBS arrays are named 1234[idx].server
+            cmd = ['qdel', job_id.replace('[]', '[{}]'.format(idx))]
+        try:
+            subprocess.check_call(cmd, stderr=subprocess.DEVNULL)
+        except (subprocess.CalledProcessError, OSError):
+            # The task finished before it could be cancelled
+            pass
+
+    if _read_sentinel(path) is None:
+        sentinel = os.path.join(path, SENTINEL_NAME)
+        with open(sentinel + '.tmp', 'w') as sent_obj:
+            sent_obj.write('{}\n'.format(KILLED_CODE))
+        os.replace(sentinel + '.tmp', sentinel)
+
+
+def _batch_usage(ref):
+    """ CPU time and peak memory of an array task, read from the usage
+        file written by GNU time as `user system peak-kilobytes`
+    """
+
+    usage_dct = None
+    usage_path = os.path.join(ref[2], USAGE_NAME)
+    if os.path.exists(usage_path):
+        with open(usage_path, 'r') as usage_obj:
+            lines = usage_obj.read().strip().splitlines()
+        # A line on the exit status comes first if the job failed
+        vals = lines[-1].split() if lines else ()
+        try:
+            utime, stime, max_rss = map(float, vals)
+            usage_dct = {'cpu': utime + stime,
+                         'max_rss_mb': max_rss / 1024.0}
+        except ValueError:
+            # Left incomplete by a task that was killed
+            pass
+
+    return usage_dct
+
+
+def _read_sentinel(path):
+    """ Read the exit code from the sentinel file, if present
+    """
+
+    sentinel = os.path.join(path, SENTINEL_NAME)
+    if os.path.exists(sentinel):
+        with open(sentinel, 'r') as sent_obj:
+            code_str = sent_obj.read().strip()
+        code = int(code_str) if code_str else 1
+    else:
+        code = None
+
+    return code
+
+
+def _is_alive(queue, job_id):
+    """ Assess if the scheduler still has an array job queued or running.
+        The result is cached for a short time to limit scheduler calls.
+    """
+
+    cache_time, alive = _ALIVE_CACHE.get(job_id, (None, None))
+    if cache_time is not None and time.time() - cache_time < ALIVE_LIFETIME:
+        return alive
+
+    if queue == 'fake':
+        alive = any(proc.poll() is None for proc in _FAKE_PROCS[job_id])
+    else:
+        if queue == 'slurm':
+            cmd = ['squeue', '-h', '-j', job_id]
+        else:
+            cmd = ['qstat', '-t', job_id]
+        try:
+            out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
+            alive = bool(out.strip())
+        except (subprocess.CalledProcessError, OSError):
+            # Finished jobs are unknown to qstat/squeue, giving an error
+            alive = False
+
+    _ALIVE_CACHE[job_id] = (time.time(), alive)
+
+    return alive
+
+
+def _write_array_script(paths, idx_var):
+    """ Write the script run by each task of the array job, which runs
+        the job script in the directory for its index and then writes
+        the exit code into the sentinel file. The job script is run
+        under GNU time, if installed, to write the resources it used.
+    """
+
+    array_str = '#!/usr/bin/env bash\n'
+    array_str += 'PATHS=(\n'
+    for path in paths:
+        array_str += '    "{}"\n'.format(os.path.abspath(path))
+    array_str += ')\n'
+    array_str += 'cd "${{PATHS[${}]}}" || exit 1\n'.format(idx_var)
+    array_str += 'if /usr/bin/time --version > /dev/null 2>&1; then\n'
+    array_str += "    /usr/bin/time -f '%U %S %M' -o {} ./{}\n".format(
+        USAGE_NAME, SCRIPT_NAME)
+    array_str += 'else\n'
+    array_str += '    ./{}\n'.format(SCRIPT_NAME)
+    array_str += 'fi\n'
+    array_str += 'echo $? > {}.tmp\n'.format(SENTINEL_NAME)
+    array_str += 'mv {0}.tmp {0}\n'.format(SENTINEL_NAME)
+
+    array_path = os.path.join(paths[0], ARRAY_SCRIPT_NAME)
+    with open(array_path, 'w') as array_obj:
+        array_obj.write(array_str)
+    os.chmod(array_path, os.stat(array_path).st_mode | stat.S_IXUSR)
+
+    return array_path
+
+
+EXECUTOR_DCT = {
+    'local': {
+        'submit': _local_submit,
+        'poll': _local_poll,
+        'kill': _local_kill,
+        'usage': _local_usage,
+        'array': False
+    },
+    'slurm': {
+        'submit': lambda paths: _batch_submit(paths, 'slurm'),
+        'poll': _batch_poll,
+        'kill': _batch_kill,
+        'usage': _batch_usage,
+        'array': True
+    },
+    'pbs': {
+        'submit': lambda paths: _batch_submit(paths, 'pbs'),
+        'poll': _batch_poll,
+        'kill': _batch_kill,
+        'usage': _batch_usage,
+        'array': True
+    },
+    'fake': {
+        'submit': lambda paths: _batch_submit(paths, 'fake'),
+        'poll': _batch_poll,
+        'kill': _batch_kill,
+        'usage': _batch_usage,
+        'array': True
+    }
+}
+
+
+def submit(executor, paths):
+    """ Launch the job scripts in a set of run directories with
+        the requested executor.
+
+        :param executor: name of the executor
+        :type executor: str
+        :param paths: run directories holding job scripts
+        :type paths: tuple(str)
+        :returns: references to poll each job with
+        :rtype: list(obj)
+    """
+    assert executor in EXECUTOR_DCT, (
+        'Executor {} not in {}'.format(executor, tuple(EXECUTOR_DCT)))
+    return EXECUTOR_DCT[executor]['submit'](paths) if paths else []
+
+
+def poll(executor, ref):
+    """ Get the exit code of a job launched by an executor, or None if
+        the job is still running.
+
+        :param executor: name of the executor
+        :type executor: str
+        :param ref: reference to the job returned by `submit`
+        :type ref: obj
+        :rtype: int
+    """
+    return EXECUTOR_DCT[executor]['poll'](ref)
+
+
+def kill(executor, ref):
+    """ Terminate a job launched by an executor. The job is then polled
+        as having finished with a non-zero exit code.
+
+        :param executor: name of the executor
+        :type executor: str
+        :param ref: reference to the job returned by `submit`
+        :type ref: obj
+    """
+    EXECUTOR_DCT[executor]['kill'](ref)
+
+
+def usage(executor, ref):
+    """ Get the CPU time and peak memory used by a finished job launched
+        by an executor, or None if they are not known.
+
+        :param executor: name of the executor
+        :type executor: str
+        :param ref: reference to the job returned by `submit`
+        :type ref: obj
+        :returns: CPU seconds and peak memory in MB: {'cpu', 'max_rss_mb'}
+        :rtype: dict[str: float]
+    """
+    return EXECUTOR_DCT[executor]['usage'](ref)
+
+
+def kill_path(path):
+    """ Terminate the processes started by this process which run in a
+        directory, along with all of the processes they started.
+
+        Processes are found from the process table in /proc, so nothing
+        is done on systems without one.
+
+        :param path: directory the processes run in
+        :type path: str
+    """
+
+    path = os.path.realpath(path)
+    child_dct = _process_children()
+
+    pids = []
+    stack = list(child_dct.get(os.getpid(), ()))
+    while stack:
+        pid = stack.pop()
+        if _process_cwd(pid) == path:
+            # Kill the whole tree, as programs may change their directory
+            tree = [pid]
+            while tree:
+                pid = tree.pop()
+                pids.append(pid)
+                tree.extend(child_dct.get(pid, ()))
+        else:
+            stack.extend(child_dct.get(pid, ()))
+
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            # The process already exited
+            pass
+
+
+def _process_children():
+    """ Read the process table into the children of each process:
+        {pid: [child pids]}
+    """
+
+    child_dct = {}
+    if os.path.isdir('/proc'):
+        for name in os.listdir('/proc'):
+            if name.isdigit():
+                try:
+                    with open(os.path.join('/proc', name, 'stat')) as st_obj:
+                        stat_str = st_obj.read()
+                except OSError:
+                    continue
+                # The parent pid follows the state, after the command name
+                ppid = int(stat_str.rsplit(')', 1)[1].split()[1])
+                child_dct.setdefault(ppid, []).append(int(name))
+
+    return child_dct
+
+
+def _process_cwd(pid):
+    """ Working directory of a process, None if it cannot be read
+    """
+    try:
+        cwd = os.readlink(os.path.join('/proc', str(pid), 'cwd'))
+    except OSError:
+        cwd = None
+    return cwd
@@ -4,6 +4,7 @@
 
 import elstruct
 from mechlib.amech_io import printer as ioprinter
+from mechlib.filesys import parsed
 from mechroutines.es.runner._run import execute_job
 
 
@@ -55,7 +56,7 @@ def multi_stage_optimization(script_str, run_fs,
 
         if success:
             inf_obj, _, out_str = ret
-            geo = elstruct.reader.opt_zmatrix(inf_obj.prog, out_str)
+            geo = parsed.opt_zmatrix(inf_obj.prog, out_str)
             print('Success. Moving to next stage...\n')
             if idx+1 != len(frozen_coords_lst):
                 print('Success. Moving to next stage...\n')
@@ -5,7 +5,12 @@ import functools
 import elstruct
 import autofile
 import automol
+from mechlib.amech_io.runner import lease
+from mechlib.amech_io.runner import telemetry
+from mechlib.filesys import parsed
 from . import _seq as optseq
+from . import _dedup as dedup
+from . import _size as size
 
 
 JOB_ERROR_DCT = {
@@ -54,7 +59,7 @@ def execute_job(job, script_str, run_fs,
                 errors=(), options_mat=(),
                 retryfail=True, feedback=False,
                 frozen_coordinates=(), freeze_dummy_atoms=True,
-                overwrite=False,
+                overwrite=False, executor='local',
                 **kwargs):
     """ Both ruBoth runs and reads electrouct jobs
     """
@@ -68,6 +73,7 @@ def execute_job(job, script_str, run_fs,
             frozen_coordinates=frozen_coordinates,
             freeze_dummy_atoms=freeze_dummy_atoms,
             overwrite=overwrite,
+            executor=executor,
             **kwargs)
 
     success, ret = read_job(job, run_fs)
@@ -79,7 +85,7 @@ def run_job(job, script_str, run_fs,
             geo, spc_info, thy_info,
             errors=(), options_mat=(), retryfail=True, feedback=False,
             frozen_coordinates=(), freeze_dummy_atoms=True, overwrite=False,
-            **kwargs):
+            executor='local', **kwargs):
     """ Run an electronic structure job in the specified RUN filesys layer
         by calling the elstruct package to write the input file with the
         information and executing the job with the specified script string.
@@ -103,6 +109,9 @@ def run_job(job, script_str, run_fs,
         :type freeze_dummy_atoms: bool
         :param overwrite: overwrite existing input file with new one and rerun
         :type overwrite: bool
+        :param executor: where to run the job: on this node (`local`) or
+            by submission to a batch queue (`slurm`, `pbs`, `fake`)
+        :type executor: str
         :param kwargs: additional options for electronic structure job
         :type kwarfs: dict[str]
     """
@@ -111,8 +120,109 @@ def run_job(job, script_str, run_fs,
     assert job in JOB_ERROR_DCT
     assert job in JOB_SUCCESS_DCT
 
-    run_path = run_fs[-1].path([job])
+    # Submit jobs for other executors through a queue, waiting on the result
+    if executor != 'local':
+        # Import here since the queue runner is built on this module
+        from mechroutines.es.runner import _async
+
+        queue = _async.job_queue(njobs=1, executor=executor)
+        handle = _async.submit_job(
+            queue, job, script_str, run_fs,
+            geo, spc_info, thy_info,
+            errors=errors, options_mat=options_mat, retryfail=retryfail,
+            feedback=feedback, frozen_coordinates=frozen_coordinates,
+            freeze_dummy_atoms=freeze_dummy_atoms, overwrite=overwrite,
+            **kwargs)
+        _async.wait_job(handle)
+        return
+
     run_fs[-1].create([job])
+    run_path = run_fs[-1].path([job])
+    if (job_needs_run(job, run_fs, overwrite=overwrite, retryfail=retryfail)
+       and claim_job(job, run_fs, overwrite=overwrite, retryfail=retryfail)):
+        try:
+            # Reuse an identical job completed elsewhere, or run it
+            key = dedup.job_key(
+                job, geo, spc_info, thy_info,
+                frozen_coordinates=frozen_coordinates, **kwargs)
+            if overwrite or not dedup.reuse(key, job, run_fs):
+                success = _run_claimed_job(
+                    job, script_str, run_fs, geo, spc_info, thy_info,
+                    errors=errors, options_mat=options_mat,
+                    feedback=feedback,
+                    frozen_coordinates=frozen_coordinates,
+                    freeze_dummy_atoms=freeze_dummy_atoms, **kwargs)
+                if success:
+                    dedup.record(key, job, run_fs)
+        finally:
+            lease.release(run_path)
+
+
+def _run_claimed_job(job, script_str, run_fs,
+                     geo, spc_info, thy_info,
+                     errors=(), options_mat=(), feedback=False,
+                     frozen_coordinates=(), freeze_dummy_atoms=True,
+                     **kwargs):
+    """ Run a job, claimed by this process, with the options matrix runners
+    """
+
+    run_path = run_fs[-1].path([job])
+
+    # Write the RUNNING info and the initial geo/zma
+    inf_obj = start_job(job, run_fs, geo, thy_info)
+
+    # Set job runner based on user request; set special options as needed
+    runner = JOB_RUNNER_DCT[job]
+
+    if job == elstruct.Job.OPTIMIZATION:
+        runner = functools.partial(
+            runner, feedback=feedback,
+            frozen_coordinates=frozen_coordinates,
+            freeze_dummy_atoms=freeze_dummy_atoms)
+
+    # Give the job the share of processors and memory its cost warrants
+    script_str, kwargs, nprocs = size.size_job(
+        job, script_str, geo, thy_info, run_path, **kwargs)
+
+    # Abort runs that are stuck or doomed, as the options matrix would
+    # after they finish with the error found in them, and fail runs that
+    # are out of time
+    time_limit = size.time_limit(job, geo, thy_info, run_path, nprocs)
+
+    with telemetry.measure(thy_info[0], run_path, nprocs=nprocs, job=job,
+                           method=thy_info[1], basis=thy_info[2]) as record:
+        inp_str, out_str = runner(
+            script_str, run_path, geo=geo, chg=spc_info[1],
+            mul=spc_info[2], method=thy_info[1], basis=thy_info[2],
+            orb_type=thy_info[3], prog=thy_info[0],
+            errors=errors, options_mat=options_mat,
+            time_limit=time_limit,
+            **kwargs
+        )
+
+    success = finish_job(job, run_fs, inf_obj, inp_str, out_str)
+    if success:
+        size.record_timing(job, geo, thy_info, run_path, nprocs,
+                           record['wall'])
+
+    return success
+
+
+def job_needs_run(job, run_fs, overwrite=False, retryfail=True):
+    """ Assess whether a job must be (re)run by checking the status
+        of any job already in the RUN filesystem.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+        :param overwrite: overwrite existing input file with new one and rerun
+        :type overwrite: bool
+        :param retryfail: re-run the job if failed job found in RUN filesys
+        :type retryfail: bool
+        :rtype: bool
+    """
+
     run_path = run_fs[-1].path([job])
     if overwrite:
         do_run = True
@@ -136,60 +246,133 @@ def run_job(job, script_str, run_fs,
                 if inf_obj.status == autofile.schema.RunStatus.SUCCESS:
                     print(" - Found completed {} job at {}"
                           .format(job, run_path))
-                else:
+                elif lease.is_claimed(run_path):
                     print(" - Found running {} job at {}"
                           .format(job, run_path))
                     print(" - Skipping...")
+                else:
+                    print(" - Found {} job at {} left running by a process "
+                          "that is no longer active".format(job, run_path))
+                    print(" - Rerunning...")
+                    do_run = True
 
-    if do_run:
-        # Create the run directory
-        status = autofile.schema.RunStatus.RUNNING
-        prog = thy_info[0]
-        method = thy_info[1]
-        basis = thy_info[2]
-        inf_obj = autofile.schema.info_objects.run(
-            job=job, prog=prog, version='',
-            method=method, basis=basis, status=status)
-        inf_obj.utc_start_time = autofile.schema.utc_time()
-        run_fs[-1].file.info.write(inf_obj, [job])
-
-        # Write the initial geo/zma
-        _write_input_geo(geo, job, run_fs)
-
-        # Set job runner based on user request; set special options as needed
-        runner = JOB_RUNNER_DCT[job]
-
-        if job == elstruct.Job.OPTIMIZATION:
-            runner = functools.partial(
-                runner, feedback=feedback,
-                frozen_coordinates=frozen_coordinates,
-                freeze_dummy_atoms=freeze_dummy_atoms)
+    return do_run
 
-        inp_str, out_str = runner(
-            script_str, run_path, geo=geo, chg=spc_info[1],
-            mul=spc_info[2], method=thy_info[1], basis=thy_info[2],
-            orb_type=thy_info[3], prog=thy_info[0],
-            errors=errors, options_mat=options_mat, **kwargs
-        )
 
-        inf_obj.utc_end_time = autofile.schema.utc_time()
-        prog = inf_obj.prog
-        if is_successful_output(out_str, job, prog):
-            run_fs[-1].file.output.write(out_str, [job])
-            print(" - Run succeeded.")
-            status = autofile.schema.RunStatus.SUCCESS
-        else:
-            # Added writing output at point even for fail
-            # Need to check if this is bad. But read_job changes
-            # should address this hopefully
-            run_fs[-1].file.output.write(out_str, [job])
-            print(" - Run failed.")
-            status = autofile.schema.RunStatus.FAILURE
-        version = elstruct.reader.program_version(prog, out_str)
-        inf_obj.version = version
-        inf_obj.status = status
-        run_fs[-1].file.info.write(inf_obj, [job])
-        run_fs[-1].file.input.write(inp_str, [job])
+def claim_job(job, run_fs, overwrite=False, retryfail=True):
+    """ Claim a job for this process so that no other process sharing the
+        RUN filesystem runs it at the same time. Once claimed, the status of
+        the job is checked again in case another process has completed it
+        since it was assessed by `job_needs_run`.
+
+        The claim must be released with `lease.release` once the job ends.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+        :param overwrite: overwrite existing input file with new one and rerun
+        :type overwrite: bool
+        :param retryfail: re-run the job if failed job found in RUN filesys
+        :type retryfail: bool
+        :rtype: bool
+    """
+
+    run_path = run_fs[-1].path([job])
+    if not lease.claim(run_path):
+        print(" - {} job at {} claimed by another process. Skipping..."
+              .format(job, run_path))
+        claimed = False
+    else:
+        claimed = True
+        if not overwrite and run_fs[-1].file.info.exists([job]):
+            status = run_fs[-1].file.info.read([job]).status
+            if (status == autofile.schema.RunStatus.SUCCESS or
+               (status == autofile.schema.RunStatus.FAILURE and
+                not retryfail)):
+                print(" - {} job at {} finished by another process. "
+                      "Skipping...".format(job, run_path))
+                lease.release(run_path)
+                claimed = False
+
+    return claimed
+
+
+def start_job(job, run_fs, geo, thy_info):
+    """ Mark a job as running by writing an info object with a RUNNING
+        status into the RUN filesystem, along with the input geometry.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param thy_info: electronic structure method information
+            (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :returns: the info object for the job
+        :rtype: autofile.schema.info_objects.run object
+    """
+
+    status = autofile.schema.RunStatus.RUNNING
+    prog = thy_info[0]
+    method = thy_info[1]
+    basis = thy_info[2]
+    inf_obj = autofile.schema.info_objects.run(
+        job=job, prog=prog, version='',
+        method=method, basis=basis, status=status)
+    inf_obj.utc_start_time = autofile.schema.utc_time()
+    run_fs[-1].file.info.write(inf_obj, [job])
+
+    _write_input_geo(geo, job, run_fs)
+
+    return inf_obj
+
+
+def finish_job(job, run_fs, inf_obj, inp_str, out_str):
+    """ Assess the success of a finished job and write its output,
+        final info object (with the status) and input into
+        the RUN filesystem.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param run_fs: filesystem object for the run filesys where job is run
+        :type run_fs: autofile.fs.run object
+        :param inf_obj: info object written when the job was started
+        :type inf_obj: autofile.schema.info_objects.run object
+        :param inp_str: string for job input file
+        :type inp_str: str
+        :param out_str: string for job output file
+        :type out_str: str
+        :rtype: bool
+    """
+
+    inf_obj.utc_end_time = autofile.schema.utc_time()
+    prog = inf_obj.prog
+    success = is_successful_output(out_str, job, prog)
+    if success:
+        run_fs[-1].file.output.write(out_str, [job])
+        print(" - Run succeeded.")
+        status = autofile.schema.RunStatus.SUCCESS
+    else:
+        # Added writing output at point even for fail
+        # Need to check if this is bad. But read_job changes
+        # should address this hopefully
+        run_fs[-1].file.output.write(out_str, [job])
+        print(" - Run failed.")
+        status = autofile.schema.RunStatus.FAILURE
+    version = elstruct.reader.program_version(prog, out_str)
+    inf_obj.version = version
+    inf_obj.status = status
+    run_fs[-1].file.info.write(inf_obj, [job])
+    run_fs[-1].file.input.write(inp_str, [job])
+
+    # Parse the values of the output once, for all later readers
+    parsed.write(run_fs[-1].path([job]), run_fs[-1].file.output.path([job]),
+                 job, prog, inf_obj.method, out_str, success)
+
+    return status == autofile.schema.RunStatus.SUCCESS
 
 
 def read_job(job, run_fs):
@@ -198,6 +381,9 @@ def read_job(job, run_fs):
         is found, it is parsed for job success messages. If successful,
         function returns job input, output and autofile job info object.
 
+        The success and the values read from the output are taken from
+        its sidecar of parsed values when current (see filesys.parsed).
+
         :param job: label for job formatted to elstruct package definitions
         :type job: str
         :param run_fs: filesystem object for the run filesys where job is run
@@ -214,11 +400,23 @@ def read_job(job, run_fs):
         assert run_fs[-1].file.input.exists([job])
         inf_obj = run_fs[-1].file.info.read([job])
         inp_str = run_fs[-1].file.input.read([job])
-        out_str = run_fs[-1].file.output.read([job])
         prog = inf_obj.prog
-        ret = (inf_obj, inp_str, out_str)
 
-        success = bool(is_successful_output(out_str, job, prog))
+        # Use the status in the sidecar of the output if it is current,
+        # as found from the output file without reading it, otherwise
+        # assess the output and write a new sidecar
+        path = run_fs[-1].path([job])
+        out_path = run_fs[-1].file.output.path([job])
+        parsed_dct = parsed.read(path, out_path)
+        out_str = run_fs[-1].file.output.read([job])
+        if parsed_dct is not None:
+            success = parsed_dct['success']
+            parsed.remember(out_str, parsed_dct)
+        else:
+            success = bool(is_successful_output(out_str, job, prog))
+            parsed.write(path, out_path, job, prog, inf_obj.method,
+                         out_str, success)
+        ret = (inf_obj, inp_str, out_str)
         if success:
             print(" - Reading successful ouput...")
 
@@ -12,6 +12,8 @@ note: options (`opts_dct`) are a subset of keyword arguments (`kwargs_dct`)
     to elstruct package functions to write electronic structure input files.
 """
 
+import os
+import shutil
 import itertools
 import warnings
 try:
@@ -23,6 +25,16 @@ import elstruct
 import autofile
 from autoparse import pattern as app
 from autoparse import find as apf
+from mechroutines.es.runner import _watch as watch
+from mechroutines.es.runner import _size as size
+
+
+# Name of the file in the subrun directory holding the wavefunction of a run
+# for each program that can restart from it
+WFN_FILE_DCT = {
+    'gaussian': 'run.chk',
+    'molpro': 'run.wfu'
+}
 
 
 # FUNCTIONS FOR HANDLING THE SEQUENCE OF OPTIONS
@@ -31,6 +43,7 @@ def options_matrix_optimization(script_str, prefix,
                                 errors=(), options_mat=(), feedback=False,
                                 frozen_coordinates=(),
                                 freeze_dummy_atoms=True,
+                                time_limit=None,
                                 **kwargs):
     """ try several sets of options to generate an output file
 
@@ -60,6 +73,9 @@ def options_matrix_optimization(script_str, prefix,
         :type frozen_coordinates: tuple(str)
         :param freeze_dummy_atoms: freeze any coords defined by dummy atoms
         :type freeze_dummy_atoms: bool
+        :param time_limit: wall time (s) after which a run is aborted and
+            failed, without trying other options, and the timeout recorded
+        :type time_limit: float
         :param kwargs:
         :type:
         :returns: the input string and the output string
@@ -67,11 +83,7 @@ def options_matrix_optimization(script_str, prefix,
     """
     assert len(errors) == len(options_mat)
 
-    subrun_fs = autofile.fs.subrun(prefix)
-    max_macro_idx, _ = max(subrun_fs[-1].existing(), default=(-1, -1))
-    macro_idx = max_macro_idx + 1
-    if macro_idx == 26:
-        macro_idx = 0
+    subrun_fs, macro_idx = new_subrun(prefix)
     micro_idx = 0
 
     if freeze_dummy_atoms and automol.zmat.is_valid(geo):
@@ -82,37 +94,45 @@ def options_matrix_optimization(script_str, prefix,
 
     # Initialize loop geo
     step_geo = geo
+    prev_path = None
     while True:
         subrun_fs[-1].create([macro_idx, micro_idx])
         path = subrun_fs[-1].path([macro_idx, micro_idx])
+        run_kwargs = (warm_start_kwargs(prog, kwargs_, path, prev_path)
+                      if errors else kwargs_)
 
-        with warnings.catch_warnings():
+        with warnings.catch_warnings(), watch.watching(
+                path, prog, time_limit) as watch_state:
             warnings.simplefilter('ignore')
             inp_str, out_str = elstruct.run.direct(
                 elstruct.writer.optimization, script_str, path,
                 geo=step_geo, charge=chg, mult=mul, method=method,
                 basis=basis, prog=prog, frozen_coordinates=frozen_coordinates,
-                **kwargs_)
+                **run_kwargs)
 
-        error_vals = [elstruct.reader.has_error_message(prog, error, out_str)
-                      for error in errors]
+        error_vals = [
+            elstruct.reader.has_error_message(prog, error, out_str) or
+            error == watch_state['error'] for error in errors]
 
         # Kill the while loop if we Molpro error signaling a hopeless point
         # When an MCSCF WF calculation fails to converge at some step in opt
         # it is not clear how to save the optimization, so we give up on opt
-        fail_pattern = app.one_of_these([
-            app.escape('The problem occurs in Multi'),
-            app.escape('The problem occurs in cipro')
-        ])
-        if apf.has_match(fail_pattern, out_str, case=False):
+        if is_hopeless_optimization(out_str):
             break
 
-        if not any(error_vals):
+        if watch_state['error'] == watch.TIMEOUT:
+            # failure, with no options expected to finish in time
+            _warn_timeout(path)
+            size.record_timeout(prefix)
+            break
+
+        if not any(error_vals) and watch_state['error'] is None:
             # success
             break
-        if not is_exhausted(options_mat):
-            # try again
+        if any(error_vals) and not is_exhausted(options_mat):
+            # try again, starting from the wavefunction of this run
             micro_idx += 1
+            prev_path = path
             error_row_idx = error_vals.index(True)
             kwargs_ = updated_kwargs(kwargs, options_mat)
             options_mat = advance(error_row_idx, options_mat)
@@ -137,6 +157,7 @@ def options_matrix_optimization(script_str, prefix,
 def options_matrix_run(input_writer, script_str, prefix,
                        geo, chg, mul, method, basis, prog,
                        errors=(), options_mat=(),
+                       time_limit=None,
                        **kwargs):
     """ try several sets of options to generate an output file
 
@@ -160,6 +181,9 @@ def options_matrix_run(input_writer, script_str, prefix,
         :type errors: tuple(str)
         :param options_mat: varopis options to run job with
         :type options_mat: tuple(dict[str: str])
+        :param time_limit: wall time (s) after which a run is aborted and
+            failed, without trying other options, and the timeout recorded
+        :type time_limit: float
 
     :returns: the input string and the output string
     :rtype: (str, str)
@@ -167,34 +191,41 @@ def options_matrix_run(input_writer, script_str, prefix,
 
     assert len(errors) == len(options_mat)
 
-    subrun_fs = autofile.fs.subrun(prefix)
-    max_macro_idx, _ = max(subrun_fs[-1].existing(), default=(-1, -1))
-    macro_idx = max_macro_idx + 1
-    if macro_idx == 26:
-        macro_idx = 0
+    subrun_fs, macro_idx = new_subrun(prefix)
     micro_idx = 0
 
     kwargs_ = dict(kwargs)
+    prev_path = None
     while True:
         subrun_fs[-1].create([macro_idx, micro_idx])
         path = subrun_fs[-1].path([macro_idx, micro_idx])
+        run_kwargs = (warm_start_kwargs(prog, kwargs_, path, prev_path)
+                      if errors else kwargs_)
 
-        with warnings.catch_warnings():
+        with warnings.catch_warnings(), watch.watching(
+                path, prog, time_limit) as watch_state:
             warnings.simplefilter('ignore')
             inp_str, out_str = elstruct.run.direct(
                 input_writer, script_str, path,
                 geo=geo, charge=chg, mult=mul, method=method,
-                basis=basis, prog=prog, **kwargs_)
+                basis=basis, prog=prog, **run_kwargs)
 
-        error_vals = [elstruct.reader.has_error_message(prog, error, out_str)
-                      for error in errors]
+        error_vals = [
+            elstruct.reader.has_error_message(prog, error, out_str) or
+            error == watch_state['error'] for error in errors]
 
-        if not any(error_vals):
+        if watch_state['error'] == watch.TIMEOUT:
+            # failure, with no options expected to finish in time
+            _warn_timeout(path)
+            size.record_timeout(prefix)
+            break
+        if not any(error_vals) and watch_state['error'] is None:
             # success
             break
-        if not is_exhausted(options_mat):
-            # try again
+        if any(error_vals) and not is_exhausted(options_mat):
+            # try again, starting from the wavefunction of this run
             micro_idx += 1
+            prev_path = path
             error_row_idx = error_vals.index(True)
             kwargs_ = updated_kwargs(kwargs, options_mat)
             options_mat = advance(error_row_idx, options_mat)
@@ -208,6 +239,111 @@ def options_matrix_run(input_writer, script_str, prefix,
     return inp_str, out_str
 
 
+def _warn_timeout(path):
+    """ Warn that a run was failed for running out of time
+    """
+    warnings.resetwarnings()
+    warnings.warn("elstruct run failed for exceeding its time limit; "
+                  "last run was in, {}".format(path))
+
+
+def new_subrun(prefix):
+    """ Build the subrun filesystem for a job and determine the macro
+        index for a new sequence of runs in it, where the index cycles
+        back to zero after the 26 allowed by the filesystem.
+
+        :param prefix: path to the run directory of the job
+        :type prefix: str
+        :returns: subrun filesystem object and the new macro index
+        :rtype: (autofile.fs.subrun object, int)
+    """
+
+    subrun_fs = autofile.fs.subrun(prefix)
+    max_macro_idx, _ = max(subrun_fs[-1].existing(), default=(-1, -1))
+    macro_idx = max_macro_idx + 1
+    if macro_idx == 26:
+        macro_idx = 0
+
+    return subrun_fs, macro_idx
+
+
+def warm_start_kwargs(prog, kwargs_dct, path, prev_path=None):
+    """ Update a `kwargs_dct` so the program saves the wavefunction of the
+        run to a file in its subrun directory. For a retry, the file saved
+        by the previous run is copied into the new subrun directory and
+        the program is set to start from it, rather than converging the
+        wavefunction from scratch.
+
+        Gaussian reads the orbitals from the checkpoint file (guess=read).
+        Molpro restarts the wavefunction file, from which the SCF and MCSCF
+        programs take their starting orbitals when no START card is given.
+        Programs that cannot restart are left unchanged.
+
+        :param prog: name of the electronic structure program
+        :type prog: str
+        :param kwargs_dct: dictionary of elstruct arguments
+        :type kwargs_dct: dict[str:]
+        :param path: subrun directory of the run
+        :type path: str
+        :param prev_path: subrun directory of the previous run, if a retry
+        :type prev_path: str
+        :rtype: dict[str:]
+    """
+
+    wfn_prog = next((name for name in WFN_FILE_DCT if prog.startswith(name)),
+                    None)
+    if wfn_prog is None:
+        return kwargs_dct
+
+    wfn_path = os.path.join(path, WFN_FILE_DCT[wfn_prog])
+    restart = False
+    if prev_path is not None:
+        prev_wfn_path = os.path.join(prev_path, WFN_FILE_DCT[wfn_prog])
+        if os.path.exists(prev_wfn_path):
+            shutil.copyfile(prev_wfn_path, wfn_path)
+            restart = True
+
+    kwargs_dct = dict(kwargs_dct)
+    if wfn_prog == 'gaussian':
+        kwargs_dct['machine_options'] = tuple(itertools.chain(
+            kwargs_dct.get('machine_options', ()),
+            ('%Chk={}'.format(wfn_path),)))
+        if restart:
+            kwargs_dct['gen_lines'] = _add_gen_lines(
+                kwargs_dct.get('gen_lines'), 1, ('# guess=read',))
+    else:
+        # Absolute path, as Molpro puts relative ones in its wfu directory
+        kwargs_dct['gen_lines'] = _add_gen_lines(
+            kwargs_dct.get('gen_lines'), 1, ('file,2,{}'.format(wfn_path),))
+
+    return kwargs_dct
+
+
+def _add_gen_lines(gen_lines, idx, lines):
+    """ Append lines to the block of a `gen_lines` dictionary
+    """
+    gen_lines = dict(gen_lines) if gen_lines else {}
+    gen_lines[idx] = tuple(itertools.chain(gen_lines.get(idx, ()), lines))
+    return gen_lines
+
+
+def is_hopeless_optimization(out_str):
+    """ Assess if the output of an optimization has a Molpro error
+        signaling a hopeless point, where no further options should be tried.
+
+        :param out_str: string for job output file
+        :type out_str: str
+        :rtype: bool
+    """
+
+    fail_pattern = app.one_of_these([
+        app.escape('The problem occurs in Multi'),
+        app.escape('The problem occurs in cipro')
+    ])
+
+    return apf.has_match(fail_pattern, out_str, case=False)
+
+
 # OPTIONS MATRIX IMPLEMENTATION
 def is_exhausted(opts_mat):
     """ Assess if the options matrix has no remaining option
@@ -0,0 +1,385 @@
+""" Size the processors and memory of each electronic structure job.
+
+    The nprocs and memory set for a program (in the theory input or the
+    defaults in _par.py) are taken as the most a job may use. Each job is
+    given the share of them that its cost warrants, so that small jobs
+    (e.g., a frequency of a triatomic) use a few cores and many of them
+    can run on one node, while large ones keep the full allocation.
+
+    The cost of a job is estimated from the number of basis functions for
+    its geometry, the power of that number the method scales with and the
+    type of job, in units of a single-point energy with 100 basis
+    functions and a method scaling as its cube. The core-seconds taken
+    per unit of cost are refined by the timings of the jobs already run
+    with the same program and method, which are recorded at the root of
+    the RUN filesystem as each job finishes.
+
+    If a time limit factor is set for the run (`es_time_limit` in the
+    input block of run.dat), the predicted wall time also sets a limit on
+    how long a job may run before it is taken to be stuck (see `_watch`),
+    once enough jobs of the same type have been timed. A job that runs out
+    of time is recorded in the timings, and it is not held to a time
+    limit again when it is retried.
+"""
+
+import os
+import re
+import json
+import math
+import statistics
+import contextlib
+import elstruct
+import automol
+from mechroutines.es.runner._dedup import run_root
+
+
+TIMING_NAME = 'timings.jsonl'
+
+# Cost of each type of job relative to a single-point energy
+JOB_COST_DCT = {
+    elstruct.Job.ENERGY: 1.0,
+    elstruct.Job.GRADIENT: 2.0,
+    elstruct.Job.MOLPROP: 2.0,
+    elstruct.Job.HESSIAN: 10.0,
+    elstruct.Job.IRCF: 10.0,
+    elstruct.Job.IRCR: 10.0,
+    elstruct.Job.OPTIMIZATION: 15.0,
+    elstruct.Job.VPT2: 40.0,
+}
+
+# Power of the number of basis functions a method scales with
+METHOD_SCALING = (
+    ('ccsd(t)', 7), ('ccsd', 6), ('mrci', 7), ('caspt2', 6),
+    ('casscf', 5), ('mp2', 5), ('hf', 4)
+)
+DEFAULT_SCALING = 3   # density functionals
+
+# Approximate number of basis functions for (heavy atom, hydrogen)
+BASIS_SIZE = (
+    ('sto', (5, 1)), ('6-31', (15, 5)), ('cc-pvdz', (14, 5)),
+    ('cc-pvtz', (30, 14)), ('cc-pvqz', (55, 30))
+)
+DEFAULT_BASIS_SIZE = (20, 7)
+
+# Core-seconds per unit of cost assumed before any job has been timed,
+# the number of timed jobs needed to replace it, and the core-seconds
+# of work below which adding a core is not worth it
+DEFAULT_RATE = 60.0
+MIN_TIMINGS = 3
+PROC_SECONDS = 600.0
+
+# Least time limit given to a job
+MIN_TIME_LIMIT = 3600.0
+
+# Least memory (GB) given to a job; methods scaling at least as this
+# power need the integrals in memory and keep the full allocation
+MIN_MEMORY = 2
+MEMORY_BOUND_POWER = 5
+
+# Timings read for each RUN filesystem: {path: (size, records)}
+_TIMING_CACHE = {}
+
+# Multiple of the predicted wall time a job may run for, None for no limit
+_TIME_LIMIT = {'factor': None}
+
+
+def basis_count(nheavy, nhyd, basis):
+    """ Approximate number of basis functions for a molecule.
+
+        :param nheavy: number of heavy atoms
+        :type nheavy: int
+        :param nhyd: number of hydrogen atoms
+        :type nhyd: int
+        :param basis: name of the basis set
+        :type basis: str
+        :rtype: int
+    """
+    basis = (basis or '').lower()
+    bfs = next((size for name, size in BASIS_SIZE if name in basis),
+               DEFAULT_BASIS_SIZE)
+    return nheavy * bfs[0] + nhyd * bfs[1]
+
+
+def method_power(method):
+    """ Power of the number of basis functions a method scales with.
+
+        :param method: name of the electronic structure method
+        :type method: str
+        :rtype: int
+    """
+    method = (method or '').lower()
+    return next((pwr for name, pwr in METHOD_SCALING if name in method),
+                DEFAULT_SCALING)
+
+
+def job_cost(job, geo, thy_info):
+    """ Estimate the cost of a job.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :rtype: float
+    """
+
+    symbs = [symb for symb in (automol.zmat.symbols(geo)
+                               if automol.zmat.is_valid(geo) else
+                               automol.geom.symbols(geo))
+             if symb != 'X']
+    nhyd = sum(1 for symb in symbs if symb == 'H')
+    nbasis = basis_count(len(symbs) - nhyd, nhyd, thy_info[2])
+    unit = (max(nbasis, 1) / 100.0)**method_power(thy_info[1])
+
+    return JOB_COST_DCT.get(job, 1.0) * unit
+
+
+def size_job(job, script_str, geo, thy_info, run_path, **kwargs):
+    """ Reduce the processors and memory set for a job to those its cost
+        warrants, updating the submission script and the job options.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param script_str: BASH submission script for the job
+        :type script_str: str
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :param run_path: RUN directory of the job
+        :type run_path: str
+        :param kwargs: options for the electronic structure job
+        :type kwargs: dict[str: obj]
+        :returns: submission script, options and number of processors
+        :rtype: (str, dict[str: obj], int)
+    """
+
+    max_nprocs = _nprocs(script_str, kwargs)
+    if max_nprocs is None:
+        return script_str, kwargs, 1
+
+    cost = job_cost(job, geo, thy_info)
+    seconds = cost * _rate(run_path, thy_info)
+    nprocs = min(max_nprocs, max(1, math.ceil(seconds / PROC_SECONDS)))
+
+    kwargs = dict(kwargs)
+    if kwargs.get('memory') is not None and nprocs < max_nprocs:
+        if method_power(thy_info[1]) < MEMORY_BOUND_POWER:
+            memory = max(MIN_MEMORY, math.ceil(
+                kwargs['memory'] * nprocs / max_nprocs))
+            kwargs['memory'] = min(kwargs['memory'], memory)
+
+    if nprocs < max_nprocs:
+        print(" - Sizing job to {} of {} processors and {} GB memory"
+              .format(nprocs, max_nprocs, kwargs.get('memory')))
+        script_str, kwargs = _set_nprocs(script_str, kwargs, nprocs)
+
+    return script_str, kwargs, nprocs
+
+
+@contextlib.contextmanager
+def time_limits(factor):
+    """ Set time limits for the jobs run within the context, as a multiple
+        of their predicted wall times (including by the worker processes
+        of a pool started within it).
+
+        :param factor: multiple of the predicted wall time a job may run
+            for, None to set no time limits
+        :type factor: float
+    """
+
+    old_factor = _TIME_LIMIT['factor']
+    _TIME_LIMIT['factor'] = factor
+    try:
+        yield
+    finally:
+        _TIME_LIMIT['factor'] = old_factor
+
+
+def time_limit(job, geo, thy_info, run_path, nprocs):
+    """ Wall time after which a run of a job is taken to be stuck, as a
+        multiple (set with `time_limits`) of the longest wall time
+        predicted for it by the timed jobs of the same type.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :param run_path: RUN directory of the job
+        :type run_path: str
+        :param nprocs: number of processors the job runs on
+        :type nprocs: int
+        :returns: the time limit in seconds (None if no time limits are
+            set, the job has run out of time before, or too few jobs of
+            its type with the program and method have been timed)
+        :rtype: float
+    """
+
+    limit = None
+    factor = _TIME_LIMIT['factor']
+    if factor is not None and not _timed_out(run_path):
+        rates = _timed_rates(run_path, thy_info, job=job)
+        if len(rates) >= MIN_TIMINGS:
+            seconds = job_cost(job, geo, thy_info) * max(rates) / nprocs
+            limit = max(MIN_TIME_LIMIT, factor * seconds)
+
+    return limit
+
+
+def record_timing(job, geo, thy_info, run_path, nprocs, seconds):
+    """ Record the wall time of a finished job at the root of its RUN
+        filesystem, to refine the cost rate used to size later jobs.
+
+        :param job: label for job formatted to elstruct package definitions
+        :type job: str
+        :param geo: input molecular geometry or Z-Matrix
+        :type geo:
+        :param thy_info: (prog, method, basis, orb_label)
+        :type thy_info: tuple(str)
+        :param run_path: RUN directory of the job
+        :type run_path: str
+        :param nprocs: number of processors the job ran on
+        :type nprocs: int
+        :param seconds: wall time of the job
+        :type seconds: float
+    """
+
+    root = run_root(run_path)
+    if root is not None:
+        record = {
+            'job': job,
+            'prog': thy_info[0],
+            'method': thy_info[1],
+            'basis': thy_info[2],
+            'cost': job_cost(job, geo, thy_info),
+            'nprocs': nprocs,
+            'seconds': seconds,
+            'path': os.path.relpath(run_path, root)
+        }
+        # A single short append, so lines of concurrent jobs do not mix
+        with open(os.path.join(root, TIMING_NAME), 'a') as timing_obj:
+            timing_obj.write(json.dumps(record) + '\n')
+
+
+def record_timeout(run_path):
+    """ Record that a job ran out of time at the root of its RUN
+        filesystem, so that it is given no time limit when it is retried.
+
+        :param run_path: RUN directory of the job
+        :type run_path: str
+    """
+
+    root = run_root(run_path)
+    if root is not None:
+        record = {'timeout': True, 'path': os.path.relpath(run_path, root)}
+        with open(os.path.join(root, TIMING_NAME), 'a') as timing_obj:
+            timing_obj.write(json.dumps(record) + '\n')
+
+
+def read_timings(root):
+    """ Read the timings recorded at the root of a RUN filesystem, reading
+        the file again only if it has grown since it was last read.
+
+        :param root: root of the RUN filesystem
+        :type root: str
+        :rtype: tuple(dict[str: obj])
+    """
+
+    timing_path = os.path.join(root, TIMING_NAME)
+    size = os.path.getsize(timing_path) if os.path.exists(timing_path) else 0
+    cached_size, records = _TIMING_CACHE.get(timing_path, (0, ()))
+    if size != cached_size:
+        records = []
+        with open(timing_path) as timing_obj:
+            for line in timing_obj:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Line left incomplete by a process that was killed
+                    pass
+        records = tuple(records)
+        _TIMING_CACHE[timing_path] = (size, records)
+
+    return records
+
+
+# Helpers
+def _rate(run_path, thy_info):
+    """ Core-seconds per unit of cost for jobs with the program and method,
+        from the recorded timings if there are enough of them
+    """
+
+    rate = DEFAULT_RATE
+    rates = _timed_rates(run_path, thy_info)
+    if len(rates) >= MIN_TIMINGS:
+        rate = statistics.median(rates)
+
+    return rate
+
+
+def _timed_rates(run_path, thy_info, job=None):
+    """ Core-seconds per unit of cost of each timed job with the program
+        and method in the RUN filesystem, only of the given type if one is
+        given
+    """
+
+    rates = []
+    root = run_root(run_path)
+    if root is not None:
+        rates = [rec['seconds'] * rec['nprocs'] / rec['cost']
+                 for rec in read_timings(root)
+                 if not rec.get('timeout')
+                 and (rec['prog'], rec['method']) == tuple(thy_info[:2])
+                 and (job is None or rec['job'] == job)
+                 and rec['cost'] > 0.0]
+
+    return rates
+
+
+def _timed_out(run_path):
+    """ Assess if a job has run out of time before
+    """
+
+    timed_out = False
+    root = run_root(run_path)
+    if root is not None:
+        rel_path = os.path.relpath(run_path, root)
+        timed_out = any(rec.get('timeout') and rec['path'] == rel_path
+                        for rec in read_timings(root))
+
+    return timed_out
+
+
+def _nprocs(script_str, kwargs):
+    """ Number of processors set for a job, None if it cannot be set
+    """
+
+    nprocs = None
+    for opt in kwargs.get('machine_options', ()):
+        match = re.match(r'%NProcShared=(\d+)', opt, re.IGNORECASE)
+        if match:
+            nprocs = int(match.group(1))
+    if nprocs is None and script_str is not None:
+        match = re.search(r'molpro.*\s-n\s*(\d+)', script_str)
+        if match:
+            nprocs = int(match.group(1))
+
+    return nprocs
+
+
+def _set_nprocs(script_str, kwargs, nprocs):
+    """ Set the number of processors for a job, wherever it is given
+    """
+
+    if 'machine_options' in kwargs:
+        kwargs['machine_options'] = [
+            re.sub(r'(%NProcShared=)\d+', r'\g<1>{}'.format(nprocs), opt,
+                   flags=re.IGNORECASE)
+            for opt in kwargs['machine_options']]
+    script_str = re.sub(
+        r'(molpro.*\s-n\s*)\d+', r'\g<1>{}'.format(nprocs), script_str)
+
+    return script_str, kwargs
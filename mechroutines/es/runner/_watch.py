@@ -0,0 +1,212 @@
+""" Watchdog which follows the output of an electronic structure run while
+    the program is still going, to abort runs that are already doomed
+    rather than let them use up their full wall time.
+
+    The output is read as it grows, only the lines added since the last
+    check being parsed. A run is aborted if:
+        - the program prints a message after which it cannot recover
+          (e.g., a Molpro MCSCF failure in an optimization);
+        - the energy changes of its SCF iterations oscillate in sign
+          without getting any smaller (see `is_oscillating`);
+        - it runs longer than its time limit, if one is set for the run,
+          from the wall time predicted from the cost of the job (see
+          `_size.time_limit`).
+
+    An aborted run is killed and handed to the options matrix with the
+    elstruct error it was aborted for, exactly as if the error had been
+    read from its output once it finished, so the next set of options
+    is tried for it; if the job has no options for that error, the run
+    is failed. A run out of time is instead aborted with the TIMEOUT
+    outcome, for which no other options are tried: the run is failed, as
+    its next options would be no more likely to finish in time, and the
+    timeout is recorded so that a retry of the job is not held to the
+    same limit (see `_size.record_timeout`).
+"""
+
+import os
+import re
+import time
+import threading
+import contextlib
+import elstruct
+from mechroutines.es.runner import _exec
+
+
+OUTPUT_NAME = 'run.out'
+
+# Seconds between checks of the output of a running job
+WATCH_INTERVAL = 10.0
+
+# Messages after which a run cannot recover, for each program, with the
+# elstruct error the run is taken to have failed with
+FATAL_PATTERN_DCT = {
+    'molpro': (
+        (r'The problem occurs in Multi', elstruct.Error.MCSCF_NOCONV),
+        (r'The problem occurs in cipro', elstruct.Error.MCSCF_NOCONV)
+    )
+}
+
+# Lines starting an SCF, and those giving the energy change of each of its
+# iterations (the change being the first group), for each program
+SCF_START_PATTERN_DCT = {
+    'gaussian': r'^\s*Cycle\s+1\s+Pass',
+    'molpro': r'^\s*ITER\s+ETOT'
+}
+SCF_CHANGE_PATTERN_DCT = {
+    'gaussian': r'Delta-E=\s*(-?\d+\.\d+)',
+    'molpro': r'^\s*\d+\s+-?\d+\.\d+\s+(-?\d+\.\d+)\s+\d+\.\d+D[-+]\d+'
+}
+
+# Number of most recent SCF iterations assessed for oscillation
+SCF_WINDOW = 20
+
+# Outcome of a run aborted for running past its time limit
+TIMEOUT = 'timeout'
+
+
+def watcher(path, prog, time_limit=None):
+    """ Build the state used to watch the output of a run.
+
+        The time limit is counted from when the output is first seen, so
+        the time a job waits in a batch queue is not counted against it.
+
+        :param path: subrun directory of the run
+        :type path: str
+        :param prog: name of the electronic structure program
+        :type prog: str
+        :param time_limit: wall time (s) after which the run is aborted
+        :type time_limit: float
+        :rtype: dict[str: obj]
+    """
+
+    prog = next((name for name in SCF_START_PATTERN_DCT
+                 if prog.startswith(name)), prog)
+
+    return {
+        'out_path': os.path.join(path, OUTPUT_NAME),
+        'prog': prog,
+        'time_limit': time_limit,
+        'start': None,
+        'offset': 0,
+        'partial': '',
+        'scf_changes': [],
+        'reason': None,
+        'error': None
+    }
+
+
+def check(state):
+    """ Read the lines added to the output since the last check and
+        assess if the run should be aborted, setting the reason for it
+        and the elstruct error it is taken for (or TIMEOUT) in the state.
+
+        :param state: state of the watch built by `watcher`
+        :type state: dict[str: obj]
+        :returns: whether the run should be aborted
+        :rtype: bool
+    """
+
+    if state['reason'] is not None:
+        return True
+    if not os.path.exists(state['out_path']):
+        return False
+
+    if state['start'] is None:
+        state['start'] = time.time()
+
+    with open(state['out_path'], 'rb') as out_obj:
+        out_obj.seek(state['offset'])
+        new_bytes = out_obj.read()
+    state['offset'] += len(new_bytes)
+    new_str = new_bytes.decode('utf-8', errors='replace')
+
+    # Keep an incomplete last line for the next check
+    lines = (state['partial'] + new_str).split('\n')
+    state['partial'] = lines.pop()
+
+    prog = state['prog']
+    for line in lines:
+        error = _fatal_error(prog, line)
+        if error is not None:
+            state['reason'] = 'unrecoverable error: {}'.format(line.strip())
+            state['error'] = error
+            break
+        if prog in SCF_START_PATTERN_DCT:
+            if re.search(SCF_START_PATTERN_DCT[prog], line):
+                state['scf_changes'] = []
+            match = re.search(SCF_CHANGE_PATTERN_DCT[prog], line)
+            if match:
+                state['scf_changes'].append(float(match.group(1)))
+                if is_oscillating(state['scf_changes']):
+                    state['reason'] = 'SCF oscillating without converging'
+                    state['error'] = elstruct.Error.SCF_NOCONV
+                    break
+
+    if (state['reason'] is None and state['time_limit'] is not None and
+            time.time() - state['start'] > state['time_limit']):
+        state['reason'] = 'time limit of {:.0f} s exceeded'.format(
+            state['time_limit'])
+        state['error'] = TIMEOUT
+
+    return state['reason'] is not None
+
+
+def _fatal_error(prog, line):
+    """ The elstruct error for a line of output after which a run cannot
+        recover, None if it is not such a line
+    """
+    return next((error for pattern, error in FATAL_PATTERN_DCT.get(prog, ())
+                 if re.search(pattern, line, re.IGNORECASE)), None)
+
+
+def is_oscillating(changes, window=SCF_WINDOW):
+    """ Assess if the energy changes of the iterations of an SCF are
+        oscillating: over the last `window` iterations, the sign of the
+        change flipped at least every other iteration and the size of the
+        change never dropped below the smallest one before them.
+
+        :param changes: energy change of each iteration of the SCF
+        :type changes: list(float)
+        :param window: number of most recent iterations assessed
+        :type window: int
+        :rtype: bool
+    """
+
+    if len(changes) <= window:
+        return False
+
+    recent, earlier = changes[-window:], changes[:-window]
+    nflips = sum(1 for chg1, chg2 in zip(recent, recent[1:])
+                 if chg1 * chg2 < 0.0)
+
+    return (nflips >= window // 2 and
+            min(map(abs, recent)) >= min(map(abs, earlier)))
+
+
+@contextlib.contextmanager
+def watching(path, prog, time_limit=None):
+    """ Watch the output of a blocking run in the background, killing the
+        processes running in its directory if it should be aborted.
+
+        Arguments match those of `watcher`, whose state is yielded so the
+        caller may see if, and why, the run was aborted.
+    """
+
+    state = watcher(path, prog, time_limit=time_limit)
+    stop = threading.Event()
+
+    def _watch():
+        while not stop.wait(WATCH_INTERVAL):
+            if check(state):
+                print(' - Aborting run in {}: {}'.format(
+                    path, state['reason']))
+                _exec.kill_path(path)
+                break
+
+    thread = threading.Thread(target=_watch, daemon=True)
+    thread.start()
+    try:
+        yield state
+    finally:
+        stop.set()
+        thread.join()
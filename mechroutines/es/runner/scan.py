@@ -26,6 +26,8 @@ def execute_scan(zma, spc_info, mod_thy_info,
         Function will first assess whether the scan has been run by
         searching the filesystem.
 
+        :returns: whether every point of the scan is saved
+        :rtype: bool
     """
 
     # Need a resave option
@@ -51,6 +53,12 @@ def execute_scan(zma, spc_info, mod_thy_info,
             constraint_dct=constraint_dct,
             mod_thy_info=mod_thy_info)
 
+        _fin = _scan_finished(
+            coord_names, coord_grids, scn_save_fs,
+            constraint_dct=constraint_dct)
+
+    return _fin
+
 
 def run_scan(zma, spc_info, mod_thy_info,
              coord_names, coord_grids,
@@ -53,11 +53,15 @@ def run_tsk(tsk, spc_dct, spc_name,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :returns: whether the task ran to completion, None if it was
+            skipped
+        :rtype: bool
     """
 
     ioprinter.task_header(tsk, spc_name)
     ioprinter.keyword_list(es_keyword_dct, thy_dct)
 
+    complete = False
     skip = skip_task(tsk, spc_dct, spc_name,
                      thy_dct, es_keyword_dct, save_prefix)
     if not skip:
@@ -66,30 +70,32 @@ def run_tsk(tsk, spc_dct, spc_name,
 
         # Run the task if an initial geom exists
         if 'init' in tsk:
-            _ = geom_init(
+            complete = geom_init(
                 spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
         elif 'conf' in tsk:
-            conformer_tsk(
+            complete = conformer_tsk(
                 job, spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
         elif 'tau' in tsk:
-            tau_tsk(
+            complete = tau_tsk(
                 job, spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
         elif 'hr' in tsk:
-            hr_tsk(
+            complete = hr_tsk(
                 job, spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
         elif 'rpath' in tsk:
-            rpath_tsk(
+            complete = rpath_tsk(
                 job, spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
         elif 'find' in tsk:
-            findts(
+            complete = findts(
                 spc_dct, spc_name, thy_dct, es_keyword_dct,
                 run_prefix, save_prefix)
 
+    return None if skip else bool(complete)
+
 
 # FUNCTIONS FOR SAMPLING AND SCANS #
 def geom_init(spc_dct, spc_name, thy_dct, es_keyword_dct,
@@ -163,6 +169,8 @@ def conformer_tsk(job, spc_dct, spc_name,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :returns: whether every job of the task succeeded
+        :rtype: bool
     """
 
     saddle = bool('ts_' in spc_name)
@@ -175,6 +183,7 @@ def conformer_tsk(job, spc_dct, spc_name,
     else:
         spc_info = rinfo.ts_info(spc_dct_i['rxn_info'])
     zrxn = spc_dct_i.get('zrxn', None)
+    complete = True
 
     overwrite = es_keyword_dct['overwrite']
     retryfail = es_keyword_dct['retryfail']
@@ -246,15 +255,21 @@ def conformer_tsk(job, spc_dct, spc_name,
 
             rid = conformer.rng_loc_for_geo(
                 geo, cnf_run_fs, cnf_save_fs)
+            complete = rid is not None
 
         # Run the sampling
-        conformer.conformer_sampling(
+        complete = complete and conformer.conformer_sampling(
             zma, spc_info, mod_thy_info,
             cnf_run_fs, cnf_save_fs, rid,
             script_str, overwrite,
             nsamp_par=mc_nsamp,
             tors_names=tors_names, zrxn=zrxn,
             two_stage=two_stage, retryfail=retryfail, resave=resave,
+            njobs=es_keyword_dct['njobs'],
+            executor=es_keyword_dct['executor'],
+            ffopt=es_keyword_dct['ffopt'],
+            adaptive=es_keyword_dct['adaptive'],
+            batch_samp=es_keyword_dct['batch_samp'],
             **kwargs)
 
     elif job == 'pucker':
@@ -287,7 +302,7 @@ def conformer_tsk(job, spc_dct, spc_name,
         ioprinter.initial_geom_path('Sampling started', geo_path)
 
         # Run the sampling
-        conformer.ring_conformer_sampling(
+        complete = conformer.ring_conformer_sampling(
             zma, spc_info, mod_thy_info,
             cnf_run_fs, cnf_save_fs,
             script_str, overwrite,
@@ -332,7 +347,7 @@ def conformer_tsk(job, spc_dct, spc_name,
             zma = ini_zma_save_fs[-1].file.zmatrix.read((0,))
 
             # Make the ring filesystem
-            conformer.single_conformer(
+            complete &= conformer.single_conformer(
                 zma, spc_info, mod_thy_info,
                 cnf_run_fs, cnf_save_fs,
                 script_str, overwrite,
@@ -348,7 +363,7 @@ def conformer_tsk(job, spc_dct, spc_name,
             zma = ini_zma_save_fs[-1].file.zmatrix.read((0,))
             # obtain conformer filesys associated with ring at the runlevel
             cid = autofile.schema.generate_new_conformer_id()
-            conformer.single_conformer(
+            complete &= conformer.single_conformer(
                 zma, spc_info, mod_thy_info,
                 cnf_run_fs, cnf_save_fs,
                 script_str, overwrite,
@@ -387,12 +402,14 @@ def conformer_tsk(job, spc_dct, spc_name,
             print('Running task for geometry at {}', geo_save_path)
             geo = ini_cnf_save_fs[-1].file.geometry.read(ini_locs)
             zma = ini_zma_save_fs[-1].file.zmatrix.read((0,))
-            ES_TSKS[job](
+            complete &= ES_TSKS[job](
                 zma, geo, spc_info, mod_thy_info,
                 ini_cnf_run_fs, ini_cnf_save_fs, ini_locs,
                 script_str, overwrite,
                 retryfail=retryfail, **kwargs)
 
+    return complete
+
 
 def tau_tsk(job, spc_dct, spc_name,
             thy_dct, es_keyword_dct,
@@ -415,11 +432,14 @@ def tau_tsk(job, spc_dct, spc_name,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :returns: whether every job of the task succeeded
+        :rtype: bool
     """
     spc_dct_i = spc_dct[spc_name]
 
     # Set the spc_info
     spc_info = sinfo.from_dct(spc_dct_i)
+    complete = True
 
     # Get es options
     overwrite = es_keyword_dct['overwrite']
@@ -542,13 +562,16 @@ def tau_tsk(job, spc_dct, spc_name,
 
             tors_names = automol.rotor.names(torsions, flat=True)
             # Run sampling
-            tau.tau_sampling(
+            complete = tau.tau_sampling(
                 zma, ref_ene,
                 spc_info, tors_names, nsamp_par,
                 mod_ini_thy_info,
                 tau_run_fs, tau_save_fs,
                 script_str, overwrite,
-                saddle=saddle, **kwargs)
+                saddle=saddle,
+                njobs=es_keyword_dct['njobs'],
+                executor=es_keyword_dct['executor'],
+                **kwargs)
 
         elif job in ('energy', 'grad'):
 
@@ -566,7 +589,7 @@ def tau_tsk(job, spc_dct, spc_name,
                     geo = tau_save_fs[-1].file.geometry.read(locs)
                 tau_run_fs[-1].create(locs)
                 zma = None
-                ES_TSKS[job](
+                complete &= ES_TSKS[job](
                     zma, geo, spc_info, mod_thy_info,
                     tau_save_fs, locs,
                     script_str, overwrite,
@@ -602,7 +625,7 @@ def tau_tsk(job, spc_dct, spc_name,
                         continue
                     geo = tau_save_fs[-1].json.geometry.read(locs)
                 tau_run_fs[-1].create(locs)
-                ES_TSKS[job](
+                complete &= ES_TSKS[job](
                     None, geo, spc_info, mod_thy_info,
                     tau_run_fs, tau_save_fs, locs,
                     script_str, overwrite,
@@ -614,6 +637,8 @@ def tau_tsk(job, spc_dct, spc_name,
     else:
         ioprinter.info_message('No torsional modes in the species')
 
+    return complete
+
 
 def hr_tsk(job, spc_dct, spc_name,
            thy_dct, es_keyword_dct,
@@ -643,10 +668,13 @@ def hr_tsk(job, spc_dct, spc_name,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :returns: whether every job of the task succeeded
+        :rtype: bool
     """
 
     spc_dct_i = spc_dct[spc_name]
     saddle = bool('ts_' in spc_name)
+    complete = True
     # Set the spc_info
     if not saddle:
         spc_info = sinfo.from_dct(spc_dct_i)
@@ -709,7 +737,7 @@ def hr_tsk(job, spc_dct, spc_name,
         if job == 'scan':
 
             increment = spc_dct_i.get('hind_inc', 30.0*phycon.DEG2RAD)
-            hr.hindered_rotor_scans(
+            complete = hr.hindered_rotor_scans(
                 zma, spc_info, mod_thy_info,
                 ini_scn_run_fs, ini_scn_save_fs,
                 torsions, tors_model, method_dct,
@@ -779,7 +807,7 @@ def hr_tsk(job, spc_dct, spc_name,
                     geo = ini_scn_save_fs[-1].file.geometry.read(locs)
                     zma = ini_scn_save_fs[-1].file.zmatrix.read(locs)
                     ini_scn_run_fs[-1].create(locs)
-                    ES_TSKS[job](
+                    complete &= ES_TSKS[job](
                         zma, geo, spc_info, mod_thy_info,
                         ini_scn_run_fs, ini_scn_save_fs, locs,
                         script_str, overwrite,
@@ -788,6 +816,8 @@ def hr_tsk(job, spc_dct, spc_name,
     else:
         ioprinter.info_message('No torsional modes in the species')
 
+    return complete
+
 
 def rpath_tsk(job, spc_dct, spc_name,
               thy_dct, es_keyword_dct,
@@ -808,10 +838,13 @@ def rpath_tsk(job, spc_dct, spc_name,
         :type run_prefix: str
         :param save_prefix: root-path to the save-filesystem
         :type save_prefix: str
+        :returns: whether every job of the task succeeded
+        :rtype: bool
     """
 
     # Get dct for specific species task is run for
     spc_dct_i = spc_dct[spc_name]
+    complete = True
 
     # Set up coordinate name
     rxn_coord = es_keyword_dct.get('rxn_coord')
@@ -899,7 +932,7 @@ def rpath_tsk(job, spc_dct, spc_name,
         for locs in ini_scn_save_fs[-1].existing():
             geo = ini_scn_save_fs[-1].file.geometry.read(locs)
             ini_scn_run_fs[-1].create(locs)
-            ES_TSKS[job](
+            complete &= ES_TSKS[job](
                 None, geo, spc_info, mod_thy_info,
                 ini_scn_run_fs, ini_scn_save_fs, locs,
                 script_str, overwrite, **kwargs)
@@ -909,6 +942,8 @@ def rpath_tsk(job, spc_dct, spc_name,
         pass
         # inf_sep_ene()
 
+    return complete
+
 
 def skip_task(tsk, spc_dct, spc_name, thy_dct, es_keyword_dct, save_prefix):
     """ Determine if an electronic structure task should be skipped based on
@@ -6,6 +6,7 @@ import autorun
 import automol.geom
 from phydat import phycon
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechlib.amech_io._path import job_path
 from mechroutines.models import typ
 from mechroutines.models import _tors as tors
@@ -129,8 +130,9 @@ def read_locs_harmonic_freqs(cnf_fs, cnf_locs, run_prefix, zrxn=None):
         ioprinter.info_message(
             'Calling ProjRot to diagonalize Hessian and get freqs...')
         script_str = autorun.SCRIPT_DCT['projrot']
-        freqs, _, imag_freqs, _ = autorun.projrot.frequencies(
-            script_str, vib_path, [geo], [[]], [hess])
+        with telemetry.measure('projrot', vib_path):
+            freqs, _, imag_freqs, _ = autorun.projrot.frequencies(
+                script_str, vib_path, [geo], [[]], [hess])
 
         # Calculate the zpve
         ioprinter.frequencies(freqs)
@@ -213,13 +215,14 @@ def tors_projected_freqs(pf_filesystems, mess_hr_str, projrot_hr_str,
     dist_cutoff_dct2 = {('H', 'O'): 2.83459, ('H', 'C'): 2.83459,
                         ('C', 'O'): 3.7807}
 
-    proj_inf = autorun.projected_frequencies(
-        mess_script_str, projrot_script_str, vib_path,
-        mess_hr_str, projrot_hr_str,
-        tors_geo, harm_geo, hess,
-        dist_cutoff_dct1=dist_cutoff_dct1,
-        dist_cutoff_dct2=dist_cutoff_dct2,
-        saddle=(zrxn is not None))
+    with telemetry.measure('projrot', vib_path):
+        proj_inf = autorun.projected_frequencies(
+            mess_script_str, projrot_script_str, vib_path,
+            mess_hr_str, projrot_hr_str,
+            tors_geo, harm_geo, hess,
+            dist_cutoff_dct1=dist_cutoff_dct1,
+            dist_cutoff_dct2=dist_cutoff_dct2,
+            saddle=(zrxn is not None))
     proj_freqs, proj_imag, _, harm_freqs, tors_freqs = proj_inf
     tors_zpe = 0.5 * sum(tors_freqs) * phycon.WAVEN2EH
 
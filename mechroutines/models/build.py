@@ -13,6 +13,7 @@ from phydat import phycon
 from mechanalyzer.inf import spc as sinfo
 from mechlib import filesys
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechroutines.models import ene
 from mechroutines.models import typ
 from mechroutines.models import etrans
@@ -472,8 +473,9 @@ def rpvtst_data(ts_dct, reac_dcts, spc_mod_dct_i,
         read_grad=True,
         read_hess=True)
     script_str = autorun.SCRIPT_DCT['projrot']
-    freqs = autorun.projrot.pot_frequencies(
-        script_str, geoms, grads, hessians, ts_run_path)
+    with telemetry.measure('projrot', ts_run_path):
+        freqs = autorun.projrot.pot_frequencies(
+            script_str, geoms, grads, hessians, ts_run_path)
 
     # Get the energies and zpes at R_ref
     if not sadpt:
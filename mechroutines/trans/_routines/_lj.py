@@ -10,6 +10,7 @@ from mechanalyzer.inf import spc as sinfo
 from mechanalyzer.inf import thy as tinfo
 from mechlib import filesys
 from mechlib.amech_io import printer as ioprinter
+from mechlib.amech_io.runner import telemetry
 from mechlib.amech_io._path import job_path
 
 
@@ -60,12 +61,13 @@ def run_onedmin(spc_name,
     nsamp_needed = _nsamp_needed(
         etrans_save_fs, etrans_locs, etrans_keyword_dct)
     if nsamp_needed > 0:
-        _runlj(nsamp_needed,
-               lj_info, tgt_dct,
-               lj_mod_thy_info, tgt_mod_thy_info, bath_mod_thy_info,
-               tgt_cnf_save_fs, bath_cnf_save_fs,
-               etrans_save_fs, etrans_locs,
-               etrans_keyword_dct, run_prefix)
+        with telemetry.labels(spc=spc_name):
+            _runlj(nsamp_needed,
+                   lj_info, tgt_dct,
+                   lj_mod_thy_info, tgt_mod_thy_info, bath_mod_thy_info,
+                   tgt_cnf_save_fs, bath_cnf_save_fs,
+                   etrans_save_fs, etrans_locs,
+                   etrans_keyword_dct, run_prefix)
     else:
         epath = etrans_save_fs[-1].file.lennard_jones_epsilon.path(etrans_locs)
         spath = etrans_save_fs[-1].file.lennard_jones_sigma.path(etrans_locs)
@@ -139,10 +141,12 @@ def _runlj(nsamp_needed,
     # Run OneDMin
     # prolly better to just get strings
     # need geoms geo_str = _output_str(jobdir, 'min_geoms.out')
-    inp_strs, els_str, out_strs = autorun.onedmin.direct(
-        sp_script_str, run_dir, nsamp_per_job, njobs,
-        tgt_geo, bath_geo, lj_mod_thy_info, charge, mult,
-        smin=tgt_dct['smin'], smax=tgt_dct['smax'], spin_method=1)
+    with telemetry.measure('onedmin', run_dir, nprocs=njobs,
+                           prefix=run_prefix):
+        inp_strs, els_str, out_strs = autorun.onedmin.direct(
+            sp_script_str, run_dir, nsamp_per_job, njobs,
+            tgt_geo, bath_geo, lj_mod_thy_info, charge, mult,
+            smin=tgt_dct['smin'], smax=tgt_dct['smax'], spin_method=1)
 
     # Parse out certain info
     epsilons, sigmas, geoms, ranseeds, version, input_str = _parse(
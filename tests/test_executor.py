@@ -0,0 +1,109 @@
+""" Test the executors that launch electronic structure job scripts,
+    using the fake queue that runs array jobs on the local node
+"""
+
+import os
+import time
+import tempfile
+from mechroutines.es.runner import _exec
+
+
+SCRIPT_STR = (
+    '#!/usr/bin/env bash\n'
+    '{}'
+    'echo "done" > run.out\n'
+    'exit {}\n'
+)
+
+
+def test__fake_queue():
+    """ test _exec.submit and _exec.poll for the fake queue
+    """
+
+    paths = _write_jobs((0, 0, 3))
+    refs = _exec.submit('fake', paths)
+    assert len(refs) == 3
+
+    codes = _wait('fake', refs)
+    assert codes == [0, 0, 3]
+    for path in paths:
+        assert os.path.exists(os.path.join(path, 'run.out'))
+        assert os.path.exists(os.path.join(path, _exec.SENTINEL_NAME))
+
+
+def test__local():
+    """ test _exec.submit and _exec.poll for the local executor
+    """
+
+    paths = _write_jobs((0, 1))
+    refs = _exec.submit('local', paths)
+    codes = _wait('local', refs)
+    assert codes == [0, 1]
+
+
+def test__usage():
+    """ test _exec.usage for the local executor and the fake queue
+    """
+
+    for executor in ('local', 'fake'):
+        paths = _write_jobs((0, 1))
+        refs = _exec.submit(executor, paths)
+        _wait(executor, refs)
+        for ref in refs:
+            usage_dct = _exec.usage(executor, ref)
+            if usage_dct is not None:
+                assert usage_dct['cpu'] >= 0.0
+                assert usage_dct['max_rss_mb'] > 0.0
+            else:
+                # The fake queue needs GNU time to report the usage
+                assert executor == 'fake'
+
+
+def test__kill():
+    """ test _exec.kill for the local executor and the fake queue
+    """
+
+    for executor in ('local', 'fake'):
+        paths = _write_jobs((0,), body='sleep 60\n')
+        refs = _exec.submit(executor, paths)
+        time.sleep(1.0)
+        _exec.kill(executor, refs[0])
+        codes = _wait(executor, refs, timeout=15.0)
+        assert codes[0] != 0
+
+
+def _write_jobs(codes, body=''):
+    """ Write a job script exiting with each code into its own directory
+    """
+
+    paths = []
+    for code in codes:
+        path = tempfile.mkdtemp()
+        script_path = os.path.join(path, _exec.SCRIPT_NAME)
+        with open(script_path, 'w') as script_obj:
+            script_obj.write(SCRIPT_STR.format(body, code))
+        os.chmod(script_path, 0o755)
+        paths.append(path)
+
+    return paths
+
+
+def _wait(executor, refs, timeout=30.0):
+    """ Poll the jobs until they all finish
+    """
+
+    start = time.time()
+    codes = [None for _ in refs]
+    while any(code is None for code in codes):
+        assert time.time() - start < timeout
+        codes = [_exec.poll(executor, ref) for ref in refs]
+        time.sleep(0.1)
+
+    return codes
+
+
+if __name__ == '__main__':
+    test__fake_queue()
+    test__local()
+    test__usage()
+    test__kill()
@@ -0,0 +1,249 @@
+""" Test the conformer fingerprint index against the full scan over the
+    saved conformers that it replaces
+"""
+
+import os
+import tempfile
+import numpy
+import autofile
+from mechlib.filesys import fingerprint
+from mechroutines.es._routines.conformer import _geo_unique
+from mechroutines.es._routines.conformer import _sym_unique
+
+
+# Synthetic conformers (bohr) displaced from a reference structure, with
+# energies in a narrow window so that many of them share energy bins
+SYMBS = ('C',) * 4 + ('H',) * 10
+DISP = 0.3
+ENE_REF = -157.0
+ENE_WINDOW = 2.0e-4
+THY_INFO = ('gaussian', 'b3lyp', '6-31g*', 'R')
+
+
+def test__close_spectra():
+    """ test fingerprint._close_spectra
+    """
+
+    rng = numpy.random.RandomState(0)
+    geos, _ = _conformers(2, rng)
+    spec = fingerprint.spectrum(geos[0])
+
+    # Rotated and reordered copies have the same fingerprint
+    rot, _ = numpy.linalg.qr(rng.normal(size=(3, 3)))
+    xyzs = numpy.array([xyz for _, xyz in geos[0]]) @ rot
+    perm = rng.permutation(len(SYMBS))
+    copy_geo = tuple((SYMBS[i], tuple(map(float, xyzs[i]))) for i in perm)
+    assert fingerprint._close_spectra(spec, fingerprint.spectrum(copy_geo))
+
+    assert not fingerprint._close_spectra(
+        spec, fingerprint.spectrum(geos[1]))
+    assert not fingerprint._close_spectra(spec, spec[:-1])
+
+
+def test__candidates():
+    """ test fingerprint.candidates
+
+        The entries found with the index must be those a full scan finds,
+        and the uniqueness checks against them must decide as the checks
+        against every saved conformer.
+    """
+
+    rng = numpy.random.RandomState(1)
+    saved_geos, saved_enes = _conformers(200, rng)
+    new_geos, new_enes = _queries(saved_geos, saved_enes, 30, rng)
+
+    idx = fingerprint.build(
+        {'locs': [i], 'ene': ene, 'spec': fingerprint.spectrum(geo)}
+        for i, (geo, ene) in enumerate(zip(saved_geos, saved_enes)))
+
+    nunique = 0
+    for geo, ene in zip(new_geos, new_enes):
+        spec = fingerprint.spectrum(geo)
+
+        # Entries within the energy threshold, with and without fingerprints
+        scan_locs = [[i] for i, sene in enumerate(saved_enes)
+                     if abs(sene - ene) < fingerprint.ENE_THRESH]
+        assert _locs(fingerprint.candidates(idx, ene)) == scan_locs
+        scan_locs = [locs for locs in scan_locs
+                     if fingerprint._close_spectra(
+                         spec, fingerprint.spectrum(saved_geos[locs[0]]))]
+        assert _locs(fingerprint.candidates(idx, ene, spec=spec)) == scan_locs
+
+        # Decisions of the uniqueness checks
+        unique = (_geo_unique(geo, ene, saved_geos, saved_enes) and
+                  _sym_unique(geo, ene, saved_geos, saved_enes) is None)
+        assert _check_index(geo, ene, idx, saved_geos) == unique
+        nunique += unique
+
+    # Half the queries are copies of saved conformers
+    assert nunique <= len(new_geos) - len(new_geos) // 2
+
+
+def test__fragment_candidates():
+    """ test fingerprint.fragment_candidates
+    """
+
+    idx = fingerprint.build([
+        {'locs': [0], 'ene': ENE_REF, 'spec': (), 'frag_spec': (1.0, 2.0)},
+        {'locs': [1], 'ene': ENE_REF, 'spec': (), 'frag_spec': (1.0, 2.1)},
+        {'locs': [2], 'ene': ENE_REF, 'spec': (), 'frag_spec': (1.0,)},
+        {'locs': [3], 'ene': ENE_REF, 'spec': ()}])
+
+    assert _locs(fingerprint.fragment_candidates(
+        idx, (1.01, 2.0), rtol=0.03)) == [[0]]
+    assert _locs(fingerprint.fragment_candidates(
+        idx, (1.01, 2.0), rtol=0.1)) == [[0], [1]]
+
+
+def test__load():
+    """ test fingerprint.load
+    """
+
+    prefix = tempfile.mkdtemp()
+    cnf_save_fs = autofile.fs.conformer(prefix)
+
+    rng = numpy.random.RandomState(2)
+    geos, enes = _conformers(4, rng)
+    locs_lst = [(autofile.schema.generate_new_ring_id(),
+                 autofile.schema.generate_new_conformer_id())
+                for _ in geos]
+    for locs, geo, ene in zip(locs_lst, geos, enes):
+        cnf_save_fs[-1].create(locs)
+        cnf_save_fs[-1].file.geometry.write(geo, locs)
+    for locs, ene in zip(locs_lst[:3], enes[:3]):
+        _write_energy(cnf_save_fs, locs, ene)
+
+    # Conformers without an energy are pending until it is saved
+    idx = fingerprint.load(cnf_save_fs, THY_INFO)
+    assert ([entry['locs'] for entry in fingerprint.conformers(idx)] ==
+            [list(locs_lst[i]) for i in numpy.argsort(enes[:3])])
+    assert (_locs(fingerprint.conformers(idx, status='pending')) ==
+            [list(locs_lst[3])])
+
+    _write_energy(cnf_save_fs, locs_lst[3], enes[3])
+    cnf_save_fs[-1].removable = True
+    cnf_save_fs[-1].remove(locs_lst[0])
+
+    # Read back from the file, as by another process
+    fingerprint._INDEX_CACHE.clear()
+    idx = fingerprint.load(cnf_save_fs, THY_INFO)
+    assert ([entry['locs'] for entry in fingerprint.conformers(idx)] ==
+            [list(locs_lst[i]) for i in numpy.argsort(enes) if i != 0])
+    assert not fingerprint.conformers(idx, status='pending')
+    for locs, geo, ene in zip(locs_lst[1:], geos[1:], enes[1:]):
+        assert list(locs) in _locs(fingerprint.candidates(
+            idx, ene, spec=fingerprint.spectrum(geo)))
+
+
+def test__load_levels():
+    """ test fingerprint.load at several levels of theory, and without
+        writing
+    """
+
+    prefix = tempfile.mkdtemp()
+    cnf_save_fs = autofile.fs.conformer(prefix)
+    thy_info2 = ('gaussian', 'b3lyp', 'cc-pvdz', 'R')
+
+    rng = numpy.random.RandomState(3)
+    geos, enes = _conformers(2, rng)
+    locs_lst = [(autofile.schema.generate_new_ring_id(),
+                 autofile.schema.generate_new_conformer_id())
+                for _ in geos]
+    for locs, geo, ene in zip(locs_lst, geos, enes):
+        cnf_save_fs[-1].create(locs)
+        cnf_save_fs[-1].file.geometry.write(geo, locs)
+        _write_energy(cnf_save_fs, locs, ene)
+
+    # Loading without writing leaves the filesystem as it was
+    idx_files = set(os.listdir(cnf_save_fs[0].path()))
+    idx = fingerprint.load(cnf_save_fs, THY_INFO, write=False)
+    assert len(fingerprint.conformers(idx)) == 2
+    assert set(os.listdir(cnf_save_fs[0].path())) == idx_files
+
+    # Each level of theory keeps an index of its own
+    fingerprint.load(cnf_save_fs, THY_INFO)
+    idx2 = fingerprint.load(cnf_save_fs, thy_info2)
+    assert len(fingerprint.conformers(idx2, status='pending')) == 2
+    assert idx2['path'] != idx['path']
+    assert os.path.exists(idx['path']) and os.path.exists(idx2['path'])
+
+    fingerprint._INDEX_CACHE.clear()
+    idx = fingerprint.load(cnf_save_fs, THY_INFO)
+    assert len(fingerprint.conformers(idx)) == 2
+
+
+def _conformers(nconfs, rng):
+    """ Build a set of synthetic conformers
+    """
+
+    ref_xyzs = rng.uniform(-3.0, 3.0, size=(len(SYMBS), 3))
+    geos, enes = [], []
+    for _ in range(nconfs):
+        xyzs = ref_xyzs + rng.normal(0.0, DISP, size=ref_xyzs.shape)
+        geos.append(_geometry(xyzs))
+        enes.append(ENE_REF + rng.uniform(0.0, ENE_WINDOW))
+
+    return geos, enes
+
+
+def _queries(geos, enes, nquery, rng):
+    """ Build the conformers checked against the saved ones: half copies
+        of saved conformers, half new ones
+    """
+
+    new_geos, new_enes = _conformers(nquery - nquery // 2, rng)
+    for idx in rng.choice(len(geos), size=nquery // 2, replace=False):
+        rot, _ = numpy.linalg.qr(rng.normal(size=(3, 3)))
+        xyzs = numpy.array([xyz for _, xyz in geos[idx]]) @ rot
+        new_geos.append(_geometry(xyzs))
+        new_enes.append(enes[idx] + rng.uniform(-1e-6, 1e-6))
+
+    return new_geos, new_enes
+
+
+def _check_index(geo, ene, idx, saved_geos):
+    """ Check a conformer against the candidates found with the index, as
+        in conformer sampling
+    """
+
+    geo_entries = fingerprint.candidates(idx, ene)
+    unique = _geo_unique(
+        geo, ene, [saved_geos[entry['locs'][0]] for entry in geo_entries],
+        [entry['ene'] for entry in geo_entries])
+    if unique:
+        sym_entries = fingerprint.candidates(
+            idx, ene, spec=fingerprint.spectrum(geo))
+        unique = _sym_unique(
+            geo, ene, [saved_geos[entry['locs'][0]] for entry in sym_entries],
+            [entry['ene'] for entry in sym_entries]) is None
+
+    return unique
+
+
+def _write_energy(cnf_save_fs, locs, ene):
+    """ Save the energy of a conformer at the level of theory
+    """
+    sp_save_fs = autofile.fs.single_point(cnf_save_fs[-1].path(locs))
+    sp_save_fs[-1].create(THY_INFO[1:4])
+    sp_save_fs[-1].file.energy.write(ene, THY_INFO[1:4])
+
+
+def _locs(entries):
+    """ Locators of index entries, sorted
+    """
+    return sorted(entry['locs'] for entry in entries)
+
+
+def _geometry(xyzs):
+    """ Geometry of the reference species with the given coordinates
+    """
+    return tuple((symb, tuple(map(float, xyz)))
+                 for symb, xyz in zip(SYMBS, xyzs))
+
+
+if __name__ == '__main__':
+    test__close_spectra()
+    test__candidates()
+    test__fragment_candidates()
+    test__load()
+    test__load_levels()
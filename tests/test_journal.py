@@ -0,0 +1,220 @@
+""" Test the journal of completed units of work and how the electronic
+    structure driver skips the tasks recorded in it
+"""
+
+import os
+import tempfile
+from mechlib.filesys import journal
+from drivers.esdriver import _in_journal
+from drivers.esdriver import _prune_journaled
+
+
+# Species and theory information for the units of work
+SPC_DCT = {
+    'C2H6': {'inchi': 'InChI=1S/C2H6/c1-2/h1-2H3', 'charge': 0, 'mult': 1},
+    'H': {'inchi': 'InChI=1S/H', 'charge': 0, 'mult': 2},
+    'C2H5': {'inchi': 'InChI=1S/C2H5/c1-2/h1H2,2H3', 'charge': 0,
+             'mult': 2},
+    'H2': {'inchi': 'InChI=1S/H2/h1H', 'charge': 0, 'mult': 1},
+    'ts_1_1_0_0': {'charge': 0, 'mult': 2, 'ts_idx': 0,
+                   'reacs': ['C2H6', 'H'], 'prods': ['C2H5', 'H2']},
+}
+THY_DCT = {
+    'lvl_b3lyp': {'program': 'gaussian', 'method': 'b3lyp',
+                  'basis': '6-31g*', 'orb_res': 'RU'},
+    'lvl_b3lyp_copy': {'program': 'gaussian', 'method': 'b3lyp',
+                       'basis': '6-31g*', 'orb_res': 'RU'},
+    'lvl_wbs': {'program': 'gaussian', 'method': 'wb97xd',
+                'basis': '6-31g*', 'orb_res': 'RU'},
+}
+KEYWORD_DCT = {'runlvl': 'lvl_b3lyp', 'inplvl': 'lvl_b3lyp',
+               'nsamp': 5, 'retryfail': True, 'overwrite': False}
+
+
+def test__unit_key():
+    """ test journal.unit_key
+    """
+
+    key = journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_samp', KEYWORD_DCT, THY_DCT)
+
+    # Stable to the order of the keywords
+    kwd_dct = dict(reversed(list(KEYWORD_DCT.items())))
+    assert key == journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_samp', kwd_dct, THY_DCT)
+
+    # Keywords that only control how the task is run are left out
+    for run_key, val in (('retryfail', False), ('overwrite', True),
+                         ('njobs', 8), ('executor', 'slurm'),
+                         ('nprocs', 4)):
+        assert run_key in journal.RUNTIME_KEYS
+        kwd_dct = dict(KEYWORD_DCT)
+        kwd_dct[run_key] = val
+        assert key == journal.unit_key(
+            'C2H6', SPC_DCT['C2H6'], 'conf_samp', kwd_dct, THY_DCT)
+
+    # Levels of theory are identified by their methods, not their names
+    kwd_dct = dict(KEYWORD_DCT, runlvl='lvl_b3lyp_copy')
+    assert key == journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_samp', kwd_dct, THY_DCT)
+    kwd_dct = dict(KEYWORD_DCT, runlvl='lvl_wbs')
+    assert key != journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_samp', kwd_dct, THY_DCT)
+
+    # Other keywords, the task and the species all set the key
+    kwd_dct = dict(KEYWORD_DCT, nsamp=10)
+    assert key != journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_samp', kwd_dct, THY_DCT)
+    assert key != journal.unit_key(
+        'C2H6', SPC_DCT['C2H6'], 'conf_opt', KEYWORD_DCT, THY_DCT)
+    assert key != journal.unit_key(
+        'C2H5', SPC_DCT['C2H5'], 'conf_samp', KEYWORD_DCT, THY_DCT)
+    spc_dct_i = dict(SPC_DCT['C2H6'], mult=3)
+    assert key != journal.unit_key(
+        'C2H6', spc_dct_i, 'conf_samp', KEYWORD_DCT, THY_DCT)
+
+    # Species information that does not set the result is left out
+    spc_dct_i = dict(SPC_DCT['C2H6'], smiles='CC')
+    assert key == journal.unit_key(
+        'C2H6', spc_dct_i, 'conf_samp', KEYWORD_DCT, THY_DCT)
+
+    # Transition states are also identified by name
+    ts_key = journal.unit_key(
+        'ts_1_1_0_0', SPC_DCT['ts_1_1_0_0'], 'find_ts', KEYWORD_DCT,
+        THY_DCT)
+    assert ts_key != journal.unit_key(
+        'ts_1_1_1_0', SPC_DCT['ts_1_1_0_0'], 'find_ts', KEYWORD_DCT,
+        THY_DCT)
+
+
+def test__read():
+    """ test journal.record and journal.is_complete, and the incremental
+        read of the journal
+    """
+
+    save_prefix = tempfile.mkdtemp()
+    path = os.path.join(save_prefix, journal.JOURNAL_NAME)
+
+    assert not journal.is_complete(save_prefix, 'key1')
+    journal.record(save_prefix, 'key1', 'C2H6', 'conf_samp')
+    assert journal.is_complete(save_prefix, 'key1')
+    assert journal._JOURNAL_CACHE[path][0] == os.path.getsize(path)
+
+    # Only the lines added since the last read are parsed
+    journal.record(save_prefix, 'key2', 'C2H6', 'conf_opt')
+    nread = journal._JOURNAL_CACHE[path][0]
+    assert journal.is_complete(save_prefix, 'key2')
+    assert journal._JOURNAL_CACHE[path][0] == os.path.getsize(path) > nread
+
+    # A line in the middle of being written is left for the next read
+    with open(path, 'a') as jrnl_obj:
+        jrnl_obj.write('{"key": "key3", "spc": "H", ')
+    assert not journal.is_complete(save_prefix, 'key3')
+    with open(path, 'a') as jrnl_obj:
+        jrnl_obj.write('"tsk": "conf_samp"}\n')
+    assert journal.is_complete(save_prefix, 'key3')
+    assert journal.is_complete(save_prefix, 'key1')
+
+    # Lines that cannot be read are passed over
+    with open(path, 'a') as jrnl_obj:
+        jrnl_obj.write('not json\n{"spc": "H"}\n')
+    journal.record(save_prefix, 'key4', 'H', 'conf_opt')
+    assert journal.is_complete(save_prefix, 'key4')
+    assert journal._read(save_prefix) == {'key1', 'key2', 'key3', 'key4'}
+
+
+def test__prune_journaled():
+    """ test esdriver._prune_journaled
+    """
+
+    save_prefix = tempfile.mkdtemp()
+    tsks = ('conf_samp', 'conf_opt', 'conf_hess')
+
+    # Chain of tasks for each species, the TS waiting on its reactants
+    dep_dct, node_dct = {}, {}
+    for name in ('C2H6', 'H', 'C2H5', 'H2'):
+        for idx, tsk in enumerate(tsks):
+            dep_dct[(name, idx)] = ((name, idx-1),) if idx else ()
+            node_dct[(name, idx)] = (tsk, KEYWORD_DCT)
+    dep_dct[('ts_1_1_0_0', 3)] = tuple(
+        (name, 2) for name in ('C2H6', 'H', 'C2H5', 'H2'))
+    node_dct[('ts_1_1_0_0', 3)] = ('find_ts', KEYWORD_DCT)
+
+    # Nothing is pruned from an empty journal
+    assert _prune_journaled(
+        dep_dct, node_dct, SPC_DCT, THY_DCT, save_prefix) == dep_dct
+
+    # All of C2H6 complete; only the first task of H, and the last task
+    # of C2H5, which depends on tasks that are not
+    _record(save_prefix, node_dct, [('C2H6', 0), ('C2H6', 1), ('C2H6', 2),
+                                    ('H', 0), ('C2H5', 2)])
+    pruned_dct = _prune_journaled(
+        dep_dct, node_dct, SPC_DCT, THY_DCT, save_prefix)
+    assert set(dep_dct) - set(pruned_dct) == {
+        ('C2H6', 0), ('C2H6', 1), ('C2H6', 2), ('H', 0)}
+    assert pruned_dct[('H', 1)] == ()
+    assert pruned_dct[('C2H5', 2)] == (('C2H5', 1),)
+    assert pruned_dct[('ts_1_1_0_0', 3)] == (
+        ('H', 2), ('C2H5', 2), ('H2', 2))
+
+    # The TS is only pruned once all of its reactants and products are
+    _record(save_prefix, node_dct, [('ts_1_1_0_0', 3)])
+    pruned_dct = _prune_journaled(
+        dep_dct, node_dct, SPC_DCT, THY_DCT, save_prefix)
+    assert ('ts_1_1_0_0', 3) in pruned_dct
+    _record(save_prefix, node_dct, [(name, idx)
+                                    for name in ('H', 'C2H5', 'H2')
+                                    for idx in range(3)])
+    assert not _prune_journaled(
+        dep_dct, node_dct, SPC_DCT, THY_DCT, save_prefix)
+
+
+def test__in_journal():
+    """ test esdriver._in_journal
+    """
+
+    save_prefix = tempfile.mkdtemp()
+    node_dct = {('C2H6', 0): ('conf_samp', KEYWORD_DCT),
+                ('ts_1_1_0_0', 1): ('find_ts', KEYWORD_DCT)}
+    _record(save_prefix, node_dct, list(node_dct))
+
+    assert _in_journal('conf_samp', SPC_DCT, 'C2H6', THY_DCT, KEYWORD_DCT,
+                       save_prefix, set())
+    assert not _in_journal('conf_opt', SPC_DCT, 'C2H6', THY_DCT,
+                           KEYWORD_DCT, save_prefix, set())
+
+    # Tasks are run again if asked to overwrite
+    kwd_dct = dict(KEYWORD_DCT, overwrite=True)
+    assert not _in_journal('conf_samp', SPC_DCT, 'C2H6', THY_DCT, kwd_dct,
+                           save_prefix, set())
+
+    # Tasks are run again if the species has run a task this session
+    assert not _in_journal('conf_samp', SPC_DCT, 'C2H6', THY_DCT,
+                           KEYWORD_DCT, save_prefix, {'C2H6'})
+    assert _in_journal('conf_samp', SPC_DCT, 'C2H6', THY_DCT, KEYWORD_DCT,
+                       save_prefix, {'H', 'ts_1_1_0_0'})
+
+    # Tasks for a TS are run again if its reactants or products have
+    assert _in_journal('find_ts', SPC_DCT, 'ts_1_1_0_0', THY_DCT,
+                       KEYWORD_DCT, save_prefix, {'CH4'})
+    for name in ('C2H6', 'H', 'C2H5', 'H2', 'ts_1_1_0_0'):
+        assert not _in_journal('find_ts', SPC_DCT, 'ts_1_1_0_0', THY_DCT,
+                               KEYWORD_DCT, save_prefix, {name})
+
+
+def _record(save_prefix, node_dct, nodes):
+    """ Record the units of work of graph nodes in the journal
+    """
+
+    for spc_name, tsk_idx in nodes:
+        tsk, kwd_dct = node_dct[(spc_name, tsk_idx)]
+        key = journal.unit_key(
+            spc_name, SPC_DCT[spc_name], tsk, kwd_dct, THY_DCT)
+        journal.record(save_prefix, key, spc_name, tsk)
+
+
+if __name__ == '__main__':
+    test__unit_key()
+    test__read()
+    test__prune_journaled()
+    test__in_journal()
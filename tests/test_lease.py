@@ -0,0 +1,87 @@
+""" Test the claims of jobs by processes sharing a run filesystem, racing
+    several processes for the same job
+"""
+
+import os
+import json
+import time
+import tempfile
+import multiprocessing
+from mechlib.amech_io.runner import _lease as lease
+
+
+NPROCS = 8
+
+
+def test__claim():
+    """ test lease.claim for a job that is not yet claimed
+    """
+
+    path = tempfile.mkdtemp()
+    results = _race(path)
+
+    # Exactly one process holds the claim, recorded under its PID
+    winners = [pid for claimed, pid in results if claimed]
+    assert len(winners) == 1
+    assert lease.read(path)['pid'] == winners[0]
+
+
+def test__take_over():
+    """ test lease.claim for a job held under an expired lease, which
+        is taken over by exactly one process
+    """
+
+    path = tempfile.mkdtemp()
+    now = time.time()
+    stale_inf = {'host': 'other-node', 'pid': 1,
+                 'claimed': now - 2.0 * lease.LEASE_TIME,
+                 'heartbeat': now - 2.0 * lease.LEASE_TIME,
+                 'expiry': now - lease.LEASE_TIME}
+    with open(os.path.join(path, lease.CLAIM_NAME), 'w') as claim_obj:
+        json.dump(stale_inf, claim_obj)
+    assert lease.is_stale(lease.read(path))
+    assert not lease.is_claimed(path)
+
+    results = _race(path)
+
+    winners = [pid for claimed, pid in results if claimed]
+    assert len(winners) == 1
+    inf = lease.read(path)
+    assert inf['pid'] == winners[0]
+    assert inf['expiry'] > now
+
+    # No file moved aside during the take over is left behind
+    assert os.listdir(path) == [lease.CLAIM_NAME]
+
+
+def _race(path):
+    """ Claim the job in a run directory from several processes at once,
+        returning whether each claimed it along with its PID
+    """
+
+    barrier = multiprocessing.Barrier(NPROCS)
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(
+        target=_claim, args=(path, barrier, queue)) for _ in range(NPROCS)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get(timeout=30.0) for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    return results
+
+
+def _claim(path, barrier, queue):
+    """ Claim the job in a run directory once all of the processes are
+        ready to, and stay alive until all of them have tried, as the
+        claim of a process that has exited is stale
+    """
+    barrier.wait()
+    queue.put((lease.claim(path), os.getpid()))
+    barrier.wait()
+
+
+if __name__ == '__main__':
+    test__claim()
+    test__take_over()
@@ -0,0 +1,80 @@
+""" Test the batch sampling of torsions for conformer searches
+"""
+
+import numpy
+import automol
+from mechroutines.es._routines import _sampler as sampler
+
+
+# Butane, sampled over its dihedral angles
+ZMA = automol.geom.zmatrix(
+    automol.inchi.geometry('InChI=1S/C4H10/c1-3-4-2/h3-4H2,1-2H3'))
+DIH_NAMES = tuple(numpy.array(automol.zmat.name_matrix(ZMA))[3:, 2])
+
+
+def test__batch_cartesians():
+    """ test sampler.batch_cartesians against automol, one Z-Matrix at a
+        time, by comparing the distances between the atoms
+    """
+
+    rng = numpy.random.RandomState(0)
+    vals = rng.uniform(-numpy.pi, numpy.pi, size=(5, len(DIH_NAMES)))
+    xyzs = sampler.batch_cartesians(ZMA, DIH_NAMES, vals)
+    assert xyzs.shape == (5, len(automol.zmat.symbols(ZMA)), 3)
+
+    real_idxs = [idx for idx, symb in enumerate(automol.zmat.symbols(ZMA))
+                 if symb != 'X']
+    for batch_xyzs, samp_vals in zip(xyzs, vals):
+        samp_zma = automol.zmat.set_values_by_name(
+            ZMA, dict(zip(DIH_NAMES, map(float, samp_vals))),
+            angstrom=False, degree=False)
+        ref_xyzs = numpy.array(automol.geom.coordinates(
+            automol.zmat.geometry(samp_zma)))
+        assert numpy.allclose(_distances(batch_xyzs[real_idxs]),
+                              _distances(ref_xyzs), atol=1e-6)
+
+
+def test__repulsion_scores():
+    """ test sampler.repulsion_scores
+    """
+
+    # Two pairs of atoms: one at contact, one stretched or compressed
+    pair_idxs = numpy.array([[0, 2], [1, 3]])
+    contacts = numpy.array([2.0, 2.0])
+    xyzs = numpy.zeros((3, 4, 3))
+    xyzs[:, 1, 0] = 2.0
+    xyzs[:, 2, 1] = 10.0
+    xyzs[:, 3, 1] = 10.0 + numpy.array([2.0, 4.0, 1.0])
+
+    scores = sampler.repulsion_scores(xyzs, pair_idxs, contacts)
+    assert numpy.allclose(scores, [2.0, 1.0 + 0.5**12, 1.0 + 2.0**12])
+
+
+def test__farthest_points():
+    """ test sampler.farthest_points
+    """
+
+    period = numpy.array([2.0 * numpy.pi])
+    vals = numpy.array([[0.1], [2.0 * numpy.pi - 0.1], [3.0], [1.5]])
+
+    # Seeded at zero: 0.1 and 2pi-0.1 are close to it across the period
+    assert sampler.farthest_points(
+        vals, 2, period, seed_vals=numpy.zeros((1, 1))) == [2, 3]
+
+    # Unseeded: the first point is picked first
+    assert sampler.farthest_points(vals, 2, period) == [0, 2]
+
+    assert sampler.farthest_points(vals, 10, period) == [0, 2, 3, 1]
+    assert sampler.farthest_points(vals[:0], 2, period) == []
+
+
+def _distances(xyzs):
+    """ Matrix of the distances between the atoms of a structure
+    """
+    return numpy.linalg.norm(xyzs[:, None] - xyzs[None, :], axis=-1)
+
+
+if __name__ == '__main__':
+    test__batch_cartesians()
+    test__repulsion_scores()
+    test__farthest_points()